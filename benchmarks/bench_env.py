@@ -0,0 +1,39 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from gptgame.env import DIRECTIONS, STAY, USE_AI, VecEnv
+
+# Codes for every tile: the unit AI moves, everyone stays, or random directions
+ACTIONS = {
+    "use ai": lambda rng, shape: np.full(shape, USE_AI),
+    "stay": lambda rng, shape: np.full(shape, STAY),
+    "random": lambda rng, shape: rng.integers(1, len(DIRECTIONS) + 1, shape),
+}
+
+
+def bench_steps(name: str, num_envs: int = 8, steps: int = 300, seed: int = 0) -> None:
+    rng = np.random.default_rng(seed)
+    env = VecEnv(num_envs, seed=seed)
+    env.reset()
+    batches = [ACTIONS[name](rng, env.actions.shape) for _ in range(steps)]
+    decision = 0.0
+    start = time.perf_counter()
+    for actions in batches:
+        env.step(actions)
+        # Read every step; a finished game is replaced along with its timings
+        decision += sum(game.pipeline.last_timings.get("decision", 0.0) for game in env.games)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{name:>8}: {num_envs * steps / elapsed:.0f} env steps/s ({num_envs} envs), "
+        f"decision stage {decision / elapsed:.0%} of the time"
+    )
+
+
+if __name__ == "__main__":
+    for name in ACTIONS:
+        bench_steps(name)
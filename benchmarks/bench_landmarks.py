@@ -0,0 +1,60 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from gptgame.board import Board
+from gptgame.landmarks import landmark_heuristic
+from gptgame.maps import MAPS, get_map
+from gptgame.pathfinding import PathStats, chebyshev, find_path
+
+COSTS = {
+    "rubble + 1": lambda tile: tile.rubble + 1,
+    "rubble * 10 + 1": lambda tile: tile.rubble * 10 + 1,
+}
+
+
+def random_pairs(board, count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    return [
+        (
+            (rng.randrange(board.width()), rng.randrange(board.height())),
+            (rng.randrange(board.width()), rng.randrange(board.height())),
+        )
+        for _ in range(count)
+    ]
+
+
+def run(board, pairs, cost, heuristic, radius) -> tuple:
+    stats = PathStats()
+    start = time.perf_counter()
+    for source, goal in pairs:
+        find_path(board, source, goal, cost, heuristic, radius, stats=stats)
+    return stats.expansions, time.perf_counter() - start
+
+
+def bench_map(name: str, pairs_per_map: int = 300, landmarks: int = 4) -> None:
+    rubble, resource = get_map(name)
+    board = Board(rubble, resource, line_of_sight=False)
+    pairs = random_pairs(board, pairs_per_map)
+    for cost_name, cost in COSTS.items():
+        for radius in (1, 1.5):
+            start = time.perf_counter()
+            alt = landmark_heuristic(board, cost, radius, landmarks)
+            setup = time.perf_counter() - start
+            base_expansions, base_time = run(board, pairs, cost, chebyshev, radius)
+            alt_expansions, alt_time = run(board, pairs, cost, alt, radius)
+            print(
+                f"{name}, {cost_name}, radius {radius}: "
+                f"{base_expansions} -> {alt_expansions} expansions "
+                f"({1 - alt_expansions / base_expansions:.0%} fewer), "
+                f"{base_time * 1000:.0f} -> {alt_time * 1000:.0f} ms, "
+                f"tables {setup * 1000:.0f} ms"
+            )
+
+
+if __name__ == "__main__":
+    for name in MAPS:
+        bench_map(name)
@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from gptgame.commander import MCTSCommander, SearchSettings, search
+from gptgame.match import create_game
+
+
+def midgame(turns: int = 100):
+    game = create_game("default", "Soldier21", "Soldier6", seed=1)
+    for _ in range(turns):
+        game.update()
+    return game
+
+
+def bench_clone(game, repeat: int = 200) -> None:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        game.clone()
+    elapsed = time.perf_counter() - start
+    print(f"clone: {repeat / elapsed:.0f} clones/s ({len(game.all_units())} units)")
+
+
+def bench_search(game, budget: float = 2.0) -> None:
+    settings = SearchSettings(time_budget=budget)
+    _, simulations, turns = search(game.clone(), 1, settings, seed=0)
+    print(
+        f"search x1: {simulations / budget:.1f} rollouts/s, "
+        f"{turns / budget:.0f} simulated turns/s"
+    )
+
+
+def bench_parallel(game, workers: int, budget: float = 2.0) -> None:
+    commander = MCTSCommander(SearchSettings(time_budget=budget), workers=workers)
+    # Warm the pool up so process start-up is not measured
+    commander.settings.time_budget = 0.01
+    commander.search(game, 1)
+    commander.settings.time_budget = budget
+    commander.simulations = 0
+    commander.simulated_turns = 0
+    start = time.perf_counter()
+    commander.search(game, 1)
+    elapsed = time.perf_counter() - start
+    commander.close()
+    print(
+        f"search x{workers}: {commander.simulations / elapsed:.1f} rollouts/s, "
+        f"{commander.simulated_turns / elapsed:.0f} simulated turns/s"
+    )
+
+
+if __name__ == "__main__":
+    game = midgame()
+    bench_clone(game)
+    bench_search(game)
+    bench_parallel(game, os.cpu_count() or 1)
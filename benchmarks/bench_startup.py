@@ -0,0 +1,56 @@
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+# Each snippet runs in a fresh interpreter and prints the seconds it took
+SNIPPETS = {
+    "import gptgame": "import gptgame",
+    "import gptgame.main": "import gptgame.main",
+    "import pygame": "import pygame",
+    "first Game.update()": (
+        "from gptgame.match import create_game\n"
+        "game = create_game('default', 'Soldier21', 'Soldier6', seed=0)\n"
+        "game.update()"
+    ),
+}
+
+TEMPLATE = """
+import time
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+import sys
+print(elapsed, "pygame" in sys.modules)
+"""
+
+
+def measure(code: str, repeat: int):
+    times = []
+    loaded = False
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", TEMPLATE.format(code=code)],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+        )
+        if output.returncode != 0:
+            return None, False
+        # pygame prints a banner on import; the result is the last line
+        elapsed, pygame_loaded = output.stdout.splitlines()[-1].split()
+        times.append(float(elapsed))
+        loaded = pygame_loaded == "True"
+    return statistics.median(times), loaded
+
+
+if __name__ == "__main__":
+    for name, code in SNIPPETS.items():
+        median, loaded = measure(code, repeat=5)
+        if median is None:
+            print(f"{name}: failed")
+            continue
+        note = " (loads pygame)" if loaded else ""
+        print(f"{name}: {median * 1000:.1f} ms{note}")
@@ -4,10 +4,22 @@ class Action:
 
     def execute(self, board) -> None:
         raise NotImplementedError
-    
+
     def apply(self, board) -> None:
         raise NotImplementedError
 
+    def error(self, board) -> str:
+        # Reason the action cannot be executed right now, or None
+        return None
+
+    def is_valid(self, board) -> bool:
+        return self.error(board) is None
+
+    def check(self, board) -> None:
+        error = self.error(board)
+        if error is not None:
+            raise Exception(error)
+
 
 
 class IdleAction(Action):
@@ -23,26 +35,35 @@ class AttackAction(Action):
         self.attacker = attacker
         self.target = target
 
-    def execute(self, board) -> None:
+    def error(self, board) -> str:
         tile = board.get_tile(self.target.x, self.target.y)
-        if not self.attacker.in_action_range(tile):
-            raise Exception(
-                f"Tile ({tile}) not in range of {self.attacker}. Range: {self.attacker.action_range}"
-            )
+        if not self.attacker.in_action_range(tile, board):
+            return f"Tile ({tile}) not in range of {self.attacker}. Range: {self.attacker.action_range}"
         if not tile.is_occupied():
-            raise Exception("Tile not occupied")
+            return "Tile not occupied"
         if not self.attacker.can_act():
-            raise Exception("Unit on cooldown")
+            return "Unit on cooldown"
         if not self.attacker.is_alive():
-            raise Exception("Unit dead")
+            return "Unit dead"
+        return None
+
+    def execute(self, board) -> None:
+        apply_damage(self.target, self.resolve(board))
 
-        self.target.health -= self.attacker.attack_damage
+    def resolve(self, board) -> int:
+        # Puts the attacker on cooldown and returns the damage dealt, leaving
+        # the target untouched so simultaneous attacks can be summed first
+        self.check(board)
         cooldown = 1
         cooldown += cooldown * board.get_rubble(self.attacker.x, self.attacker.y)
         self.attacker.action_cooldown = cooldown
+        return self.attacker.attack_damage
+
 
-        if self.target.health <= 0:
-            self.target.alive = False
+def apply_damage(unit, damage: int) -> None:
+    unit.health -= damage
+    if unit.health <= 0:
+        unit.alive = False
 
 
 class MoveAction(Action):
@@ -50,16 +71,19 @@ class MoveAction(Action):
         self.unit = unit
         self.tile = tile
 
-    def execute(self, board) -> None:
+    def error(self, board) -> str:
         if not self.unit.in_range(self.tile, 1.5):
-            raise Exception("Tile not in range")
+            return "Tile not in range"
         if self.tile.is_occupied():
-            raise Exception("Tile occupied")
+            return "Tile occupied"
         if not self.unit.can_move():
-            raise Exception("Unit on cooldown")
+            return "Unit on cooldown"
         if not self.unit.is_alive():
-            raise Exception("Unit dead")
+            return "Unit dead"
+        return None
 
+    def execute(self, board) -> None:
+        self.check(board)
         cooldown = 1
         cooldown += cooldown * board.get_rubble(self.unit.x, self.unit.y)
         board.remove_occupant(self.unit.x, self.unit.y)
@@ -82,17 +106,65 @@ class DieAction(Action):
         self.unit.player.remove_unit(self.unit)
 
 
+class HealAction(Action):
+    def __init__(self, healer, unit, amount: int = 1) -> None:
+        self.healer = healer
+        self.unit = unit
+        self.amount = amount
+
+    def error(self, board) -> str:
+        if not self.healer.is_alive():
+            return "Healer dead"
+        if not self.unit.is_alive():
+            return "Unit dead"
+        return None
+
+    def execute(self, board) -> None:
+        self.check(board)
+        self.unit.health = min(self.unit.health + self.amount, self.unit.max_health)
+
+
+class HarvestAction(Action):
+    def __init__(self, unit, tile) -> None:
+        self.unit = unit
+        self.tile = tile
+
+    def error(self, board) -> str:
+        if not self.unit.in_range(self.tile, 1.5):
+            return "Tile not in range"
+        if not self.unit.can_act():
+            return "Unit on cooldown"
+        if not self.unit.is_alive():
+            return "Unit dead"
+        return None
+
+    def execute(self, board) -> None:
+        self.check(board)
+        resource = board.get_resource(self.tile.x, self.tile.y)
+        amount = min(resource, self.unit.harvest_rate)
+        board.set_resource(self.tile.x, self.tile.y, resource - amount)
+        self.unit.player.resources += amount
+        self.unit.action_cooldown = 1
+
+
 class SpawnAction(Action):
     def __init__(self, spawner, unit, tile) -> None:
         self.unit = unit
         self.tile = tile
         self.spawner = spawner
 
-    def execute(self, board) -> None:
+    def error(self, board) -> str:
         if self.tile.is_occupied():
-            raise Exception("Tile occupied")
+            return "Tile occupied"
+        if self.spawner.player.resources < self.spawner.spawn_cost:
+            return "Not enough resources"
+        return None
+
+    def execute(self, board) -> None:
+        self.check(board)
+        self.spawner.player.resources -= self.spawner.spawn_cost
         self.unit.x = self.tile.x
         self.unit.y = self.tile.y
         board.set_occupant(self.tile.x, self.tile.y, self.unit)
         self.unit.player.add_unit(self.unit)
-        self.spawner.action_cooldown = 5
+        self.spawner.action_cooldown = self.spawner.player.params.spawn_cooldown
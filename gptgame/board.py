@@ -1,9 +1,24 @@
-from tile import Tile
-from unit import Unit
+import numpy as np
+
+from gptgame.economy import ResourceIndex
+from gptgame.los import LineOfSight
+from gptgame.tile import Tile
+from gptgame.unit import Unit
+
+METRICS = {
+    "manhattan": lambda dx, dy: abs(dx) + abs(dy),
+    "chebyshev": lambda dx, dy: max(abs(dx), abs(dy)),
+    "euclidean": lambda dx, dy: (dx * dx + dy * dy) ** 0.5,
+}
 
 
 class Board:
-    def __init__(self, rubble: list[list[int]], resource: list[list[int]]) -> None:
+    def __init__(
+        self,
+        rubble: list[list[int]],
+        resource: list[list[int]],
+        line_of_sight: bool = True,
+    ) -> None:
         assert len(rubble) == len(resource)
         for i in range(len(rubble)):
             assert len(rubble[i]) == len(resource[i])
@@ -13,6 +28,79 @@ class Board:
             for j in range(len(rubble[i])):
                 row.append(Tile(j, i, rubble[i][j], resource[i][j]))
             self.tiles.append(row)
+        self.rubble_array = np.array(rubble, dtype=np.int8)
+        self.resource_array = np.array(resource, dtype=np.int32)
+        self.los = LineOfSight(self.rubble_array) if line_of_sight else None
+        # (costs, radius, count) -> LandmarkHeuristic, see landmarks.py
+        self.heuristics = {}
+        self.index_resources()
+        self.reset_queries()
+
+    @classmethod
+    def from_static(cls, static, line_of_sight: bool = True) -> "Board":
+        # Board over a StaticMap attached from shared memory: rubble and the
+        # line of sight masks are read-only views of it, tiles and resources
+        # are private to this board
+        board = cls.__new__(cls)
+        rubble = static.rubble.tolist()
+        resource = static.resource.tolist()
+        board.tiles = [
+            [Tile(x, y, rubble[y][x], resource[y][x]) for x in range(len(rubble[y]))]
+            for y in range(len(rubble))
+        ]
+        board.rubble_array = static.rubble
+        board.resource_array = static.resource.copy()
+        board.los = (
+            LineOfSight(static.rubble, static.radius, static.visibility)
+            if line_of_sight
+            else None
+        )
+        board.heuristics = static.heuristics
+        board.index_resources()
+        board.reset_queries()
+        return board
+
+    def index_resources(self) -> None:
+        self.resource_index = ResourceIndex(self.width(), self.height())
+        for row in self.tiles:
+            for tile in row:
+                self.resource_index.update(tile.x, tile.y, tile.resource)
+
+    def reset_queries(self) -> None:
+        # Memoized spatial queries. Neighbourhoods never change and are kept
+        # for good; anything depending on occupants is keyed by (x, y,
+        # radius, filter) and dropped whenever occupancy_version moves on.
+        self.occupancy_version = 0
+        self.neighbourhoods = {}
+        self.queries = {}
+        self.queries_version = 0
+        self.query_hits = 0
+        self.query_misses = 0
+
+    def query_stats(self) -> dict:
+        return {
+            "hits": self.query_hits,
+            "misses": self.query_misses,
+            "neighbourhoods": len(self.neighbourhoods),
+            "queries": len(self.queries),
+        }
+
+    def copy(self) -> "Board":
+        # Static layers (rubble, line of sight, landmark heuristics) are
+        # shared with the copy; tiles and resources are private to it.
+        # Occupants are left empty.
+        board = Board.__new__(Board)
+        board.tiles = [
+            [Tile(tile.x, tile.y, tile.rubble, tile.resource) for tile in row]
+            for row in self.tiles
+        ]
+        board.rubble_array = self.rubble_array
+        board.resource_array = self.resource_array.copy()
+        board.los = self.los
+        board.heuristics = self.heuristics
+        board.resource_index = self.resource_index.copy()
+        board.reset_queries()
+        return board
 
     def width(self) -> int:
         return len(self.tiles[0])
@@ -33,11 +121,13 @@ class Board:
         if self.is_occupied(x, y):
             raise Exception("Tile already occupied")
         self.tiles[y][x].occupant = unit
+        self.occupancy_version += 1
 
     def remove_occupant(self, x: int, y: int) -> None:
         if not self.is_occupied(x, y):
             raise Exception("Tile not occupied")
         self.tiles[y][x].occupant = None
+        self.occupancy_version += 1
 
     def get_rubble(self, x: int, y: int) -> int:
         rubble = self.tiles[y][x].rubble
@@ -52,10 +142,25 @@ class Board:
         # if not 0 <= resource <= 100:
             # raise Exception(f"Invalid resource: {resource}")
         self.tiles[y][x].resource = resource
+        self.resource_array[y, x] = resource
+        self.resource_index.update(x, y, resource)
 
-    def tiles_in_radius(self, x: int, y: int, radius: int) -> list:
+    def has_line_of_sight(self, x0: int, y0: int, x1: int, y1: int) -> bool:
+        if self.los is None:
+            return True
+        return self.los.visible(x0, y0, x1, y1)
+
+    def neighbours(self, x: int, y: int, radius) -> tuple:
+        # Tiles within radius of (x, y), excluding it. Shared between
+        # callers, so it is a tuple; tiles_in_radius hands out lists.
+        key = (x, y, radius)
+        tiles = self.neighbourhoods.get(key)
+        if tiles is not None:
+            self.query_hits += 1
+            return tiles
+        self.query_misses += 1
         rounded_radius = int(radius) + 1
-        tiles = []
+        found = []
         radius_squared = radius**2
         for i in range(-rounded_radius, rounded_radius + 1):
             for j in range(-rounded_radius, rounded_radius + 1):
@@ -68,22 +173,121 @@ class Board:
                     and y + j < self.height()
                 ):
                     if i**2 + j**2 <= radius_squared:
-                        tiles.append(self.get_tile(x + i, y + j))
+                        found.append(self.get_tile(x + i, y + j))
+        tiles = tuple(found)
+        self.neighbourhoods[key] = tiles
         return tiles
 
+    def tiles_in_radius(self, x: int, y: int, radius: int) -> list:
+        return list(self.neighbours(x, y, radius))
+
+    def query(self, x: int, y: int, radius, filter: str, compute) -> list:
+        # compute() is only called on a miss; callers get their own list
+        if self.queries_version != self.occupancy_version:
+            self.queries.clear()
+            self.queries_version = self.occupancy_version
+        key = (x, y, radius, filter)
+        tiles = self.queries.get(key)
+        if tiles is None:
+            self.query_misses += 1
+            tiles = tuple(compute())
+            self.queries[key] = tiles
+        else:
+            self.query_hits += 1
+        return list(tiles)
+
     def occupied_tiles_in_radius(self, x: int, y: int, radius: int) -> list:
+        return self.query(
+            x,
+            y,
+            radius,
+            "occupied",
+            lambda: [
+                tile for tile in self.neighbours(x, y, radius) if tile.occupant is not None
+            ],
+        )
+
+    def visible_occupied_tiles_in_radius(self, x: int, y: int, radius: int) -> list:
+        # Occupied tiles within radius that (x, y) can see
+        return self.query(
+            x,
+            y,
+            radius,
+            "visible",
+            lambda: [
+                tile
+                for tile in self.occupied_tiles_in_radius(x, y, radius)
+                if self.has_line_of_sight(x, y, tile.x, tile.y)
+            ],
+        )
+
+    def ring(self, x: int, y: int, r: int) -> list:
+        # On-board tiles at Chebyshev distance exactly r from (x, y)
         tiles = []
-        for tile in self.tiles_in_radius(x, y, radius):
-            if tile.occupant is not None:
-                tiles.append(tile)
+        width, height = self.width(), self.height()
+        for ty in (y - r, y + r):
+            if 0 <= ty < height:
+                for tx in range(max(x - r, 0), min(x + r, width - 1) + 1):
+                    tiles.append(self.tiles[ty][tx])
+        for tx in (x - r, x + r):
+            if 0 <= tx < width:
+                for ty in range(max(y - r + 1, 0), min(y + r - 1, height - 1) + 1):
+                    tiles.append(self.tiles[ty][tx])
         return tiles
 
+    def nearest_units(
+        self,
+        x: int,
+        y: int,
+        k: int = 1,
+        player=None,
+        max_radius=None,
+        metric: str = "euclidean",
+        exclude_player=None,
+    ) -> list:
+        # Up to k living units nearest to (x, y), nearest first, not counting
+        # one on (x, y) itself. Walks square rings outwards; every metric is
+        # at least the ring number, so the walk stops once the k-th unit
+        # found is nearer than the next ring. Ties go to the lowest (y, x).
+        if k <= 0:
+            return []
+        distance = METRICS[metric]
+        limit = max(x, y, self.width() - 1 - x, self.height() - 1 - y)
+        if max_radius is not None:
+            limit = min(limit, int(max_radius))
+        found = []
+        for r in range(1, limit + 1):
+            for tile in self.ring(x, y, r):
+                unit = tile.occupant
+                if unit is None or not unit.is_alive():
+                    continue
+                if player is not None and unit.player != player:
+                    continue
+                if exclude_player is not None and unit.player == exclude_player:
+                    continue
+                d = distance(tile.x - x, tile.y - y)
+                if max_radius is not None and d > max_radius:
+                    continue
+                found.append((d, tile.y, tile.x, unit))
+            if len(found) >= k:
+                found.sort(key=lambda item: item[:3])
+                if found[k - 1][0] < r + 1:
+                    break
+        found.sort(key=lambda item: item[:3])
+        return [item[3] for item in found[:k]]
+
     def resource_tiles_in_radius(self, x: int, y: int, radius: int) -> list:
-        tiles = []
-        for tile in self.tiles_in_radius(x, y, radius):
-            if tile.resource > 0:
-                tiles.append(tile)
-        return tiles
+        return [
+            self.get_tile(tx, ty)
+            for tx, ty in self.resource_index.in_radius(x, y, radius)
+            if (tx, ty) != (x, y)
+        ]
+
+    def nearest_resource_tile(self, x: int, y: int, max_radius=None) -> Tile:
+        position = self.resource_index.nearest(x, y, max_radius)
+        if position is None:
+            return None
+        return self.get_tile(*position)
 
     def adjacent_tiles(self, x: int, y: int) -> list:
         return self.tiles_in_radius(x, y, 1.5)
@@ -0,0 +1,120 @@
+import os
+import pickle
+import random
+
+from gptgame.board import Board
+from gptgame.game import Game
+from gptgame.match import unit_class
+from gptgame.player import Player
+from gptgame.tile import Tile
+from gptgame.unit import Unit
+
+VERSION = 1
+# Unit attributes rebuilt on load instead of stored
+TRANSIENT = ("player", "rng", "perception", "reservations")
+
+
+def encode_value(value):
+    # Tiles and unit classes are stored by position and by name
+    if isinstance(value, Tile):
+        return ("tile", value.x, value.y)
+    if isinstance(value, type) and issubclass(value, Unit):
+        return ("class", value.__name__)
+    return value
+
+
+def decode_value(value, board: Board):
+    if isinstance(value, tuple) and len(value) == 3 and value[0] == "tile":
+        return board.get_tile(value[1], value[2])
+    if isinstance(value, tuple) and len(value) == 2 and value[0] == "class":
+        return unit_class(value[1])
+    return value
+
+
+def snapshot(game, extra: dict = None) -> dict:
+    board = game.board
+    players = []
+    for player in (game.player1, game.player2):
+        units = []
+        for unit in player.get_units():
+            state = {
+                name: encode_value(value)
+                for name, value in unit.__dict__.items()
+                if name not in TRANSIENT
+            }
+            units.append((type(unit).__name__, state))
+        players.append(
+            {
+                "id": player.id,
+                "resources": player.resources,
+                "color": player.color,
+                "params": player.params,
+                "units": units,
+            }
+        )
+    return {
+        "version": VERSION,
+        "turn": game.turn,
+        "seed": game.seed,
+        "next_unit_id": game.next_unit_id,
+        "winner": None if game.winner is None else game.winner.id,
+        "rng": game.rng.getstate(),
+        "rubble": board.rubble_array,
+        "resource": board.resource_array,
+        "line_of_sight": board.los is not None,
+        "players": players,
+        "extra": extra or {},
+    }
+
+
+def restore(state: dict):
+    if state["version"] != VERSION:
+        raise Exception(f"Unsupported checkpoint version {state['version']}")
+    board = Board(
+        state["rubble"].tolist(), state["resource"].tolist(), state["line_of_sight"]
+    )
+    players = []
+    for player_state in state["players"]:
+        player = Player(player_state["id"])
+        player.resources = player_state["resources"]
+        player.params = player_state["params"]
+        for name, unit_state in player_state["units"]:
+            cls = unit_class(name)
+            unit = cls.__new__(cls)
+            unit.__dict__.update(
+                {key: decode_value(value, board) for key, value in unit_state.items()}
+            )
+            unit.player = player
+            unit.rng = random
+            unit.perception = None
+            unit.reservations = None
+            if unit.is_alive():
+                board.set_occupant(unit.x, unit.y, unit)
+            player.add_unit(unit)
+        players.append(player)
+
+    game = Game(players[0], players[1], board, state["seed"])
+    for player, player_state in zip(players, state["players"]):
+        player.color = tuple(player_state["color"])
+    game.turn = state["turn"]
+    game.next_unit_id = state["next_unit_id"]
+    game.rng.streams = {}
+    game.rng.setstate(state["rng"])
+    if state["winner"] is not None:
+        game.winner = players[0] if players[0].id == state["winner"] else players[1]
+    return game, state["extra"]
+
+
+def save(game, path: str, extra: dict = None) -> None:
+    # Written next to path and renamed over it, so a crash mid-write leaves
+    # the previous checkpoint intact
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        pickle.dump(snapshot(game, extra), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary, path)
+
+
+def load(path: str):
+    with open(path, "rb") as f:
+        state = pickle.load(f)
+    return restore(state)
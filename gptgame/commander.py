@@ -0,0 +1,193 @@
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from gptgame.match import unit_class
+from gptgame.policy import Policy, ScriptedPolicy, UnitBatch
+from gptgame.rng import GameRNG
+
+# Soldier classes whose move/act work on any soldier, used as the
+# commander's high-level options and as rollout policies
+DEFAULT_STRATEGIES = ("Soldier1", "Soldier21", "Soldier3", "Soldier52", "Soldier7")
+
+
+class Node:
+    def __init__(self, strategy: str = None, parent: "Node" = None) -> None:
+        self.strategy = strategy
+        self.parent = parent
+        self.children = {}
+        self.visits = 0
+        self.value = 0.0
+
+    def ucb(self, exploration: float) -> float:
+        if self.visits == 0:
+            return math.inf
+        return self.value / self.visits + exploration * math.sqrt(
+            math.log(self.parent.visits) / self.visits
+        )
+
+
+class SearchSettings:
+    def __init__(
+        self,
+        strategies=DEFAULT_STRATEGIES,
+        time_budget: float = 0.1,
+        segment: int = 5,
+        tree_depth: int = 3,
+        rollout_depth: int = 30,
+        exploration: float = 1.4,
+        max_simulations: int = None,
+    ) -> None:
+        self.strategies = tuple(strategies)
+        # Seconds of search per decision
+        self.time_budget = time_budget
+        # Turns a strategy is followed before the next decision point
+        self.segment = segment
+        self.tree_depth = tree_depth
+        # Total simulated turns per simulation, tree part included
+        self.rollout_depth = rollout_depth
+        self.exploration = exploration
+        self.max_simulations = max_simulations
+
+
+def evaluate(game, player_id: int) -> float:
+    # 1 for a win, 0 for a loss, otherwise the share of total health held
+    winner = game.get_winner()
+    if winner is not None:
+        return 1.0 if winner.id == player_id else 0.0
+    own = 0
+    total = 0
+    for unit in game.all_units():
+        total += unit.health
+        if unit.player.id == player_id:
+            own += unit.health
+    if total == 0:
+        return 0.5
+    return own / total
+
+
+def simulate(game, player_id: int, strategy: str, turns: int) -> int:
+    # Following the same strategy again keeps its units' AI state
+    policy = game.controllers.get(player_id)
+    if not isinstance(policy, ScriptedPolicy) or policy.unit_class is not unit_class(strategy):
+        game.controllers[player_id] = ScriptedPolicy(unit_class(strategy))
+    for played in range(turns):
+        game.update()
+        game.check_for_winner()
+        if game.get_winner() is not None:
+            return played + 1
+    return turns
+
+
+def search(root_game, player_id: int, settings: SearchSettings, seed: int):
+    # UCT over sequences of strategies, one decision every segment turns.
+    # Returns ({strategy: (visits, value)}, simulations, simulated turns).
+    rng = random.Random(seed)
+    root = Node()
+    deadline = time.perf_counter() + settings.time_budget
+    simulations = 0
+    turns = 0
+    while time.perf_counter() < deadline:
+        if settings.max_simulations is not None and simulations >= settings.max_simulations:
+            break
+        game = root_game.clone()
+        game.rng = GameRNG(rng.randrange(2**32))
+        node = root
+        depth = 0
+        while depth < settings.tree_depth and game.get_winner() is None:
+            untried = [s for s in settings.strategies if s not in node.children]
+            if untried:
+                strategy = rng.choice(untried)
+                node.children[strategy] = Node(strategy, node)
+                node = node.children[strategy]
+                turns += simulate(game, player_id, strategy, settings.segment)
+                depth += 1
+                break
+            node = max(
+                node.children.values(),
+                key=lambda child: child.ucb(settings.exploration),
+            )
+            turns += simulate(game, player_id, node.strategy, settings.segment)
+            depth += 1
+
+        remaining = settings.rollout_depth - depth * settings.segment
+        while remaining > 0 and game.get_winner() is None:
+            strategy = rng.choice(settings.strategies)
+            turns += simulate(
+                game, player_id, strategy, min(settings.segment, remaining)
+            )
+            remaining -= settings.segment
+
+        reward = evaluate(game, player_id)
+        while node is not None:
+            node.visits += 1
+            node.value += reward
+            node = node.parent
+        simulations += 1
+
+    stats = {
+        strategy: (child.visits, child.value)
+        for strategy, child in root.children.items()
+    }
+    return stats, simulations, turns
+
+
+class MCTSCommander(Policy):
+    # Picks, every turn, which Soldier behaviour the whole army follows by
+    # searching over cloned games. The opponent is modelled by its units'
+    # own AI. With workers > 0 each worker process runs an independent
+    # search on a copy of the game and their root statistics are summed.
+    def __init__(self, settings: SearchSettings = None, workers: int = 0, seed: int = 0) -> None:
+        self.settings = settings or SearchSettings()
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(workers) if workers > 0 else None
+        self.rng = random.Random(seed)
+        self.strategy = None
+        # strategy -> ScriptedPolicy playing it, so its AI state persists
+        self.scripted = {}
+        self.simulations = 0
+        self.simulated_turns = 0
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def search(self, game, player_id: int) -> dict:
+        root = game.clone()
+        if self.executor is None:
+            results = [search(root, player_id, self.settings, self.rng.randrange(2**32))]
+        else:
+            futures = [
+                self.executor.submit(
+                    search, root, player_id, self.settings, self.rng.randrange(2**32)
+                )
+                for _ in range(self.workers)
+            ]
+            results = [future.result() for future in futures]
+
+        totals = {}
+        for stats, simulations, turns in results:
+            self.simulations += simulations
+            self.simulated_turns += turns
+            for strategy, (visits, value) in stats.items():
+                old_visits, old_value = totals.get(strategy, (0, 0.0))
+                totals[strategy] = (old_visits + visits, old_value + value)
+        return totals
+
+    def decide(self, batch: UnitBatch):
+        if len(batch) > 0:
+            totals = self.search(batch.game, batch.player.id)
+            if totals:
+                # Most visited, ties broken by mean value
+                self.strategy = max(
+                    totals,
+                    key=lambda s: (totals[s][0], totals[s][1] / max(totals[s][0], 1)),
+                )
+        strategy = self.strategy or self.settings.strategies[0]
+        policy = self.scripted.get(strategy)
+        if policy is None:
+            policy = ScriptedPolicy(unit_class(strategy))
+            self.scripted[strategy] = policy
+        return policy.decide(batch)
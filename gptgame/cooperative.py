@@ -0,0 +1,181 @@
+import heapq
+
+from gptgame import pathfinding
+from gptgame.pathfinding import STATS, PathStats
+
+
+class ReservationTable:
+    # Space-time reservations of one player's units for the current turn.
+    # Units plan one at a time in turn order, which is also the order their
+    # moves execute in, and each avoids the cells and moves reserved before
+    # it. Step t = 0 is the unit's position now; only steps up to window are
+    # planned, the rest of the way is left to the heuristic.
+    def __init__(self, window: int = 8) -> None:
+        self.window = window
+        # (x, y, t) -> id of the unit there at step t
+        self.cells = {}
+        # (x0, y0, x1, y1, t): a unit moves from (x0, y0) to (x1, y1) between
+        # steps t and t + 1
+        self.moves = set()
+        self.planned = set()
+
+    def __len__(self) -> int:
+        return len(self.planned)
+
+    def reserve(self, unit, path: list) -> None:
+        # path holds the unit's tile at steps 0, 1, ...; its last tile stays
+        # reserved for the rest of the window
+        self.planned.add(unit.id)
+        last = path[-1]
+        for t in range(self.window + 1):
+            tile = path[t] if t < len(path) else last
+            self.cells[tile.x, tile.y, t] = unit.id
+            if 0 < t < len(path):
+                previous = path[t - 1]
+                self.moves.add((previous.x, previous.y, tile.x, tile.y, t - 1))
+
+    def is_free(self, x: int, y: int, t: int, unit) -> bool:
+        owner = self.cells.get((x, y, t))
+        return owner is None or owner == unit.id
+
+    def blocks_move(self, x0: int, y0: int, x1: int, y1: int, t: int) -> bool:
+        # Two units swapping tiles would pass through each other
+        return (x1, y1, x0, y0, t) in self.moves
+
+    def blocks_tile(self, tile, unit, goal) -> bool:
+        # Tiles held by units that have not planned (enemies, spawners and
+        # units that are not moving) are obstacles for the whole window
+        occupant = tile.occupant
+        # By id, as a ScriptedPolicy may plan for a unit through a stand-in
+        if occupant is None or occupant.id == unit.id or (tile.x, tile.y) == goal:
+            return False
+        return occupant.id not in self.planned
+
+    def allows(self, unit, path: list) -> bool:
+        # Whether path, held at its last tile, avoids every reservation
+        last = path[-1]
+        for t in range(1, self.window + 1):
+            tile = path[t] if t < len(path) else last
+            if not self.is_free(tile.x, tile.y, t, unit):
+                return False
+            if t < len(path):
+                previous = path[t - 1]
+                if self.blocks_move(previous.x, previous.y, tile.x, tile.y, t - 1):
+                    return False
+        return True
+
+    def vacated(self, tile) -> bool:
+        # Whether the unit on tile has planned to leave it by the next step,
+        # so a unit moving later in the turn can step in
+        occupant = tile.occupant
+        if occupant is None:
+            return True
+        if occupant.id not in self.planned:
+            return False
+        return self.cells.get((tile.x, tile.y, 1)) != occupant.id
+
+
+class SpaceTimeNode:
+    def __init__(self, priority, tile, t) -> None:
+        self.priority = priority
+        self.tile = tile
+        self.t = t
+
+    def __lt__(self, other):
+        return self.priority < other.priority
+
+
+def find_path(
+    board,
+    unit,
+    goal: tuple[int, int],
+    table: ReservationTable,
+    cost,
+    heuristic,
+    radius: float = 1,
+    max_expansions: int = None,
+    stats: PathStats = STATS,
+) -> list:
+    # Windowed cooperative A* (WHCA*): searches over (tile, step) with
+    # waiting allowed, around the reservations already in table, until
+    # reaching the goal or the end of the window. Reserves and returns the
+    # unit's tile at every step, so path[1] may be its own tile when the
+    # best plan is to wait. Returns None, reserving nothing, if no plan was
+    # found; the unit then blocks its tile for later planners.
+    # Most units are not in anyone's way, so first try the ordinary path
+    # around occupied tiles, which costs a fraction of the space-time search
+    path = pathfinding.find_path(
+        board,
+        (unit.x, unit.y),
+        goal,
+        cost,
+        heuristic,
+        radius,
+        True,
+        max_expansions,
+        stats=stats,
+    )
+    if path is not None and table.allows(unit, path):
+        table.reserve(unit, path)
+        return path
+
+    start = board.get_tile(unit.x, unit.y)
+    window = table.window
+    frontier = [SpaceTimeNode(heuristic(goal, start), start, 0)]
+    came_from = {(start, 0): None}
+    cost_so_far = {(start, 0): 0}
+    best = None
+    best_h = None
+    expansions = 0
+    end = None
+    stats.cooperative_searches += 1
+
+    while frontier:
+        node = heapq.heappop(frontier)
+        current, t = node.tile, node.t
+        if (current.x, current.y) == goal or t == window:
+            end = (current, t)
+            break
+        if max_expansions is not None and expansions >= max_expansions:
+            stats.budget_hits += 1
+            end = best
+            break
+
+        expansions += 1
+        h = heuristic(goal, current)
+        if best is None or h < best_h:
+            best, best_h = (current, t), h
+        g = cost_so_far[current, t]
+        # Waiting costs as much as entering the tile again. Any cheaper and,
+        # with a heuristic that underestimates, running out the window in
+        # place looks better than progress over rubble.
+        options = [(current, cost(current))]
+        options.extend(
+            (tile, cost(tile)) for tile in board.neighbours(current.x, current.y, radius)
+        )
+        for next_tile, step in options:
+            if table.blocks_tile(next_tile, unit, goal):
+                continue
+            if not table.is_free(next_tile.x, next_tile.y, t + 1, unit):
+                continue
+            if table.blocks_move(current.x, current.y, next_tile.x, next_tile.y, t):
+                continue
+            key = (next_tile, t + 1)
+            new_cost = g + step
+            if key not in cost_so_far or new_cost < cost_so_far[key]:
+                cost_so_far[key] = new_cost
+                came_from[key] = (current, t)
+                priority = new_cost + heuristic(goal, next_tile)
+                heapq.heappush(frontier, SpaceTimeNode(priority, next_tile, t + 1))
+
+    stats.expansions += expansions
+    if end is None:
+        stats.unreachable += 1
+        return None
+    path = []
+    while end is not None:
+        path.append(end[0])
+        end = came_from[end]
+    path.reverse()
+    table.reserve(unit, path)
+    return path
@@ -0,0 +1,94 @@
+class ResourceIndex:
+    # Sparse index of tiles holding resource, bucketed so radius and
+    # nearest queries only touch buckets near the query point
+    def __init__(self, width: int, height: int, bucket_size: int = 4) -> None:
+        self.width = width
+        self.height = height
+        self.bucket_size = bucket_size
+        self.amounts = {}
+        self.buckets = {}
+
+    def copy(self) -> "ResourceIndex":
+        index = ResourceIndex(self.width, self.height, self.bucket_size)
+        index.amounts = dict(self.amounts)
+        index.buckets = {bucket: set(keys) for bucket, keys in self.buckets.items()}
+        return index
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    def bucket(self, x: int, y: int) -> tuple[int, int]:
+        return x // self.bucket_size, y // self.bucket_size
+
+    def update(self, x: int, y: int, amount: int) -> None:
+        key = (x, y)
+        if amount > 0:
+            if key not in self.amounts:
+                self.buckets.setdefault(self.bucket(x, y), set()).add(key)
+            self.amounts[key] = amount
+        elif key in self.amounts:
+            del self.amounts[key]
+            bucket = self.bucket(x, y)
+            self.buckets[bucket].discard(key)
+            if not self.buckets[bucket]:
+                del self.buckets[bucket]
+
+    def get(self, x: int, y: int) -> int:
+        return self.amounts.get((x, y), 0)
+
+    def in_radius(self, x: int, y: int, radius) -> list[tuple[int, int]]:
+        radius_squared = radius**2
+        r = int(radius)
+        bx0, by0 = self.bucket(max(x - r, 0), max(y - r, 0))
+        bx1, by1 = self.bucket(x + r, y + r)
+        found = []
+        for by in range(by0, by1 + 1):
+            for bx in range(bx0, bx1 + 1):
+                for tx, ty in self.buckets.get((bx, by), ()):
+                    if (tx - x) ** 2 + (ty - y) ** 2 <= radius_squared:
+                        found.append((tx, ty))
+        found.sort(key=lambda key: (key[1], key[0]))
+        return found
+
+    def nearest(self, x: int, y: int, max_radius=None, exclude=()) -> tuple[int, int]:
+        # Walk bucket rings outwards; after ring k every unvisited tile is at
+        # least k * bucket_size + 1 away, which bounds the search
+        if not self.amounts:
+            return None
+        bx, by = self.bucket(x, y)
+        max_ring = max(
+            self.width // self.bucket_size + 1, self.height // self.bucket_size + 1
+        )
+        best = None
+        best_key = None
+        for ring in range(max_ring + 1):
+            for cell in self.ring(bx, by, ring):
+                for tx, ty in self.buckets.get(cell, ()):
+                    if (tx, ty) in exclude:
+                        continue
+                    key = ((tx - x) ** 2 + (ty - y) ** 2, ty, tx)
+                    if best_key is None or key < best_key:
+                        best_key = key
+                        best = (tx, ty)
+            bound = ring * self.bucket_size + 1
+            if best_key is not None and best_key[0] < bound**2:
+                break
+            if max_radius is not None and bound > max_radius:
+                break
+        if best is None:
+            return None
+        if max_radius is not None and best_key[0] > max_radius**2:
+            return None
+        return best
+
+    def ring(self, bx: int, by: int, ring: int) -> list[tuple[int, int]]:
+        if ring == 0:
+            return [(bx, by)]
+        cells = []
+        for i in range(-ring, ring + 1):
+            cells.append((bx + i, by - ring))
+            cells.append((bx + i, by + ring))
+        for i in range(-ring + 1, ring):
+            cells.append((bx - ring, by + i))
+            cells.append((bx + ring, by + i))
+        return cells
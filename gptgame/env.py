@@ -0,0 +1,129 @@
+import numpy as np
+
+from gptgame.action import IdleAction, MoveAction
+from gptgame.maps import get_map
+from gptgame.match import create_game
+from gptgame.observation import CHANNELS, unit_crops, unit_positions, write_observation
+from gptgame.pipeline import Stage
+
+# Per-tile action codes for the learner's units
+USE_AI = -1
+STAY = 0
+DIRECTIONS = ((0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1))
+
+
+class ExternalMoveStage(Stage):
+    # Decides the moves of player's units from the direction code found under
+    # each unit in actions (H, W). Runs before the decision stage, so the
+    # unit AI only decides attacks for the units given a code; units that
+    # aren't controllable (the Spawner) are left alone.
+    name = "external_moves"
+
+    def __init__(self, player, actions: np.ndarray) -> None:
+        self.player = player
+        self.actions = actions
+
+    def run(self, turn) -> None:
+        board = turn.board
+        width, height = board.width(), board.height()
+        for unit in turn.units:
+            if unit.player is not self.player or not unit.controllable:
+                continue
+            code = self.actions[unit.y, unit.x]
+            if code == USE_AI:
+                continue
+            if code == STAY or not unit.can_move():
+                turn.moves[unit] = IdleAction(unit)
+                continue
+            dx, dy = DIRECTIONS[code - 1]
+            x, y = unit.x + dx, unit.y + dy
+            if 0 <= x < width and 0 <= y < height:
+                turn.moves[unit] = MoveAction(unit, board.get_tile(x, y))
+            else:
+                turn.moves[unit] = IdleAction(unit)
+
+
+class VecEnv:
+    # N games stepped in lockstep. The learner plays player 1 of each game;
+    # observations, rewards and dones are preallocated and overwritten by
+    # every step, so copy them if they need to outlive it.
+    def __init__(
+        self,
+        num_envs: int,
+        map_name: str = "default",
+        learner_unit: str = "Soldier21",
+        opponent_unit: str = "Soldier6",
+        seed: int = 0,
+        max_turns: int = 1000,
+    ) -> None:
+        self.num_envs = num_envs
+        self.map_name = map_name
+        self.learner_unit = learner_unit
+        self.opponent_unit = opponent_unit
+        self.max_turns = max_turns
+        self.next_seed = seed
+        self.games = [None] * num_envs
+        self.stages = [None] * num_envs
+        self.scores = np.zeros(num_envs, dtype=np.int32)
+
+        rubble, _ = get_map(map_name)
+        height, width = len(rubble), len(rubble[0])
+        self.channels = CHANNELS
+        self.observations = np.zeros(
+            (num_envs, len(CHANNELS), height, width), dtype=np.float32
+        )
+        self.actions = np.full((num_envs, height, width), USE_AI, dtype=np.int8)
+        self.rewards = np.zeros(num_envs, dtype=np.float32)
+        self.dones = np.zeros(num_envs, dtype=bool)
+
+    def reset(self) -> np.ndarray:
+        for i in range(self.num_envs):
+            self.reset_env(i)
+        return self.observations
+
+    def reset_env(self, i: int) -> None:
+        game = create_game(
+            self.map_name, self.learner_unit, self.opponent_unit, seed=self.next_seed
+        )
+        self.next_seed += 1
+        stage = ExternalMoveStage(game.player1, self.actions[i])
+        game.pipeline.register(stage, before="decision")
+        self.games[i] = game
+        self.stages[i] = stage
+        self.scores[i] = self.score(game)
+        write_observation(game, game.player1, self.observations[i])
+
+    def unit_observations(self, i: int, radius: int, mask_disk: bool = True):
+        # Local views of env i's learner units, cut from its latest observation
+        units = self.games[i].player1.get_units()
+        positions = unit_positions(units)
+        crops = unit_crops(self.observations[i], positions, radius, mask_disk)
+        return units, crops
+
+    def score(self, game) -> int:
+        return len(game.player1.get_units()) - len(game.player2.get_units())
+
+    def step(self, actions: np.ndarray = None):
+        # actions: (N, H, W) codes, USE_AI, STAY or 1-8 for DIRECTIONS
+        if actions is not None:
+            np.copyto(self.actions, actions, casting="unsafe")
+        infos = [None] * self.num_envs
+        for i, game in enumerate(self.games):
+            game.update()
+            score = self.score(game)
+            self.rewards[i] = score - self.scores[i]
+            self.scores[i] = score
+            game.check_for_winner()
+            winner = game.get_winner()
+            done = winner is not None or game.turn > self.max_turns
+            self.dones[i] = done
+            if done:
+                infos[i] = {
+                    "seed": game.seed,
+                    "turns": game.turn - 1,
+                    "winner": None if winner is None else winner.id,
+                }
+                self.reset_env(i)
+            else:
+                write_observation(game, game.player1, self.observations[i])
+        return self.observations, self.rewards, self.dones, infos
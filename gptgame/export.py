@@ -0,0 +1,245 @@
+import os
+import queue
+import shutil
+import struct
+import subprocess
+import sys
+import threading
+import zlib
+from collections import deque
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+
+from gptgame.render import Renderer
+
+# Imported by the first Exporter, after the video driver is chosen
+pygame = None
+
+VIDEO_SUFFIXES = (".mp4", ".mkv", ".webm", ".mov", ".avi", ".gif")
+# Frames handed to the writer but not yet written; the simulation only
+# waits on the writer once it falls this far behind
+MAX_PENDING = 32
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def channel_bytes(shifts) -> tuple[int, int, int]:
+    # Byte offsets of red, green and blue within a packed 32-bit pixel
+    offsets = [shift // 8 for shift in shifts[:3]]
+    if sys.byteorder == "big":
+        offsets = [3 - offset for offset in offsets]
+    return tuple(offsets)
+
+
+def png_chunk(tag: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+
+def encode_png(frame: np.ndarray, level: int = 1) -> bytes:
+    # frame is (height, width, 3) RGB. Every row is stored as its difference
+    # from the row above (filter type 2), which turns the mostly repeated
+    # rows of a rendered board into zeros before compression.
+    height, width, _ = frame.shape
+    flat = np.ascontiguousarray(frame).reshape(height, width * 3)
+    rows = np.empty((height, width * 3 + 1), dtype=np.uint8)
+    rows[:, 0] = 2
+    rows[0, 1:] = flat[0]
+    np.subtract(flat[1:], flat[:-1], out=rows[1:, 1:])
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        PNG_SIGNATURE
+        + png_chunk(b"IHDR", header)
+        + png_chunk(b"IDAT", zlib.compress(rows, level))
+        + png_chunk(b"IEND", b"")
+    )
+
+
+# The frame slots of the PngWriter that started this worker process
+_slots = None
+
+
+def attach_slots(memory_name: str, shape: tuple) -> None:
+    global _slots
+    memory = shared_memory.SharedMemory(name=memory_name)
+    _slots = (memory, np.ndarray(shape, np.uint32, buffer=memory.buf))
+
+
+def write_png(path: str, slot: int, channels: tuple) -> None:
+    packed = _slots[1][slot]
+    pixels = packed.view(np.uint8).reshape(packed.shape + (4,))
+    # A channel at a time; indexing all three at once is several times slower
+    frame = np.empty(packed.shape + (3,), dtype=np.uint8)
+    for i, channel in enumerate(channels):
+        frame[..., i] = pixels[..., channel]
+    with open(path, "wb") as f:
+        f.write(encode_png(frame))
+
+
+class PngWriter:
+    # Encodes frames to a numbered PNG sequence in a pool of worker
+    # processes. Frames go through a ring of shared memory slots rather
+    # than being pickled, so handing one over costs a single copy.
+    def __init__(self, directory: str, width: int, height: int, shifts, workers: int = None) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.channels = channel_bytes(shifts)
+        shape = (MAX_PENDING, height, width)
+        self.memory = shared_memory.SharedMemory(create=True, size=MAX_PENDING * height * width * 4)
+        self.slots = np.ndarray(shape, np.uint32, buffer=self.memory.buf)
+        self.pool = Pool(workers, initializer=attach_slots, initargs=(self.memory.name, shape))
+        # (slot, result) of frames being written, oldest first
+        self.pending = deque()
+        self.free = list(range(MAX_PENDING))
+        self.frames = 0
+
+    def write(self, packed: np.ndarray) -> None:
+        if not self.free:
+            slot, result = self.pending.popleft()
+            result.get()
+            self.free.append(slot)
+        slot = self.free.pop()
+        self.slots[slot] = packed
+        path = os.path.join(self.directory, f"frame_{self.frames:05d}.png")
+        result = self.pool.apply_async(write_png, (path, slot, self.channels))
+        self.pending.append((slot, result))
+        self.frames += 1
+
+    def close(self) -> None:
+        while self.pending:
+            self.pending.popleft()[1].get()
+        self.pool.close()
+        self.pool.join()
+        del self.slots
+        self.memory.close()
+        self.memory.unlink()
+
+
+class VideoWriter:
+    # Pipes frames to an ffmpeg process, which reads the packed pixels as
+    # they are. A thread feeds the pipe, so the simulation keeps going while
+    # ffmpeg encodes.
+    def __init__(self, path: str, width: int, height: int, shifts, fps: int) -> None:
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise Exception("exporting video needs ffmpeg; export to a directory for PNG frames")
+        layout = ["0"] * 4
+        for name, offset in zip("rgb", channel_bytes(shifts)):
+            layout[offset] = name
+        command = [
+            ffmpeg, "-loglevel", "error", "-y",
+            "-f", "rawvideo", "-pix_fmt", "".join(layout), "-s", f"{width}x{height}",
+            "-r", str(fps), "-i", "-",
+        ]
+        if not path.lower().endswith(".gif"):
+            command += ["-pix_fmt", "yuv420p"]
+        self.process = subprocess.Popen(command + [path], stdin=subprocess.PIPE)
+        self.frames = 0
+        self.queue = queue.Queue(MAX_PENDING)
+        # Set by the feeding thread if writing to ffmpeg fails, when it stops
+        self.error = None
+        self.thread = threading.Thread(target=self.feed, daemon=True)
+        self.thread.start()
+
+    def feed(self) -> None:
+        try:
+            while True:
+                frame = self.queue.get()
+                if frame is None:
+                    break
+                self.process.stdin.write(memoryview(frame))
+        except OSError as exc:
+            # BrokenPipeError once ffmpeg has exited
+            self.error = exc
+
+    def put(self, item) -> None:
+        # Nothing empties the queue once the thread has stopped, so a full
+        # queue is waited on in short steps that check it is still running
+        while True:
+            if self.error is not None or not self.thread.is_alive():
+                self.fail()
+            try:
+                self.queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def fail(self) -> None:
+        try:
+            self.process.wait(5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        raise Exception(
+            f"ffmpeg stopped reading frames, exited with {self.process.returncode}"
+        ) from self.error
+
+    def write(self, packed: np.ndarray) -> None:
+        self.put(np.array(packed))
+        self.frames += 1
+
+    def close(self) -> None:
+        if self.thread.is_alive():
+            self.put(None)
+            self.thread.join()
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        if self.error is not None:
+            self.fail()
+        if self.process.wait() != 0:
+            raise Exception(f"ffmpeg exited with {self.process.returncode}")
+
+
+class Exporter:
+    # Renders a match off screen and writes one frame per turn, as fast as
+    # the game simulates. A path with a video suffix is encoded by ffmpeg,
+    # anything else is a directory of PNG frames.
+    def __init__(
+        self,
+        game,
+        path: str,
+        fps: int = 20,
+        cell_size: int = 50,
+        debug: bool = False,
+        workers: int = None,
+    ) -> None:
+        global pygame
+        # No window; must be set before pygame initializes its display
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+        import pygame
+
+        self.renderer = Renderer(game, cell_size)
+        self.renderer.debug = debug
+        screen = self.renderer.screen
+        if screen.get_bitsize() != 32:
+            raise Exception(f"can't export {screen.get_bitsize()} bit frames")
+        width, height = screen.get_size()
+        if path.lower().endswith(VIDEO_SUFFIXES):
+            self.writer = VideoWriter(path, width, height, screen.get_shifts(), fps)
+        else:
+            self.writer = PngWriter(path, width, height, screen.get_shifts(), workers)
+
+    def add(self, state_changes, game=None) -> None:
+        if game is not None:
+            self.renderer.game = game
+        self.renderer.draw(state_changes)
+        pixels = pygame.surfarray.pixels2d(self.renderer.screen)
+        # surfarray is indexed [x, y] over memory laid out in rows, so its
+        # transpose is the frame as it is stored: one packed pixel per int
+        self.writer.write(pixels.T)
+        del pixels
+
+    @property
+    def frames(self) -> int:
+        return self.writer.frames
+
+    def close(self) -> None:
+        self.writer.close()
+
+    def __enter__(self) -> "Exporter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
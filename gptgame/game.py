@@ -1,48 +1,127 @@
+import copy
 import random
+import zlib
 
-from action import Action
-from statechange import StateChange
+from gptgame.perception import Perception
+from gptgame.player import Player
+from gptgame.pipeline import Turn, default_pipeline
+from gptgame.rng import GameRNG
+from gptgame.statechange import ActionBuffer, StateChange
+from gptgame.tile import Tile
 
 
 class Game:
-    def __init__(self, player1, player2, gameboard) -> None:
+    def __init__(self, player1, player2, gameboard, seed=None) -> None:
         self.player1 = player1
         self.player2 = player2
         self.turn = 1
         self.board = gameboard
         self.winner = None
-    
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.seed = seed
+        self.rng = GameRNG(seed)
+        self.perception = {}
+        self.pipeline = default_pipeline()
+        # Player id -> Policy deciding for all of that player's units at once
+        self.controllers = {}
+        self.next_unit_id = 1
+        self.actions = ActionBuffer()
+        for unit in self.all_units():
+            self.assign_id(unit)
+        for player in (self.player1, self.player2):
+            player.color = player.random_color(self.rng.stream("colors"))
+
+    def clone(self) -> "Game":
+        # Independent copy of the simulation state for search and rollouts.
+        # Static board data is shared; custom pipeline stages and
+        # controllers are not carried over.
+        game = Game.__new__(Game)
+        game.__dict__.update(self.__dict__)
+        game.board = self.board.copy()
+        game.rng = copy.deepcopy(self.rng)
+        game.perception = {}
+        game.pipeline = default_pipeline()
+        game.controllers = {}
+        game.actions = ActionBuffer()
+        players = {}
+        for player in (self.player1, self.player2):
+            clone = Player.__new__(Player)
+            clone.__dict__.update(player.__dict__)
+            clone._units = []
+            players[player.id] = clone
+        game.player1 = players[self.player1.id]
+        game.player2 = players[self.player2.id]
+        if self.winner is not None:
+            game.winner = players[self.winner.id]
+        for unit in self.all_units():
+            clone = copy.copy(unit)
+            clone.player = players[unit.player.id]
+            clone.perception = None
+            clone.reservations = None
+            for name, value in clone.__dict__.items():
+                if isinstance(value, Tile):
+                    setattr(clone, name, game.board.get_tile(value.x, value.y))
+            if unit.is_alive():
+                game.board.set_occupant(clone.x, clone.y, clone)
+            clone.player.add_unit(clone)
+        return game
+
     def game_dimensions(self):
         return self.board.width(), self.board.height()
 
     def update(self) -> StateChange:
-        state_changes = []
-        units = self.all_units()
-        random.shuffle(units)
-        for unit in units:
-            state_change = unit.take_turn(self.board)
-            for action in reversed(state_change):
-                action.execute(self.board)
-            state_changes.append(state_change)
-
-        # Purge dead units
-        units = self.all_units()
-        for unit in units:
-            if not unit.is_alive():
-                state_change = unit.die()
-                for action in state_change:
-                    action.execute(self.board)
-                state_changes.append(state_change)
-
-        return StateChange(state_changes)
+        turn = self.pipeline.run(Turn(self))
+        self.turn += 1
+        return StateChange(turn.actions.view())
+
+    def perceive(self) -> dict:
+        # One shared visibility grid and enemy list per player per turn
+        self.perception = {
+            self.player1.id: Perception(
+                self.player1, self.board, self.player2.get_units()
+            ),
+            self.player2.id: Perception(
+                self.player2, self.board, self.player1.get_units()
+            ),
+        }
+        return self.perception
+
+    def assign_id(self, unit) -> None:
+        if unit.id is None:
+            unit.id = self.next_unit_id
+            self.next_unit_id += 1
 
     def all_units(self):
         return self.player1.get_units() + self.player2.get_units()
 
+    def checksum(self) -> int:
+        # Order-independent summary of everything the simulation can change
+        units = sorted(
+            (
+                unit.player.id,
+                unit.x,
+                unit.y,
+                unit.__class__.__name__,
+                unit.health,
+                unit.move_cooldown,
+                unit.action_cooldown,
+            )
+            for unit in self.all_units()
+        )
+        resources = [
+            tile.resource for row in self.board.tiles for tile in row
+        ]
+        players = [
+            (player.id, player.resources) for player in (self.player1, self.player2)
+        ]
+        state = repr((self.turn, players, units, resources))
+        return zlib.crc32(state.encode())
+
     def check_for_winner(self):
-        if len(self.player1.units) == 0:
+        if len(self.player1.get_units()) == 0:
             self.winner = self.player2
-        if len(self.player2.units) == 0:
+        if len(self.player2.get_units()) == 0:
             self.winner = self.player1
 
     def get_winner(self):
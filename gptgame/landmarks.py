@@ -0,0 +1,104 @@
+import heapq
+import math
+
+from gptgame.tile import Tile
+
+MAX_RUBBLE = 5
+
+
+def rubble_costs(cost) -> tuple:
+    # Step costs here depend only on a tile's rubble, which never changes,
+    # so a cost function is identified by its cost at each rubble level
+    return tuple(cost(Tile(0, 0, rubble, 0)) for rubble in range(MAX_RUBBLE + 1))
+
+
+def dijkstra(board, source: tuple[int, int], costs: tuple, radius: float, reverse: bool = False) -> list:
+    # Cheapest cost from source to every tile, indexed y * width + x, where
+    # entering a tile costs costs[rubble]. With reverse, the cost from every
+    # tile to source instead.
+    width = board.width()
+    distances = [math.inf] * (width * board.height())
+    distances[source[1] * width + source[0]] = 0
+    frontier = [(0, source[0], source[1])]
+    while frontier:
+        distance, x, y = heapq.heappop(frontier)
+        if distance > distances[y * width + x]:
+            continue
+        exit_cost = costs[board.get_tile(x, y).rubble]
+        for tile in board.neighbours(x, y, radius):
+            step = exit_cost if reverse else costs[tile.rubble]
+            index = tile.y * width + tile.x
+            if distance + step < distances[index]:
+                distances[index] = distance + step
+                heapq.heappush(frontier, (distance + step, tile.x, tile.y))
+    return distances
+
+
+class LandmarkHeuristic:
+    # ALT lower bound: for a landmark L, by the triangle inequality
+    # d(v, goal) >= d(L, goal) - d(L, v) and d(v, goal) >= d(v, L) - d(goal, L).
+    # The best bound over a few far apart landmarks is admissible and
+    # consistent, and unlike a plain distance it knows about rubble.
+    def __init__(self, board, costs: tuple, radius: float, count: int = 4) -> None:
+        self.width = board.width()
+        self.costs = costs
+        self.radius = radius
+        self.landmarks = []
+        # (cost from the landmark, cost to the landmark) per landmark
+        self.tables = []
+        # Farthest point selection, starting from the tile farthest from a corner
+        farthest = dijkstra(board, (0, 0), costs, radius)
+        for _ in range(count):
+            index = max(
+                (i for i in range(len(farthest)) if farthest[i] < math.inf),
+                key=lambda i: farthest[i],
+            )
+            landmark = (index % self.width, index // self.width)
+            if landmark in self.landmarks:
+                break
+            forward = dijkstra(board, landmark, costs, radius)
+            backward = dijkstra(board, landmark, costs, radius, reverse=True)
+            self.landmarks.append(landmark)
+            self.tables.append((forward, backward))
+            farthest = forward if len(self.landmarks) == 1 else [
+                min(a, b) for a, b in zip(farthest, forward)
+            ]
+
+    def __call__(self, goal, tile) -> float:
+        g = goal[1] * self.width + goal[0]
+        v = tile.y * self.width + tile.x
+        best = 0
+        for forward, backward in self.tables:
+            if forward[g] == math.inf:
+                continue
+            if forward[v] == math.inf:
+                # Different components, so the goal can't be reached
+                return math.inf
+            bound = max(forward[g] - forward[v], backward[v] - backward[g])
+            if bound > best:
+                best = bound
+        return best
+
+
+# (rubble bytes, shape, costs, radius, count) -> LandmarkHeuristic, shared
+# by every board of the same map in this process
+_heuristics = {}
+
+
+def landmark_heuristic(board, cost, radius: float = 1, count: int = 4) -> LandmarkHeuristic:
+    return heuristic_for_costs(board, rubble_costs(cost), radius, count)
+
+
+def heuristic_for_costs(board, costs: tuple, radius: float = 1, count: int = 4) -> LandmarkHeuristic:
+    # Looked up on the board first, whose cache copies and boards over the
+    # same StaticMap share, and only hashing the rubble on a miss there
+    key = (costs, radius, count)
+    heuristic = board.heuristics.get(key)
+    if heuristic is None:
+        map_key = (board.rubble_array.tobytes(), board.rubble_array.shape) + key
+        heuristic = _heuristics.get(map_key)
+        if heuristic is None:
+            heuristic = LandmarkHeuristic(board, costs, radius, count)
+            _heuristics[map_key] = heuristic
+        board.heuristics[key] = heuristic
+    return heuristic
@@ -0,0 +1,151 @@
+import numpy as np
+
+from gptgame.perception import disk_mask
+
+
+def bresenham(dx: int, dy: int) -> list[tuple[int, int]]:
+    # Cells strictly between (0, 0) and (dx, dy)
+    cells = []
+    x, y = 0, 0
+    step_x = 1 if dx > 0 else -1
+    step_y = 1 if dy > 0 else -1
+    adx, ady = abs(dx), abs(dy)
+    err = adx - ady
+    while (x, y) != (dx, dy):
+        e2 = 2 * err
+        if e2 > -ady:
+            err -= ady
+            x += step_x
+        if e2 < adx:
+            err += adx
+            y += step_y
+        if (x, y) != (dx, dy):
+            cells.append((x, y))
+    return cells
+
+
+class RayTable:
+    # Every offset within a square of radius r with the cells its ray crosses,
+    # both from the origin outwards and from the offset back to the origin
+    def __init__(self, radius: int) -> None:
+        self.radius = radius
+        size = 2 * radius + 1
+        rays = {}
+        for dy in range(-radius, radius + 1):
+            for dx in range(-radius, radius + 1):
+                rays[dx, dy] = bresenham(dx, dy)
+        max_len = max(len(cells) for cells in rays.values()) or 1
+        self.forward = np.zeros((size, size, max_len, 2), dtype=np.intp)
+        self.backward = np.zeros((size, size, max_len, 2), dtype=np.intp)
+        self.valid = np.zeros((size, size, max_len), dtype=bool)
+        for (dx, dy), cells in rays.items():
+            back = [(dx + bx, dy + by) for bx, by in rays[-dx, -dy]]
+            for i, ((fx, fy), (bx, by)) in enumerate(zip(cells, back)):
+                self.forward[dy + radius, dx + radius, i] = (fy, fx)
+                self.backward[dy + radius, dx + radius, i] = (by, bx)
+                self.valid[dy + radius, dx + radius, i] = True
+
+
+_ray_tables = {}
+
+
+def ray_table(radius: int) -> RayTable:
+    if radius not in _ray_tables:
+        _ray_tables[radius] = RayTable(radius)
+    return _ray_tables[radius]
+
+
+class LineOfSight:
+    BLOCKING_RUBBLE = 5
+
+    def __init__(
+        self, rubble: np.ndarray, radius: int = 8, visibility: np.ndarray = None
+    ) -> None:
+        self.radius = radius
+        # Optional precomputed mask per tile, indexed [y, x], as made by
+        # all_masks(); typically a read-only view of a shared map
+        self.visibility = visibility
+        self.height, self.width = rubble.shape
+        # Padded so rays leaving the board read as open
+        self.blocking = np.zeros(
+            (self.height + 2 * radius, self.width + 2 * radius), dtype=bool
+        )
+        self.blocking[radius:-radius, radius:-radius] = rubble >= self.BLOCKING_RUBBLE
+        self.table = ray_table(radius)
+        self.masks = {}
+        self.disk_masks = {}
+
+    def __getstate__(self) -> dict:
+        # Caches are rebuilt lazily; no need to ship them between processes
+        state = self.__dict__.copy()
+        state["masks"] = {}
+        state["disk_masks"] = {}
+        return state
+
+    def mask(self, x: int, y: int) -> np.ndarray:
+        # Offsets visible from (x, y), indexed [dy + radius, dx + radius].
+        # Rubble is static, so this is computed once per tile.
+        if self.visibility is not None:
+            return self.visibility[y, x]
+        key = (x, y)
+        mask = self.masks.get(key)
+        if mask is None:
+            table = self.table
+            origin = np.array([y + self.radius, x + self.radius])
+            forward = self.blocking[
+                table.forward[..., 0] + origin[0], table.forward[..., 1] + origin[1]
+            ]
+            backward = self.blocking[
+                table.backward[..., 0] + origin[0], table.backward[..., 1] + origin[1]
+            ]
+            # Symmetric: either direction being clear is enough
+            mask = ~(forward & table.valid).any(axis=2) | ~(
+                backward & table.valid
+            ).any(axis=2)
+            mask.setflags(write=False)
+            self.masks[key] = mask
+        return mask
+
+    def all_masks(self) -> np.ndarray:
+        size = 2 * self.radius + 1
+        masks = np.zeros((self.height, self.width, size, size), dtype=bool)
+        for y in range(self.height):
+            for x in range(self.width):
+                masks[y, x] = self.mask(x, y)
+        return masks
+
+    def visible_mask(self, x: int, y: int, radius) -> np.ndarray:
+        # Vision disk of the given radius around (x, y), minus blocked offsets
+        key = (x, y, radius)
+        mask = self.disk_masks.get(key)
+        if mask is None:
+            disk = disk_mask(radius)
+            r = disk.shape[0] // 2
+            if r > self.radius:
+                # Past the ray table, offsets are traced one by one; the
+                # result is cached all the same
+                mask = np.zeros_like(disk)
+                for dy, dx in zip(*np.nonzero(disk)):
+                    mask[dy, dx] = self.visible(x, y, x + dx - r, y + dy - r)
+            else:
+                c = self.radius
+                mask = self.mask(x, y)[c - r : c + r + 1, c - r : c + r + 1] & disk
+            mask.setflags(write=False)
+            self.disk_masks[key] = mask
+        return mask
+
+    def visible(self, x0: int, y0: int, x1: int, y1: int) -> bool:
+        dx, dy = x1 - x0, y1 - y0
+        r = self.radius
+        if -r <= dx <= r and -r <= dy <= r:
+            return bool(self.mask(x0, y0)[dy + r, dx + r])
+        return self.ray_clear(x0, y0, dx, dy) or self.ray_clear(x1, y1, -dx, -dy)
+
+    def ray_clear(self, x: int, y: int, dx: int, dy: int) -> bool:
+        r = self.radius
+        for cx, cy in bresenham(dx, dy):
+            px, py = x + cx, y + cy
+            if 0 <= px < self.width and 0 <= py < self.height:
+                if self.blocking[py + r, px + r]:
+                    return False
+        return True
@@ -1,102 +1,115 @@
-from game import Game
-from player import Player
-from board import Board
-from unit import (
-    Unit,
-    Spawner,
-    Soldier,
-    Soldier1,
-    Soldier2,
-    Soldier3,
-    Soldier4,
-    Soldier5,
-    Soldier51,
-    Soldier52,
-    Soldier54,
-    Soldier41,
-    Soldier31,
-    Soldier32,
-    Soldier21,
-    Soldier6,
-)
-from tile import Tile
-from action import Action, AttackAction, MoveAction, DieAction, IdleAction
-from statechange import StateChange
-from render import Renderer
+import argparse
 import time
 
+from gptgame import checkpoint
+from gptgame.export import Exporter
+from gptgame.match import create_game
+from gptgame.render import Renderer
+from gptgame.replay import Replay, play
+from gptgame.sandbox import restore_ai_state, sandbox_players
+
 # from gptgame.state import State
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="GPT Game")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--turns", type=int, default=1000)
+    parser.add_argument("--record", help="write a seed-only replay to this file")
+    parser.add_argument("--replay", help="re-simulate and verify a replay file")
+    parser.add_argument(
+        "--sandbox",
+        type=float,
+        metavar="SECONDS",
+        help="run each player's AI in a worker process with this per-turn budget",
+    )
+    parser.add_argument("--checkpoint", help="periodically save the match to this file")
+    parser.add_argument("--checkpoint-every", type=int, default=100, metavar="TURNS")
+    parser.add_argument(
+        "--resume", action="store_true", help="continue from the --checkpoint file"
+    )
+    parser.add_argument("--headless", action="store_true", help="run without a window")
+    parser.add_argument(
+        "--export",
+        metavar="PATH",
+        help="render off screen to a video (.mp4, .webm, .gif, ...) or a PNG directory",
+    )
+    parser.add_argument("--fps", type=int, default=20, help="frame rate of --export video")
+    return parser.parse_args()
+
+
 def main():
-    player1 = Player(1)
-    player2 = Player(2)
-    rubble = [
-        [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-        [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-        [2, 1, 1, 1, 1, 1, 1, 1, 5, 2, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-        [2, 1, 1, 1, 1, 1, 1, 1, 5, 2, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-        [2, 1, 1, 1, 1, 1, 1, 1, 5, 5, 5, 5, 5, 1, 1, 1, 1, 1, 1],
-        [2, 1, 1, 1, 1, 1, 1, 1, 5, 5, 5, 5, 5, 1, 1, 1, 1, 1, 1],
-        [2, 1, 1, 1, 1, 1, 1, 1, 5, 5, 5, 5, 5, 1, 1, 1, 1, 1, 1],
-        [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-        [3, 3, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-        [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-        [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-        [2, 1, 1, 1, 1, 1, 1, 1, 5, 2, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-        [2, 1, 1, 1, 1, 1, 1, 1, 5, 2, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-        [2, 1, 1, 1, 1, 1, 1, 1, 5, 5, 5, 5, 5, 1, 1, 1, 1, 1, 1],
-        [2, 1, 1, 1, 1, 1, 1, 1, 5, 5, 5, 5, 5, 1, 1, 1, 1, 1, 1],
-        [2, 1, 1, 1, 1, 1, 1, 1, 5, 5, 5, 5, 5, 1, 1, 1, 1, 1, 1],
-        [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-        [3, 3, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-    ]
-    resources = [
-        [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        [10, 10, 10, 10, 10, 10, 10, 10, 10, 10, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        [10, 0, 0, 0, 0, 0, 0, 0, 0, 10, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        [10, 0, 0, 0, 0, 0, 0, 0, 0, 10, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        [10, 0, 0, 0, 0, 0, 0, 0, 0, 10, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        [10, 0, 0, 0, 0, 0, 0, 0, 0, 10, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        [10, 0, 0, 0, 0, 0, 0, 0, 0, 10, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        [10, 10, 10, 10, 10, 10, 10, 10, 10, 10, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        [10, 10, 0, 0, 0, 0, 0, 0, 10, 10, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        [10, 10, 10, 10, 10, 10, 10, 10, 10, 10, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        [10, 0, 0, 0, 0, 0, 0, 0, 0, 10, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        [10, 0, 0, 0, 0, 0, 0, 0, 0, 10, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        [10, 0, 0, 0, 0, 0, 0, 0, 0, 10, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        [10, 0, 0, 0, 0, 0, 0, 0, 0, 10, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        [10, 0, 0, 0, 0, 0, 0, 0, 0, 10, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        [10, 10, 10, 10, 10, 10, 10, 10, 10, 10, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        [10, 10, 0, 0, 0, 0, 0, 0, 10, 10, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-    ]
+    args = parse_args()
+    if args.replay:
+        with open(args.replay) as f:
+            replay = Replay.loads(f.read())
+        game = replay.create_game()
+        if args.export:
+            with Exporter(game, args.export, args.fps) as exporter:
+                for game, state_changes in play(replay):
+                    exporter.add(state_changes, game)
+            return
+        renderer = Renderer(game)
+        for game, state_changes in play(replay):
+            renderer.game = game
+            time.sleep(0.05)
+            res = renderer.render(state_changes)
+            if res == False:
+                break
+        return
 
-    board = Board(rubble, resources)
-    game = Game(player1, player2, board)
-    spawner1 = Spawner()
-    spawner1.player = player1
-    spawner1.spawn_unit = Soldier21
-    spawner2 = Spawner()
-    spawner2.player = player2
-    spawner2.spawn_unit = Soldier6
-    spawner1.x = 0
-    spawner1.y = 0
-    spawner2.x = len(resources[0]) - 1
-    spawner2.y = len(resources) - 1
-    board.get_tile(0, 0).occupant = spawner1
-    board.get_tile(spawner2.x, spawner2.y).occupant = spawner2
-    player1.add_unit(spawner1)
-    player2.add_unit(spawner2)
-    renderer = Renderer(game)
-    renderer.debug = False
-    for _ in range(1000):
-        time.sleep(0.05)
+    if args.resume:
+        if not args.checkpoint:
+            raise Exception("--resume needs --checkpoint")
+        game, extra = checkpoint.load(args.checkpoint)
+        replay = Replay.from_dict(extra["replay"])
+        # Sandboxed AIs keep their state outside the units
+        ai_state = extra.get("ai_state", {})
+    else:
+        game = create_game("default", "Soldier21", "Soldier6", seed=args.seed)
+        replay = Replay("default", ("Soldier21", "Soldier6"), game.seed, 0)
+        ai_state = {}
+    if args.sandbox:
+        sandboxes = sandbox_players(game, args.sandbox, ai_state)
+    else:
+        sandboxes = {}
+        restore_ai_state(game, ai_state)
+    renderer = None
+    exporter = None
+    if args.export:
+        exporter = Exporter(game, args.export, args.fps)
+    elif not args.headless:
+        renderer = Renderer(game)
+        renderer.debug = False
+    while replay.turns < args.turns:
+        if renderer is not None:
+            time.sleep(0.05)
         state_changes = game.update()
-        res = renderer.render(state_changes)
-        if res == False:
+        replay.turns += 1
+        replay.checksums.append(game.checksum())
+        if args.checkpoint and replay.turns % args.checkpoint_every == 0:
+            extra = {"replay": replay.to_dict()}
+            if sandboxes:
+                extra["ai_state"] = {
+                    player_id: sandbox.ai_state for player_id, sandbox in sandboxes.items()
+                }
+            checkpoint.save(game, args.checkpoint, extra)
+        if exporter is not None:
+            exporter.add(state_changes)
+        if renderer is not None and renderer.render(state_changes) == False:
             break
 
+    if exporter is not None:
+        exporter.close()
+
+    for player_id, sandbox in sandboxes.items():
+        sandbox.close()
+        print(f"Player {player_id} AI: {sandbox.usage()}")
+
+    if args.record:
+        with open(args.record, "w") as f:
+            f.write(replay.dumps())
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,43 @@
+from gptgame import unit as unit_module
+from gptgame.board import Board
+from gptgame.game import Game
+from gptgame.maps import get_map
+from gptgame.player import Player
+from gptgame.unit import Spawner
+
+
+def unit_class(name: str):
+    cls = getattr(unit_module, name, None)
+    if cls is None or not isinstance(cls, type) or not issubclass(cls, unit_module.Unit):
+        raise Exception(f"Unknown unit class: {name}")
+    return cls
+
+
+def create_game(
+    map_name: str, spawn_unit1: str, spawn_unit2: str, seed=None, static_map=None
+) -> Game:
+    # static_map, a StaticMap attached from shared memory, skips rebuilding
+    # the map's static layers
+    if static_map is not None:
+        if static_map.map_name != map_name:
+            raise Exception(f"Static map is {static_map.map_name}, not {map_name}")
+        board = Board.from_static(static_map)
+    else:
+        rubble, resource = get_map(map_name)
+        board = Board(rubble, resource)
+    player1 = Player(1)
+    player2 = Player(2)
+    game = Game(player1, player2, board, seed)
+    corners = [(0, 0), (board.width() - 1, board.height() - 1)]
+    for player, spawn_unit, (x, y) in zip(
+        (player1, player2), (spawn_unit1, spawn_unit2), corners
+    ):
+        spawner = Spawner()
+        spawner.player = player
+        spawner.spawn_unit = unit_class(spawn_unit)
+        spawner.x = x
+        spawner.y = y
+        board.set_occupant(x, y, spawner)
+        player.add_unit(spawner)
+        game.assign_id(spawner)
+    return game
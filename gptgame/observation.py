@@ -0,0 +1,66 @@
+import numpy as np
+
+from gptgame.perception import disk_mask
+
+CHANNELS = (
+    "rubble",
+    "resource",
+    "own_units",
+    "enemy_units",
+    "health",
+    "move_cooldown",
+    "action_cooldown",
+)
+RUBBLE, RESOURCE, OWN_UNITS, ENEMY_UNITS, HEALTH, MOVE_COOLDOWN, ACTION_COOLDOWN = range(
+    len(CHANNELS)
+)
+
+
+def observation_shape(board) -> tuple[int, int, int]:
+    return len(CHANNELS), board.height(), board.width()
+
+
+def write_observation(game, player, out: np.ndarray) -> np.ndarray:
+    # Fills out (C, H, W) in place from player's point of view
+    board = game.board
+    out[RUBBLE] = board.rubble_array
+    out[RESOURCE] = board.resource_array
+    out[OWN_UNITS:] = 0
+    for unit in game.all_units():
+        y, x = unit.y, unit.x
+        out[OWN_UNITS if unit.player is player else ENEMY_UNITS, y, x] = 1
+        out[HEALTH, y, x] = unit.health / unit.max_health
+        out[MOVE_COOLDOWN, y, x] = unit.move_cooldown
+        out[ACTION_COOLDOWN, y, x] = unit.action_cooldown
+    return out
+
+
+def unit_positions(units: list) -> np.ndarray:
+    positions = np.empty((len(units), 2), dtype=np.intp)
+    for i, unit in enumerate(units):
+        positions[i, 0] = unit.x
+        positions[i, 1] = unit.y
+    return positions
+
+
+def unit_crops(
+    layers: np.ndarray,
+    positions: np.ndarray,
+    radius: int,
+    mask_disk: bool = False,
+    fill=0,
+) -> np.ndarray:
+    # Egocentric (N, C, 2r+1, 2r+1) windows of layers (C, H, W) centred on
+    # each (x, y) in positions. The board is padded once and every window
+    # is a strided view into it, so the only per-unit work is the gather.
+    size = 2 * radius + 1
+    padded = np.pad(
+        layers, ((0, 0), (radius, radius), (radius, radius)), constant_values=fill
+    )
+    windows = np.lib.stride_tricks.sliding_window_view(padded, (size, size), axis=(1, 2))
+    # (H, W, C, size, size) view, indexed by each unit's top-left corner
+    windows = windows.transpose(1, 2, 0, 3, 4)
+    crops = windows[positions[:, 1], positions[:, 0]]
+    if mask_disk:
+        np.copyto(crops, fill, where=~disk_mask(radius))
+    return crops
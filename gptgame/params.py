@@ -0,0 +1,79 @@
+import math
+
+
+class UnitParams:
+    # Tunable numbers behind the soldiers' stats and behaviour. Each player
+    # carries one; its spawner applies it to every unit it creates.
+    def __init__(
+        self,
+        attack_damage: int = 1,
+        health: int = 3,
+        action_range: float = 4,
+        vision_range: float = 6,
+        move_cooldown: int = 2,
+        action_cooldown: int = 2,
+        bounty: int = 10,
+        harvest_rate: int = 1,
+        spawn_cooldown: int = 5,
+        rubble_cost: int = 10,
+        retreat_health: int = 2,
+        flee_divisor: float = 3,
+        spawn_cost: int = 0,
+        starting_resources: int = 0,
+    ) -> None:
+        self.attack_damage = attack_damage
+        self.health = health
+        self.action_range = action_range
+        self.vision_range = vision_range
+        self.move_cooldown = move_cooldown
+        self.action_cooldown = action_cooldown
+        self.bounty = bounty
+        self.harvest_rate = harvest_rate
+        # Turns a spawner waits after spawning
+        self.spawn_cooldown = spawn_cooldown
+        # Soldier21's path cost per point of rubble
+        self.rubble_cost = rubble_cost
+        # Soldier54 retreats below this health
+        self.retreat_health = retreat_health
+        # Soldier6 heads home at or below max_health / flee_divisor
+        self.flee_divisor = flee_divisor
+        # Resources a spawner pays per unit, and what the player starts with
+        # to pay for its first ones; harvesting funds the rest
+        self.spawn_cost = spawn_cost
+        self.starting_resources = starting_resources
+        self.validate()
+
+    def validate(self) -> None:
+        # Ranges feed line of sight and perception, which need finite,
+        # non-negative radii; counts and cooldowns can't go below zero
+        for name, value in self.__dict__.items():
+            if not isinstance(value, (int, float)) or not math.isfinite(value):
+                raise Exception(f"Unit parameter {name} must be a finite number, got {value!r}")
+            if value < 0:
+                raise Exception(f"Unit parameter {name} can't be negative, got {value}")
+        if self.health < 1:
+            raise Exception(f"Unit parameter health must be at least 1, got {self.health}")
+        if self.flee_divisor <= 0:
+            raise Exception(f"Unit parameter flee_divisor must be positive, got {self.flee_divisor}")
+
+    def as_dict(self) -> dict:
+        return dict(self.__dict__)
+
+    def replace(self, **changes) -> "UnitParams":
+        unknown = set(changes) - set(self.__dict__)
+        if unknown:
+            raise Exception(f"Unknown unit parameters: {sorted(unknown)}")
+        return UnitParams(**{**self.__dict__, **changes})
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, UnitParams) and self.__dict__ == other.__dict__
+
+    def __hash__(self) -> int:
+        return hash(tuple(sorted(self.__dict__.items())))
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={value}" for name, value in self.__dict__.items())
+        return f"UnitParams({fields})"
+
+
+DEFAULT_PARAMS = UnitParams()
@@ -0,0 +1,113 @@
+import heapq
+import time
+
+
+class QueueItem:
+    def __init__(self, cost, tile):
+        self.cost = cost
+        self.tile = tile
+
+    def __lt__(self, other):
+        return self.cost < other.cost
+
+
+class PathStats:
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.searches = 0
+        # Space-time searches, run by cooperative.find_path when the plain
+        # search above it finds a path its reservations don't allow
+        self.cooperative_searches = 0
+        self.expansions = 0
+        # Searches that ran out of budget and returned a partial path
+        self.budget_hits = 0
+        self.unreachable = 0
+
+    def as_dict(self) -> dict:
+        return dict(self.__dict__)
+
+
+STATS = PathStats()
+
+
+def step_cost(tile) -> int:
+    return tile.rubble + 1
+
+
+def chebyshev(goal, tile) -> int:
+    return max(abs(goal[0] - tile.x), abs(goal[1] - tile.y))
+
+
+def manhattan(goal, tile) -> int:
+    return abs(goal[0] - tile.x) + abs(goal[1] - tile.y)
+
+
+def find_path(
+    board,
+    start: tuple[int, int],
+    goal: tuple[int, int],
+    cost=step_cost,
+    heuristic=chebyshev,
+    radius: float = 1,
+    avoid_occupied: bool = False,
+    max_expansions: int = None,
+    time_budget: float = None,
+    stats: PathStats = STATS,
+) -> list:
+    # A* over tiles within radius of each other. Returns the tiles from start
+    # to goal, or None if the goal is unreachable. When max_expansions or
+    # time_budget (seconds) runs out first, returns the path to the expanded
+    # tile with the lowest heuristic instead.
+    start_tile = board.get_tile(start[0], start[1])
+    frontier = [QueueItem(0, start_tile)]
+    came_from = {start_tile: None}
+    cost_so_far = {start_tile: 0}
+    best = start_tile
+    best_h = heuristic(goal, start_tile)
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    expansions = 0
+    end = None
+    stats.searches += 1
+
+    while frontier:
+        current = heapq.heappop(frontier).tile
+        if (current.x, current.y) == goal:
+            end = current
+            break
+        if (max_expansions is not None and expansions >= max_expansions) or (
+            deadline is not None and time.perf_counter() >= deadline
+        ):
+            stats.budget_hits += 1
+            end = best
+            break
+
+        expansions += 1
+        h = heuristic(goal, current)
+        if h < best_h:
+            best, best_h = current, h
+        for next_tile in board.neighbours(current.x, current.y, radius):
+            if (
+                avoid_occupied
+                and next_tile.is_occupied()
+                and (next_tile.x, next_tile.y) != goal
+            ):
+                continue
+            new_cost = cost_so_far[current] + cost(next_tile)
+            if next_tile not in cost_so_far or new_cost < cost_so_far[next_tile]:
+                cost_so_far[next_tile] = new_cost
+                priority = new_cost + heuristic(goal, next_tile)
+                heapq.heappush(frontier, QueueItem(priority, next_tile))
+                came_from[next_tile] = current
+
+    stats.expansions += expansions
+    if end is None:
+        stats.unreachable += 1
+        return None
+    path = []
+    while end is not None:
+        path.append(end)
+        end = came_from[end]
+    path.reverse()
+    return path
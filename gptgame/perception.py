@@ -0,0 +1,120 @@
+import numpy as np
+
+_disks = {}
+
+
+def disk_mask(radius) -> np.ndarray:
+    # (2r+1, 2r+1) mask of offsets within radius, centre included
+    if radius not in _disks:
+        r = int(radius)
+        offsets = np.arange(-r, r + 1)
+        mask = offsets[:, None] ** 2 + offsets[None, :] ** 2 <= radius**2
+        mask.setflags(write=False)
+        _disks[radius] = mask
+    return _disks[radius]
+
+
+def dilate(grid: np.ndarray, units: list, disk: np.ndarray) -> None:
+    # Marks every cell of grid within disk of a unit. One shifted OR per
+    # disk offset, independent of the number of units.
+    height, width = grid.shape
+    r = disk.shape[0] // 2
+    sources = np.zeros((height + 2 * r, width + 2 * r), dtype=bool)
+    xs = np.fromiter((unit.x for unit in units), dtype=np.intp, count=len(units))
+    ys = np.fromiter((unit.y for unit in units), dtype=np.intp, count=len(units))
+    sources[ys + r, xs + r] = True
+    for dy, dx in zip(*np.nonzero(disk)):
+        grid |= sources[
+            2 * r - dy : 2 * r - dy + height,
+            2 * r - dx : 2 * r - dx + width,
+        ]
+
+
+class Perception:
+    # Above this many visible enemies, range queries go through the grid
+    # instead of filtering the visible list
+    GRID_QUERY_THRESHOLD = 64
+
+    def __init__(self, player, board, enemies: list) -> None:
+        self.player = player
+        self.board = board
+        self.height = board.height()
+        self.width = board.width()
+        self.visible = np.zeros((self.height, self.width), dtype=bool)
+        self.mark_visible(player.get_units())
+        self.visible_enemies = [
+            enemy
+            for enemy in enemies
+            if enemy.is_alive() and self.visible[enemy.y, enemy.x]
+        ]
+        # Queries select candidates by their start-of-turn position and then
+        # re-check the live one, so units that die or move mid-turn drop out
+        self.enemy_positions = [(enemy.x, enemy.y) for enemy in self.visible_enemies]
+        self.enemy_grid = None
+        if len(self.visible_enemies) > self.GRID_QUERY_THRESHOLD:
+            self.enemy_grid = np.full((self.height, self.width), -1, dtype=np.int32)
+            for i, enemy in enumerate(self.visible_enemies):
+                self.enemy_grid[enemy.y, enemy.x] = i
+
+    def mark_visible(self, units: list) -> None:
+        by_radius = {}
+        for unit in units:
+            by_radius.setdefault(unit.vision_range, []).append(unit)
+        for radius, group in by_radius.items():
+            disk = disk_mask(radius)
+            if self.board.los is not None:
+                for unit in group:
+                    self.stamp(
+                        unit.x, unit.y, self.board.los.visible_mask(unit.x, unit.y, radius)
+                    )
+            elif len(group) > disk.sum():
+                self.dilate(group, disk)
+            else:
+                for unit in group:
+                    self.stamp(unit.x, unit.y, disk)
+
+    def stamp(self, x: int, y: int, disk: np.ndarray) -> None:
+        r = disk.shape[0] // 2
+        y0, y1 = max(y - r, 0), min(y + r + 1, self.height)
+        x0, x1 = max(x - r, 0), min(x + r + 1, self.width)
+        self.visible[y0:y1, x0:x1] |= disk[
+            y0 - y + r : y1 - y + r, x0 - x + r : x1 - x + r
+        ]
+
+    def dilate(self, units: list, disk: np.ndarray) -> None:
+        dilate(self.visible, units, disk)
+
+    def is_visible(self, x: int, y: int) -> bool:
+        return bool(self.visible[y, x])
+
+    def enemies_in_range(self, x: int, y: int, radius) -> list:
+        radius_squared = radius**2
+        if self.enemy_grid is None:
+            hits = [
+                i
+                for i, (ex, ey) in enumerate(self.enemy_positions)
+                if (ex - x) ** 2 + (ey - y) ** 2 <= radius_squared
+            ]
+        else:
+            hits = self.grid_hits(x, y, radius)
+        enemies = []
+        for i in hits:
+            enemy = self.visible_enemies[i]
+            if (
+                enemy.is_alive()
+                and (enemy.x, enemy.y) != (x, y)
+                and (enemy.x - x) ** 2 + (enemy.y - y) ** 2 <= radius_squared
+                and self.board.has_line_of_sight(x, y, enemy.x, enemy.y)
+            ):
+                enemies.append(enemy)
+        return enemies
+
+    def grid_hits(self, x: int, y: int, radius) -> np.ndarray:
+        disk = disk_mask(radius)
+        r = disk.shape[0] // 2
+        y0, y1 = max(y - r, 0), min(y + r + 1, self.height)
+        x0, x1 = max(x - r, 0), min(x + r + 1, self.width)
+        window = self.enemy_grid[y0:y1, x0:x1]
+        return window[
+            (window >= 0) & disk[y0 - y + r : y1 - y + r, x0 - x + r : x1 - x + r]
+        ]
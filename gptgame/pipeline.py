@@ -0,0 +1,278 @@
+import time
+
+from gptgame.action import (
+    AttackAction,
+    HarvestAction,
+    IdleAction,
+    MoveAction,
+    SpawnAction,
+    apply_damage,
+)
+from gptgame.cooperative import ReservationTable
+from gptgame.policy import batch_decisions
+from gptgame.statechange import ATTACK, DIE, HARVEST, HEAL, MOVE, SPAWN
+
+
+class Turn:
+    # Batch state shared by the stages of a single Game.update()
+    def __init__(self, game) -> None:
+        self.game = game
+        self.board = game.board
+        self.units = []
+        # [unit, move_action, act_action] in turn order
+        self.decisions = []
+        # Units that were off action cooldown when deciding. Healing is part
+        # of acting, so only these heal.
+        self.ready = set()
+        # unit -> move action decided before the decision stage, by an
+        # ExternalMoveStage; the unit AI then only decides the unit's act
+        self.moves = {}
+        # What actually got executed, recorded by the stages as they go
+        self.actions = game.actions
+        self.actions.clear()
+
+
+class Stage:
+    name = None
+
+    def run(self, turn: Turn) -> None:
+        raise NotImplementedError
+
+
+class CooldownStage(Stage):
+    name = "cooldown"
+
+    def run(self, turn: Turn) -> None:
+        game = turn.game
+        turn.units = game.all_units()
+        game.rng.stream("turn_order").shuffle(turn.units)
+        for unit in turn.units:
+            game.assign_id(unit)
+            # Per-player streams keep one side's draws from shifting the other's
+            unit.rng = game.rng.stream(f"{unit.rng_stream}:{unit.player.id}")
+            unit.cooldown()
+
+
+class PerceptionStage(Stage):
+    name = "perception"
+
+    def run(self, turn: Turn) -> None:
+        perception = turn.game.perceive()
+        for unit in turn.units:
+            unit.perception = perception[unit.player.id]
+
+
+class ReservationStage(Stage):
+    # A fresh space-time reservation table per player, which cooperative
+    # units plan against in turn order
+    name = "reservation"
+
+    def __init__(self, window: int = 8) -> None:
+        self.window = window
+
+    def run(self, turn: Turn) -> None:
+        game = turn.game
+        tables = {
+            player.id: ReservationTable(self.window)
+            for player in (game.player1, game.player2)
+        }
+        for unit in turn.units:
+            unit.reservations = tables[unit.player.id]
+
+
+class DecisionStage(Stage):
+    # Units decide one by one, except those of players with a controller
+    # Policy, which decides for all of them in a single batched call
+    name = "decision"
+
+    def run(self, turn: Turn) -> None:
+        board = turn.board
+        controllers = turn.game.controllers
+        batches = {}
+        for unit in turn.units:
+            if unit.can_act():
+                turn.ready.add(unit)
+            decision = [unit, None, None]
+            policy = controllers.get(unit.player.id)
+            if policy is not None and unit.controllable and unit.is_alive():
+                batches.setdefault(unit.player.id, []).append(decision)
+            else:
+                decision[1], decision[2] = unit.decide(board, turn.moves.get(unit))
+            turn.decisions.append(decision)
+
+        for player_id, decisions in batches.items():
+            units = [decision[0] for decision in decisions]
+            actions = batch_decisions(turn.game, units, controllers[player_id])
+            for decision, (move_action, act_action) in zip(decisions, actions):
+                decision[1] = turn.moves.get(decision[0], move_action)
+                decision[2] = act_action
+
+
+class MovementStage(Stage):
+    # Moves and spawns both claim tiles; the first claimant in turn order
+    # wins and later conflicting ones become idle
+    name = "movement"
+
+    def run(self, turn: Turn) -> None:
+        board = turn.board
+        for decision in turn.decisions:
+            unit, move_action, act_action = decision
+            if isinstance(move_action, MoveAction):
+                if move_action.is_valid(board):
+                    x, y = unit.x, unit.y
+                    move_action.execute(board)
+                    turn.actions.append(MOVE, unit, fx=x, fy=y)
+                else:
+                    decision[1] = IdleAction(unit)
+            if isinstance(act_action, SpawnAction):
+                if act_action.is_valid(board):
+                    act_action.execute(board)
+                    turn.game.assign_id(act_action.unit)
+                    turn.actions.append(
+                        SPAWN, unit, act_action.unit, value=unit.spawn_cost
+                    )
+                else:
+                    decision[2] = IdleAction(unit)
+
+
+class CombatStage(Stage):
+    # Attacks are validated against post-movement positions and their damage
+    # summed per target, so every attack of the turn lands simultaneously
+    name = "combat"
+
+    def run(self, turn: Turn) -> None:
+        board = turn.board
+        damage = {}
+        others = []
+        for decision in turn.decisions:
+            unit, _, act_action = decision
+            if isinstance(act_action, AttackAction):
+                if act_action.is_valid(board) and act_action.target.is_alive():
+                    target = act_action.target
+                    amount = act_action.resolve(board)
+                    damage[target] = damage.get(target, 0) + amount
+                    turn.actions.append(ATTACK, unit, target, value=amount)
+                else:
+                    decision[2] = IdleAction(unit)
+            elif not isinstance(act_action, (IdleAction, SpawnAction)):
+                others.append(decision)
+
+        for target, amount in damage.items():
+            apply_damage(target, amount)
+
+        for decision in others:
+            unit, _, act_action = decision
+            if unit.is_alive() and act_action.is_valid(board):
+                resources = unit.player.resources
+                act_action.execute(board)
+                if isinstance(act_action, HarvestAction):
+                    turn.actions.append(
+                        HARVEST,
+                        unit,
+                        tx=act_action.tile.x,
+                        ty=act_action.tile.y,
+                        value=unit.player.resources - resources,
+                    )
+            else:
+                decision[2] = IdleAction(unit)
+
+
+class HealingStage(Stage):
+    name = "healing"
+
+    def run(self, turn: Turn) -> None:
+        board = turn.board
+        heals = []
+        for unit in turn.units:
+            if unit.is_alive() and unit in turn.ready:
+                heals.extend(unit.heal(board))
+        for action in heals:
+            if action.is_valid(board):
+                health = action.unit.health
+                action.execute(board)
+                turn.actions.append(
+                    HEAL, action.healer, action.unit, value=action.unit.health - health
+                )
+
+
+class DeathStage(Stage):
+    name = "death"
+
+    def run(self, turn: Turn) -> None:
+        board = turn.board
+        for unit in turn.game.all_units():
+            if not unit.is_alive():
+                turn.actions.append(DIE, unit, value=unit.bounty)
+                for action in unit.die():
+                    action.execute(board)
+
+
+class Pipeline:
+    def __init__(self, stages: list = None) -> None:
+        self.stages = []
+        # Cumulative seconds per stage, and those of the latest turn
+        self.timings = {}
+        self.last_timings = {}
+        for stage in stages or []:
+            self.register(stage)
+
+    def names(self) -> list[str]:
+        return [stage.name for stage in self.stages]
+
+    def get(self, name: str) -> Stage:
+        for stage in self.stages:
+            if stage.name == name:
+                return stage
+        raise Exception(f"No stage named {name}")
+
+    def register(self, stage: Stage, before: str = None, after: str = None) -> None:
+        if stage.name is None:
+            raise Exception(f"Stage {stage} has no name")
+        if stage.name in self.names():
+            raise Exception(f"Stage {stage.name} already registered")
+        if before is not None and after is not None:
+            raise Exception("Pass only one of before and after")
+        if before is not None:
+            index = self.names().index(self.get(before).name)
+        elif after is not None:
+            index = self.names().index(self.get(after).name) + 1
+        else:
+            index = len(self.stages)
+        self.stages.insert(index, stage)
+        self.timings.setdefault(stage.name, 0.0)
+
+    def replace(self, stage: Stage) -> Stage:
+        index = self.names().index(self.get(stage.name).name)
+        old = self.stages[index]
+        self.stages[index] = stage
+        return old
+
+    def remove(self, name: str) -> Stage:
+        stage = self.get(name)
+        self.stages.remove(stage)
+        return stage
+
+    def run(self, turn: Turn) -> Turn:
+        self.last_timings = {}
+        for stage in self.stages:
+            start = time.perf_counter()
+            stage.run(turn)
+            elapsed = time.perf_counter() - start
+            self.last_timings[stage.name] = elapsed
+            self.timings[stage.name] += elapsed
+        return turn
+
+
+def default_pipeline() -> Pipeline:
+    return Pipeline(
+        [
+            CooldownStage(),
+            PerceptionStage(),
+            ReservationStage(),
+            DecisionStage(),
+            MovementStage(),
+            CombatStage(),
+            HealingStage(),
+            DeathStage(),
+        ]
+    )
@@ -1,20 +1,27 @@
 import random
 
+from gptgame.params import DEFAULT_PARAMS
+
 
 class Player:
     def __init__(self, id: int) -> None:
         self._units = []
-        self.resources = 0
         self.id = id
+        self.set_params(DEFAULT_PARAMS)
         self.color = self.random_color()
 
-    def random_color(self):
+    def random_color(self, rng=random):
         return (
-            random.randint(0, 255),
-            random.randint(0, 255),
-            random.randint(0, 255),
+            rng.randint(0, 255),
+            rng.randint(0, 255),
+            rng.randint(0, 255),
         )
 
+    def set_params(self, params) -> None:
+        # Before the first turn; the player starts with the params' resources
+        self.params = params
+        self.resources = params.starting_resources
+
     def get_units(self) -> list:
         return self._units
 
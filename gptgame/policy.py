@@ -0,0 +1,170 @@
+import numpy as np
+
+from gptgame.action import AttackAction, IdleAction, MoveAction
+from gptgame.unit import Unit
+
+NO_TARGET = -1
+# Attributes the game owns on every unit (position, stats, cooldowns and
+# the per-turn handles); everything else a unit holds is its AI's own
+ENGINE_STATE = tuple(Unit().__dict__)
+
+
+class UnitBatch:
+    # Everything a Policy sees about one player's units, as parallel arrays
+    def __init__(self, game, units: list) -> None:
+        self.game = game
+        self.board = game.board
+        self.units = units
+        player = units[0].player if units else None
+        self.player = player
+        self.perception = game.perception.get(player.id) if player else None
+
+        count = len(units)
+        self.ids = np.empty(count, dtype=np.int64)
+        self.positions = np.empty((count, 2), dtype=np.int64)
+        self.health = np.empty(count, dtype=np.int64)
+        self.max_health = np.empty(count, dtype=np.int64)
+        self.attack_damage = np.empty(count, dtype=np.int64)
+        self.action_range = np.empty(count, dtype=np.float64)
+        self.vision_range = np.empty(count, dtype=np.float64)
+        self.move_cooldown = np.empty(count, dtype=np.int64)
+        self.action_cooldown = np.empty(count, dtype=np.int64)
+        for i, unit in enumerate(units):
+            self.ids[i] = unit.id
+            self.positions[i] = (unit.x, unit.y)
+            self.health[i] = unit.health
+            self.max_health[i] = unit.max_health
+            self.attack_damage[i] = unit.attack_damage
+            self.action_range[i] = unit.action_range
+            self.vision_range[i] = unit.vision_range
+            self.move_cooldown[i] = unit.move_cooldown
+            self.action_cooldown[i] = unit.action_cooldown
+        self.can_move = self.move_cooldown == 0
+        self.can_act = self.action_cooldown == 0
+
+        enemies = []
+        if self.perception is not None:
+            enemies = [
+                enemy for enemy in self.perception.visible_enemies if enemy.is_alive()
+            ]
+        self.enemies = enemies
+        self.enemy_ids = np.array([enemy.id for enemy in enemies], dtype=np.int64)
+        self.enemy_positions = np.array(
+            [(enemy.x, enemy.y) for enemy in enemies], dtype=np.int64
+        ).reshape(-1, 2)
+        self.enemy_health = np.array(
+            [enemy.health for enemy in enemies], dtype=np.int64
+        )
+
+    def __len__(self) -> int:
+        return len(self.units)
+
+
+class Policy:
+    def decide(self, batch: UnitBatch) -> tuple[np.ndarray, np.ndarray]:
+        # Returns move targets (N, 2) as (x, y), the unit's own position to
+        # stay put, and attack targets (N,) as enemy unit ids or NO_TARGET
+        raise NotImplementedError
+
+
+class ScriptedPolicy(Policy):
+    # Runs each unit's own move/act so the Soldier classes work as a Policy.
+    # With unit_class, every unit is played by its own instance of that
+    # class instead, kept while the unit lives so whatever the AI remembers
+    # between turns persists. The unit's game state is copied onto it
+    # before every decision.
+    def __init__(self, unit_class=None) -> None:
+        if unit_class is not None and not (
+            isinstance(unit_class, type) and issubclass(unit_class, Unit)
+        ):
+            raise Exception(f"{unit_class} is not a Unit class")
+        self.unit_class = unit_class
+        # unit id -> the unit_class instance deciding for it
+        self.scripts = {}
+
+    def script(self, unit):
+        if self.unit_class is None:
+            return unit
+        script = self.scripts.get(unit.id)
+        if script is None:
+            script = self.unit_class()
+            self.scripts[unit.id] = script
+        for name in ENGINE_STATE:
+            setattr(script, name, getattr(unit, name))
+        return script
+
+    def decide(self, batch: UnitBatch) -> tuple[np.ndarray, np.ndarray]:
+        board = batch.board
+        moves = batch.positions.copy()
+        attacks = np.full(len(batch), NO_TARGET, dtype=np.int64)
+        scripts = {}
+        for i, unit in enumerate(batch.units):
+            script = self.script(unit)
+            scripts[unit.id] = script
+            if batch.can_move[i]:
+                action = script.move(board)
+                if isinstance(action, MoveAction):
+                    moves[i] = (action.tile.x, action.tile.y)
+            if batch.can_act[i]:
+                action = script.act(board)
+                if isinstance(action, AttackAction):
+                    attacks[i] = action.target.id
+        if self.unit_class is not None:
+            # Units that died or left the batch take their AI with them
+            self.scripts = scripts
+        return moves, attacks
+
+
+class NearestEnemyPolicy(Policy):
+    # Vectorised example: step towards the nearest visible enemy and shoot it
+    # once it is in range
+    def decide(self, batch: UnitBatch) -> tuple[np.ndarray, np.ndarray]:
+        moves = batch.positions.copy()
+        attacks = np.full(len(batch), NO_TARGET, dtype=np.int64)
+        if len(batch) == 0 or len(batch.enemy_ids) == 0:
+            return moves, attacks
+
+        delta = batch.enemy_positions[None, :, :] - batch.positions[:, None, :]
+        distance_squared = (delta**2).sum(axis=2)
+        nearest = distance_squared.argmin(axis=1)
+        rows = np.arange(len(batch))
+        nearest_delta = delta[rows, nearest]
+        nearest_distance = distance_squared[rows, nearest]
+
+        in_sight = nearest_distance <= batch.vision_range**2
+        in_range = nearest_distance <= batch.action_range**2
+        step = in_sight & ~in_range & batch.can_move
+        moves[step] += np.sign(nearest_delta[step])
+        shoot = in_range & batch.can_act
+        attacks[shoot] = batch.enemy_ids[nearest[shoot]]
+        return moves, attacks
+
+
+def batch_decisions(game, units: list, policy: Policy) -> list[tuple]:
+    # Calls policy once for all units and turns its arrays back into actions
+    board = game.board
+    batch = UnitBatch(game, units)
+    moves, attacks = policy.decide(batch)
+    enemies = {
+        enemy.id: enemy
+        for enemy in game.all_units()
+        if enemy.player is not batch.player and enemy.is_alive()
+    }
+    width, height = board.width(), board.height()
+    actions = []
+    for i, unit in enumerate(units):
+        x, y = int(moves[i][0]), int(moves[i][1])
+        if (x, y) != (unit.x, unit.y) and 0 <= x < width and 0 <= y < height:
+            move_action = MoveAction(unit, board.get_tile(x, y))
+        else:
+            move_action = IdleAction(unit)
+
+        target = enemies.get(int(attacks[i]))
+        if target is not None:
+            act_action = AttackAction(unit, target)
+        elif unit.can_act():
+            act_action = unit.harvest(board)
+        else:
+            act_action = IdleAction(unit)
+        actions.append((move_action, act_action))
+    return actions
@@ -1,13 +1,31 @@
-import pygame
-from game import Game
-from statechange import StateChange
-from unit import Spawner, Soldier
+import numpy as np
+
+from gptgame.game import Game
+from gptgame.perception import dilate, disk_mask
+from gptgame.statechange import ATTACK, StateChange
+from gptgame.unit import Spawner, Soldier
+
+# Imported by the first Renderer, so headless runs never load pygame
+pygame = None
+
+HEALTH_BAR_HEIGHT = 4
+COOLDOWN_DOT = 4
+MOVE_COOLDOWN_COLOR = (80, 160, 255)
+ACTION_COOLDOWN_COLOR = (255, 160, 40)
+ATTACK_RANGE_ALPHA = 140
+VISION_RANGE_ALPHA = 60
+# Past this many units on screen, ranges are shaded per cell instead of
+# drawn as one circle per unit
+RANGE_CIRCLE_LIMIT = 400
 
 
 class Renderer:
-    def __init__(self, game: Game) -> None:
+    def __init__(self, game: Game, cell_size: int = 50) -> None:
+        global pygame
+        import pygame
+
         dims = game.game_dimensions()
-        self.cell_size = 50
+        self.cell_size = cell_size
         self.width = dims[0] * self.cell_size
         self.height = dims[1] * self.cell_size
         self.game = game
@@ -17,86 +35,243 @@ class Renderer:
         # self.font = pygame.font.SysFont("Arial", 20)
         # self.font_small = pygame.font.SysFont("Arial", 10)
         self.debug = False
+        # Player id whose fog of war is drawn, or None to show everything
+        self.fog_player = None
+        self.fog = pygame.Surface((self.cell_size, self.cell_size), pygame.SRCALPHA)
+        self.fog.fill((0, 0, 0, 160))
+        # Rubble never changes, so it is drawn once
+        self.background = None
+        # Pre-rendered sprites by what they show, and the (sprite, position)
+        # pairs of the current frame, drawn in one blits() call
+        self.sprites = {}
+        self.blit_queue = []
+        # Range circles of the current frame, cleared and reused every frame
+        self.overlay = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        # Tiles of the units whose ranges are drawn this frame
+        self.range_tiles = []
+        # One pixel per cell range shading
+        self.coverage = None
 
     def render(self, state_changes: StateChange):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 return False
+        self.draw(state_changes)
+        pygame.display.flip()
+
+    def draw(self, state_changes: StateChange):
         board = self.game.board
-        self.screen.fill((0, 0, 0))
-        for i in range(board.height()):
-            for j in range(board.width()):
-                tile = board.get_tile(j, i)
-                self.render_tile(tile)
+        if self.background is None:
+            self.background = self.render_background()
+        self.screen.blit(self.background, (0, 0))
+        self.blit_queue.clear()
+        self.range_tiles.clear()
+        # Only tiles with something on them; on big boards most are empty
+        for x, y in board.resource_index.amounts:
+            self.render_resource(board.get_tile(x, y))
+        for unit in self.game.all_units():
+            if unit.is_alive():
+                self.render_tile(board.get_tile(unit.x, unit.y))
+        if self.fog_player is not None:
+            for i in range(board.height()):
+                for j in range(board.width()):
+                    tile = board.get_tile(j, i)
+                    if not self.is_visible(tile):
+                        self.render_fog(tile)
+        self.screen.blits(self.blit_queue, doreturn=False)
+        if self.debug:
+            self.render_ranges()
 
-        for state_change in state_changes.state_changes:
-            self.render_state_change(state_change)
-        
-        pygame.display.flip()
+        self.render_attacks(state_changes)
 
-    def render_state_change(self, state_change: StateChange):
-        for action in state_change:
-            # act_action = action[1]
-            # move_action = action[0]
-            if action.__class__.__name__ == "AttackAction":
-                self.render_attack_action(action)
-            # TODO: Add other actions
+    def render_background(self):
+        background = pygame.Surface((self.width, self.height))
+        background.fill((0, 0, 0))
+        board = self.game.board
+        for i in range(board.height()):
+            for j in range(board.width()):
+                self.render_rubble(background, board.get_tile(j, i))
+        return background
 
-    def render_attack_action(self, action):
-        color = action.attacker.player.color
-        attacker_pos = self.get_center(action.attacker.x, action.attacker.y)
-        target_pos = self.get_center(action.target.x, action.target.y)
-        pygame.draw.line(self.screen, color, attacker_pos, target_pos, 2)
+    def render_attacks(self, state_change: StateChange):
+        colors = {
+            player.id: player.color for player in (self.game.player1, self.game.player2)
+        }
+        for action in state_change.of(ATTACK).tolist():
+            _, player, _, _, fx, fy, tx, ty, _ = action
+            attacker_pos = self.get_center(fx, fy)
+            target_pos = self.get_center(tx, ty)
+            pygame.draw.line(self.screen, colors[player], attacker_pos, target_pos, 2)
 
     def render_tile(self, tile):
-        self.render_rubble(tile)
-        self.render_resource(tile)
+        if not self.is_visible(tile):
+            return
         self.render_occupant(tile)
-        if self.debug:
-            self.render_health(tile)
-            self.render_cooldown(tile)
-            self.render_attack_range(tile)
-            self.render_unit_vision_range(tile)
+        if self.debug and tile.is_occupied():
+            self.range_tiles.append(tile)
+
+    def is_visible(self, tile):
+        if self.fog_player is None:
+            return True
+        perception = self.game.perception.get(self.fog_player)
+        if perception is None:
+            return True
+        return perception.is_visible(tile.x, tile.y)
 
-    def render_rubble(self, tile):
+    def render_fog(self, tile):
+        self.blit_queue.append((self.fog, self.get_rect(tile.x, tile.y)))
+
+    def render_rubble(self, surface, tile):
         rubble = tile.rubble
         if rubble == 0:
             return
         color = (rubble * 50, rubble * 50, rubble * 50)
-        pygame.draw.rect(self.screen, color, self.get_rect(tile.x, tile.y))
+        pygame.draw.rect(surface, color, self.get_rect(tile.x, tile.y))
 
     def render_resource(self, tile):
         resource = tile.resource
         if resource == 0:
             return
-        color = (0, 255, 0)
-        circle_radius = 5
-        pygame.draw.circle(
-            self.screen, color, self.get_center(tile.x, tile.y), circle_radius
-        )
+        self.queue_sprite(("resource",), tile, self.make_resource)
 
     def render_occupant(self, tile):
+        # One sprite per unit, with its health bar and cooldowns baked in
+        # when debugging; there are only so many combinations to cache
         if not tile.is_occupied():
             return
         occupant = tile.occupant
-        color = occupant.player.color
         if isinstance(occupant, Spawner):
-            pygame.draw.rect(self.screen, color, self.get_rect(tile.x, tile.y))
+            kind = "spawner"
         elif isinstance(occupant, Soldier):
-            pygame.draw.circle(self.screen, color, self.get_center(tile.x, tile.y), 10)
-            # pygame.draw.rect(self.screen, color, self.get_rect(tile.x, tile.y))
+            kind = "soldier"
+        else:
+            return
+        key = ("unit", kind, occupant.player.color)
+        if self.debug:
+            key += (
+                max(min(occupant.health, occupant.max_health), 0),
+                occupant.max_health,
+                max(occupant.move_cooldown, 0),
+                max(occupant.action_cooldown, 0),
+            )
+        self.queue_sprite(key, tile, self.make_unit)
+
+    def render_health(self, sprite, health, max_health):
+        if max_health <= 0:
+            return
+        width = self.cell_size - 4
+        filled = round(width * health / max_health)
+        pygame.draw.rect(sprite, (200, 0, 0), (2, 2, width, HEALTH_BAR_HEIGHT))
+        if filled > 0:
+            pygame.draw.rect(sprite, (0, 220, 0), (2, 2, filled, HEALTH_BAR_HEIGHT))
 
-    def render_health(self, tile):
-        raise NotImplementedError
+    def render_cooldown(self, sprite, move_cooldown, action_cooldown):
+        # One dot per turn of cooldown along the bottom edge, move then action
+        y = self.cell_size - COOLDOWN_DOT - 2
+        x = 2
+        for count, color in (
+            (move_cooldown, MOVE_COOLDOWN_COLOR),
+            (action_cooldown, ACTION_COOLDOWN_COLOR),
+        ):
+            for _ in range(count):
+                if x + COOLDOWN_DOT > self.cell_size:
+                    return
+                pygame.draw.rect(sprite, color, (x, y, COOLDOWN_DOT, COOLDOWN_DOT))
+                x += COOLDOWN_DOT + 1
 
-    def render_cooldown(self, tile):
-        raise NotImplementedError
+    def render_ranges(self):
+        if len(self.range_tiles) > RANGE_CIRCLE_LIMIT:
+            self.render_range_coverage()
+            return
+        self.overlay.fill((0, 0, 0, 0))
+        for tile in self.range_tiles:
+            self.render_attack_range(tile)
+            self.render_unit_vision_range(tile)
+        self.screen.blit(self.overlay, (0, 0))
+
+    def render_range_coverage(self):
+        # Shades every cell some unit sees, darker where one can attack, in
+        # its player's color. Both players are blended at one pixel per cell
+        # and scaled up once, so the cost grows with the board, not the army.
+        board = self.game.board
+        shape = (board.height(), board.width())
+        # (player id, range kind) -> radius -> units
+        groups = {}
+        for tile in self.range_tiles:
+            unit = tile.occupant
+            for kind, radius in ((0, unit.vision_range), (1, unit.action_range)):
+                groups.setdefault((unit.player.id, kind), {}).setdefault(radius, []).append(unit)
+        color = np.zeros(shape + (3,))
+        alpha = np.zeros(shape)
+        for player in (self.game.player1, self.game.player2):
+            layer = np.zeros(shape)
+            for kind, value in ((0, VISION_RANGE_ALPHA), (1, ATTACK_RANGE_ALPHA)):
+                covered = np.zeros(shape, dtype=bool)
+                for radius, units in groups.get((player.id, kind), {}).items():
+                    if radius > 0:
+                        dilate(covered, units, disk_mask(radius))
+                layer[covered] = value / 255
+            # Premultiplied "over"
+            color = color * (1 - layer[..., None]) + np.array(player.color) * layer[..., None]
+            alpha = alpha * (1 - layer) + layer
+        if self.coverage is None:
+            self.coverage = pygame.Surface((shape[1], shape[0]), pygame.SRCALPHA)
+        shown = alpha > 0
+        color[shown] /= alpha[shown, None]
+        pygame.surfarray.blit_array(self.coverage, color.astype(np.uint8).transpose(1, 0, 2))
+        pixels = pygame.surfarray.pixels_alpha(self.coverage)
+        pixels[...] = (alpha * 255).astype(np.uint8).T
+        del pixels
+        pygame.transform.scale(self.coverage, (self.width, self.height), self.overlay)
+        self.screen.blit(self.overlay, (0, 0))
 
     def render_attack_range(self, tile):
-        raise NotImplementedError
+        unit = tile.occupant
+        self.render_range(tile, unit.action_range, (*unit.player.color, ATTACK_RANGE_ALPHA))
 
     def render_unit_vision_range(self, tile):
-        raise NotImplementedError
+        unit = tile.occupant
+        self.render_range(tile, unit.vision_range, (*unit.player.color, VISION_RANGE_ALPHA))
+
+    def render_range(self, tile, radius, color):
+        if radius <= 0:
+            return
+        pygame.draw.circle(
+            self.overlay,
+            color,
+            self.get_center(tile.x, tile.y),
+            int(radius * self.cell_size),
+            1,
+        )
+
+    def queue_sprite(self, key, tile, make):
+        # Sprites are cell sized and drawn over the tile's corner
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = make(*key[1:])
+            self.sprites[key] = sprite
+        self.blit_queue.append(
+            (sprite, (tile.x * self.cell_size, tile.y * self.cell_size))
+        )
+
+    def new_sprite(self):
+        return pygame.Surface((self.cell_size, self.cell_size), pygame.SRCALPHA)
+
+    def make_resource(self):
+        sprite = self.new_sprite()
+        pygame.draw.circle(sprite, (0, 255, 0), self.get_center(0, 0), 5)
+        return sprite
+
+    def make_unit(self, kind, color, health=None, max_health=None, move_cooldown=0, action_cooldown=0):
+        sprite = self.new_sprite()
+        if kind == "spawner":
+            sprite.fill(color)
+        else:
+            pygame.draw.circle(sprite, color, self.get_center(0, 0), 10)
+        if health is not None:
+            self.render_health(sprite, health, max_health)
+            self.render_cooldown(sprite, move_cooldown, action_cooldown)
+        return sprite
 
     def get_rect(self, x, y):
         return pygame.Rect(
@@ -0,0 +1,106 @@
+import json
+
+import numpy as np
+
+from gptgame.match import create_game
+from gptgame.statechange import ACTION_NAMES
+
+
+class Replay:
+    def __init__(
+        self,
+        map_name: str,
+        spawn_units: tuple[str, str],
+        seed: int,
+        turns: int,
+        checksums: list[int] = None,
+    ) -> None:
+        self.map_name = map_name
+        self.spawn_units = tuple(spawn_units)
+        self.seed = seed
+        self.turns = turns
+        self.checksums = checksums or []
+
+    def create_game(self):
+        return create_game(self.map_name, *self.spawn_units, seed=self.seed)
+
+    def to_dict(self, include_checksums: bool = True) -> dict:
+        data = {
+            "map": self.map_name,
+            "units": list(self.spawn_units),
+            "seed": self.seed,
+            "turns": self.turns,
+        }
+        if include_checksums:
+            data["checksums"] = self.checksums
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Replay":
+        return cls(
+            data["map"],
+            data["units"],
+            data["seed"],
+            data["turns"],
+            data.get("checksums"),
+        )
+
+    def dumps(self, include_checksums: bool = True) -> str:
+        return json.dumps(
+            self.to_dict(include_checksums), separators=(",", ":")
+        )
+
+    @classmethod
+    def loads(cls, data: str) -> "Replay":
+        return cls.from_dict(json.loads(data))
+
+
+def record(map_name: str, spawn_unit1: str, spawn_unit2: str, seed: int, max_turns: int) -> Replay:
+    game = create_game(map_name, spawn_unit1, spawn_unit2, seed=seed)
+    checksums = []
+    for _ in range(max_turns):
+        game.update()
+        checksums.append(game.checksum())
+        game.check_for_winner()
+        if game.get_winner() is not None:
+            break
+    return Replay(map_name, (spawn_unit1, spawn_unit2), seed, len(checksums), checksums)
+
+
+def play(replay: Replay, verify: bool = True):
+    # Re-simulate a match from its seed, yielding the game and each turn's StateChange
+    game = replay.create_game()
+    for turn in range(replay.turns):
+        state_change = game.update()
+        if verify and turn < len(replay.checksums):
+            checksum = game.checksum()
+            if checksum != replay.checksums[turn]:
+                raise Exception(
+                    f"Replay diverged at turn {turn + 1}: "
+                    f"expected {replay.checksums[turn]}, got {checksum}"
+                )
+        yield game, state_change
+
+
+def verify(replay: Replay) -> bool:
+    for _ in play(replay, verify=True):
+        pass
+    return True
+
+
+def summarize(replay: Replay) -> dict:
+    # Per player and action kind: how many were executed and the sum of
+    # their values (damage dealt, health healed, resources harvested, ...)
+    counts = np.zeros((3, len(ACTION_NAMES) + 1), dtype=np.int64)
+    values = np.zeros_like(counts)
+    for _, state_change in play(replay, verify=False):
+        actions = state_change.actions
+        np.add.at(counts, (actions["player"], actions["code"]), 1)
+        np.add.at(values, (actions["player"], actions["code"]), actions["value"])
+    return {
+        player: {
+            name: {"count": int(counts[player, code]), "value": int(values[player, code])}
+            for code, name in ACTION_NAMES.items()
+        }
+        for player in (1, 2)
+    }
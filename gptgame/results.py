@@ -0,0 +1,300 @@
+import argparse
+import itertools
+import multiprocessing
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from gptgame.match import create_game
+from gptgame.sharedmap import SharedMap, attach
+
+INITIAL_RATING = 1500.0
+K_FACTOR = 16.0
+DRAW = 0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    map TEXT NOT NULL,
+    unit1 TEXT NOT NULL,
+    unit2 TEXT NOT NULL,
+    seed INTEGER NOT NULL,
+    winner INTEGER NOT NULL,
+    turns INTEGER NOT NULL,
+    played_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS matches_pair ON matches (unit1, unit2, map);
+CREATE INDEX IF NOT EXISTS matches_map ON matches (map);
+CREATE INDEX IF NOT EXISTS matches_seed ON matches (seed);
+CREATE INDEX IF NOT EXISTS matches_played_at ON matches (played_at);
+CREATE TABLE IF NOT EXISTS pair_stats (
+    unit_a TEXT NOT NULL,
+    unit_b TEXT NOT NULL,
+    map TEXT NOT NULL,
+    games INTEGER NOT NULL,
+    wins_a INTEGER NOT NULL,
+    wins_b INTEGER NOT NULL,
+    PRIMARY KEY (unit_a, unit_b, map)
+);
+CREATE TABLE IF NOT EXISTS ratings (
+    unit TEXT PRIMARY KEY,
+    rating REAL NOT NULL,
+    games INTEGER NOT NULL
+);
+"""
+
+
+class MatchResult:
+    def __init__(
+        self,
+        map_name: str,
+        unit1: str,
+        unit2: str,
+        seed: int,
+        winner: int,
+        turns: int,
+        played_at: float = None,
+    ) -> None:
+        self.map_name = map_name
+        self.unit1 = unit1
+        self.unit2 = unit2
+        self.seed = seed
+        # Winning player id, or DRAW
+        self.winner = winner
+        self.turns = turns
+        self.played_at = time.time() if played_at is None else played_at
+
+    def row(self) -> tuple:
+        return (
+            self.map_name,
+            self.unit1,
+            self.unit2,
+            self.seed,
+            self.winner,
+            self.turns,
+            self.played_at,
+        )
+
+
+def expected_score(rating: float, opponent: float) -> float:
+    return 1.0 / (1.0 + 10 ** ((opponent - rating) / 400.0))
+
+
+class ResultStore:
+    # Raw results plus aggregates kept up to date on every insert: per pair
+    # and map counts, and an Elo rating per Soldier class. Pair queries and
+    # ratings never rescan the matches table.
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.db.close()
+
+    def add_results(self, results: list) -> None:
+        # One transaction per batch
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO matches (map, unit1, unit2, seed, winner, turns, played_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [result.row() for result in results],
+            )
+            self.db.executemany(
+                "INSERT INTO pair_stats VALUES (?, ?, ?, 1, ?, ?)"
+                " ON CONFLICT (unit_a, unit_b, map) DO UPDATE SET"
+                " games = games + 1,"
+                " wins_a = wins_a + excluded.wins_a,"
+                " wins_b = wins_b + excluded.wins_b",
+                [self.pair_row(result) for result in results],
+            )
+            self.update_ratings(results)
+
+    def pair_row(self, result: MatchResult) -> tuple:
+        # Pairs are stored once, alphabetically, whichever side played player 1
+        wins1 = int(result.winner == 1)
+        wins2 = int(result.winner == 2)
+        if result.unit1 <= result.unit2:
+            return (result.unit1, result.unit2, result.map_name, wins1, wins2)
+        return (result.unit2, result.unit1, result.map_name, wins2, wins1)
+
+    def update_ratings(self, results: list) -> None:
+        units = {unit for result in results for unit in (result.unit1, result.unit2)}
+        ratings = self.ratings(units)
+        games = {unit: ratings[unit][1] for unit in units}
+        ratings = {unit: ratings[unit][0] for unit in units}
+        for result in results:
+            if result.unit1 == result.unit2:
+                continue
+            rating1 = ratings[result.unit1]
+            rating2 = ratings[result.unit2]
+            score = {1: 1.0, 2: 0.0}.get(result.winner, 0.5)
+            change = K_FACTOR * (score - expected_score(rating1, rating2))
+            ratings[result.unit1] = rating1 + change
+            ratings[result.unit2] = rating2 - change
+            games[result.unit1] += 1
+            games[result.unit2] += 1
+        self.db.executemany(
+            "INSERT OR REPLACE INTO ratings VALUES (?, ?, ?)",
+            [(unit, ratings[unit], games[unit]) for unit in units],
+        )
+
+    def ratings(self, units=None) -> dict:
+        # {unit: (rating, games)}; unknown units get the initial rating
+        rows = self.db.execute("SELECT unit, rating, games FROM ratings").fetchall()
+        found = {unit: (rating, games) for unit, rating, games in rows}
+        if units is None:
+            return found
+        return {unit: found.get(unit, (INITIAL_RATING, 0)) for unit in units}
+
+    def pair_record(self, unit: str, opponent: str, map_name: str = None) -> tuple:
+        # (games, wins of unit, wins of opponent), over all maps if map_name is None
+        swap = unit > opponent
+        unit_a, unit_b = (opponent, unit) if swap else (unit, opponent)
+        query = "SELECT SUM(games), SUM(wins_a), SUM(wins_b) FROM pair_stats WHERE unit_a = ? AND unit_b = ?"
+        params = [unit_a, unit_b]
+        if map_name is not None:
+            query += " AND map = ?"
+            params.append(map_name)
+        games, wins_a, wins_b = self.db.execute(query, params).fetchone()
+        if games is None:
+            return 0, 0, 0
+        if swap:
+            wins_a, wins_b = wins_b, wins_a
+        return games, wins_a, wins_b
+
+    def win_rate(self, unit: str, opponent: str, map_name: str = None) -> float:
+        games, wins, _ = self.pair_record(unit, opponent, map_name)
+        if games == 0:
+            return None
+        return wins / games
+
+    def count(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+
+
+class ResultWriter:
+    # The single owner of the database. Any process may put MatchResults on
+    # queue; a thread here drains it and commits them in batches.
+    def __init__(self, path: str, batch_size: int = 500, flush_interval: float = 1.0) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # A managed queue, unlike a plain one, can be passed to pool workers
+        self.manager = multiprocessing.Manager()
+        self.queue = self.manager.Queue()
+        self.written = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self) -> None:
+        store = ResultStore(self.path)
+        batch = []
+        done = False
+        while not done:
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    result = self.queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if result is None:
+                    done = True
+                    break
+                batch.append(result)
+            if batch:
+                store.add_results(batch)
+                self.written += len(batch)
+                batch = []
+        store.close()
+
+    def close(self) -> None:
+        self.queue.put(None)
+        self.thread.join()
+        self.manager.shutdown()
+
+
+def play_match(
+    map_name: str, unit1: str, unit2: str, seed: int, max_turns: int, shared=None
+) -> MatchResult:
+    static_map = attach(shared) if shared is not None else None
+    game = create_game(map_name, unit1, unit2, seed=seed, static_map=static_map)
+    for _ in range(max_turns):
+        game.update()
+        game.check_for_winner()
+        if game.get_winner() is not None:
+            break
+    winner = game.get_winner()
+    return MatchResult(
+        map_name, unit1, unit2, seed, DRAW if winner is None else winner.id, game.turn - 1
+    )
+
+
+def play_and_submit(results, *args) -> None:
+    results.put(play_match(*args))
+
+
+def run_tournament(
+    path: str,
+    units: list,
+    seeds,
+    map_name: str = "default",
+    max_turns: int = 1000,
+    workers: int = None,
+) -> int:
+    # Every ordered pair of distinct units on every seed. The workers share
+    # one copy of the map's static data.
+    writer = ResultWriter(path)
+    try:
+        with SharedMap(map_name) as shared, ProcessPoolExecutor(workers) as executor:
+            futures = [
+                executor.submit(
+                    play_and_submit,
+                    writer.queue,
+                    map_name,
+                    unit1,
+                    unit2,
+                    seed,
+                    max_turns,
+                    shared.spec,
+                )
+                for unit1, unit2 in itertools.permutations(units, 2)
+                for seed in seeds
+            ]
+            for future in futures:
+                future.result()
+    finally:
+        writer.close()
+    return writer.written
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Play a tournament into a results database")
+    parser.add_argument("database")
+    parser.add_argument("units", nargs="+")
+    parser.add_argument("--map", default="default")
+    parser.add_argument("--seeds", type=int, default=10)
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--turns", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    seeds = range(args.first_seed, args.first_seed + args.seeds)
+    run_tournament(args.database, args.units, seeds, args.map, args.turns, args.workers)
+    store = ResultStore(args.database)
+    for unit, (rating, games) in sorted(
+        store.ratings().items(), key=lambda item: -item[1][0]
+    ):
+        print(f"{unit}: {rating:.0f} ({games} games)")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
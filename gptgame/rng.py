@@ -0,0 +1,23 @@
+import random
+
+
+class GameRNG:
+    # Independent named streams derived from one seed; streams are created
+    # on first use, so adding one never shifts the others
+    def __init__(self, seed: int) -> None:
+        self.seed = seed
+        self.streams = {}
+
+    def stream(self, name: str) -> random.Random:
+        rng = self.streams.get(name)
+        if rng is None:
+            rng = random.Random(f"{self.seed}:{name}")
+            self.streams[name] = rng
+        return rng
+
+    def getstate(self) -> dict:
+        return {name: rng.getstate() for name, rng in self.streams.items()}
+
+    def setstate(self, state: dict) -> None:
+        for name, rng_state in state.items():
+            self.stream(name).setstate(rng_state)
@@ -0,0 +1,190 @@
+import multiprocessing
+import time
+import traceback
+
+import numpy as np
+
+from gptgame.checkpoint import decode_value, encode_value
+from gptgame.policy import ENGINE_STATE, NO_TARGET, Policy, ScriptedPolicy, UnitBatch
+
+
+def save_ai_state(unit) -> dict:
+    # What the AI keeps on a unit between turns, with tiles stored by
+    # position so the state can be restored onto another copy of the board
+    return {
+        name: encode_value(value)
+        for name, value in unit.__dict__.items()
+        if name not in ENGINE_STATE
+    }
+
+
+def load_ai_state(unit, state: dict, board) -> None:
+    for name, value in state.items():
+        setattr(unit, name, decode_value(value, board))
+
+
+def run_worker(conn, unit_class=None) -> None:
+    # Decides for one player's units on a clone of the game, with the
+    # player's reservation table for the turn, and sends back the arrays,
+    # the AI state of every unit and the player's AI stream state, so a
+    # sandboxed match plays exactly as an in-process one would. An AI that
+    # raises is reported instead of killing the worker.
+    policy = ScriptedPolicy(unit_class)
+    while True:
+        request = conn.recv()
+        if request is None:
+            break
+        game, player_id, unit_ids, ai_state, reservations = request
+        start = time.process_time()
+        try:
+            perception = game.perceive()[player_id]
+            units_by_id = {unit.id: unit for unit in game.all_units()}
+            units = [units_by_id[unit_id] for unit_id in unit_ids]
+            stream = None
+            scripts = []
+            for unit in units:
+                stream = f"{unit.rng_stream}:{player_id}"
+                unit.rng = game.rng.stream(stream)
+                unit.perception = perception
+                unit.reservations = reservations
+                script = policy.script(unit)
+                if unit.id in ai_state:
+                    load_ai_state(script, ai_state[unit.id], game.board)
+                scripts.append(script)
+            moves, attacks = policy.decide(UnitBatch(game, units))
+            rng_state = None if stream is None else (stream, game.rng.stream(stream).getstate())
+            ai_state = {unit.id: save_ai_state(script) for unit, script in zip(units, scripts)}
+        except Exception:
+            conn.send(("error", traceback.format_exc()))
+            continue
+        conn.send(("ok", moves, attacks, rng_state, ai_state, time.process_time() - start))
+
+
+class SandboxedPolicy(Policy):
+    # Runs the units' own AI in a worker process with a hard wall-clock
+    # budget per turn. A worker that misses it, dies or whose AI raises is
+    # killed and restarted, and the player's units stay idle for that turn.
+    # The AI's per-unit state is kept here rather than in the worker, so it
+    # outlives restarts.
+    def __init__(self, time_budget: float = 0.1, unit_class=None) -> None:
+        self.time_budget = time_budget
+        self.unit_class = unit_class
+        self.process = None
+        self.conn = None
+        self.turns = 0
+        self.timeouts = 0
+        # Turns lost to a worker that died or an AI that raised
+        self.failures = 0
+        self.last_error = None
+        # unit id -> what its AI remembers, see save_ai_state
+        self.ai_state = {}
+        # Seconds of wall time spent waiting on, and CPU time used by, the worker
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.last_wall_time = 0.0
+
+    def start(self) -> None:
+        parent, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=run_worker, args=(child, self.unit_class), daemon=True
+        )
+        self.process.start()
+        child.close()
+        self.conn = parent
+
+    def close(self) -> None:
+        if self.process is None:
+            return
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+        self.process = None
+        self.conn = None
+
+    def restart(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+        self.process = None
+        self.start()
+
+    def decide(self, batch: UnitBatch) -> tuple[np.ndarray, np.ndarray]:
+        moves = batch.positions.copy()
+        attacks = np.full(len(batch), NO_TARGET, dtype=np.int64)
+        if len(batch) == 0:
+            return moves, attacks
+        if self.process is None:
+            self.start()
+
+        game = batch.game
+        self.turns += 1
+        start = time.perf_counter()
+        ids = [int(i) for i in batch.ids]
+        ai_state = {unit_id: self.ai_state[unit_id] for unit_id in ids if unit_id in self.ai_state}
+        # The clone leaves out this turn's reservations, which cooperative
+        # units plan against
+        reservations = batch.units[0].reservations
+        reply = None
+        try:
+            self.conn.send((game.clone(), batch.player.id, ids, ai_state, reservations))
+            if self.conn.poll(max(self.time_budget - (time.perf_counter() - start), 0)):
+                reply = self.conn.recv()
+            else:
+                self.timeouts += 1
+        except (EOFError, OSError) as exc:
+            # OSError covers BrokenPipeError and a reset connection
+            self.failures += 1
+            self.last_error = f"worker died: {exc!r}"
+        if reply is not None and reply[0] == "error":
+            self.failures += 1
+            self.last_error = reply[1]
+            reply = None
+        if reply is None:
+            self.restart()
+        else:
+            _, moves, attacks, rng_state, self.ai_state, cpu_time = reply
+            self.cpu_time += cpu_time
+            if rng_state is not None:
+                stream, state = rng_state
+                game.rng.stream(stream).setstate(state)
+        self.last_wall_time = time.perf_counter() - start
+        self.wall_time += self.last_wall_time
+        return moves, attacks
+
+    def usage(self) -> dict:
+        return {
+            "turns": self.turns,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "wall_time": self.wall_time,
+            "cpu_time": self.cpu_time,
+        }
+
+
+def sandbox_players(game, time_budget: float = 0.1, ai_state: dict = None) -> dict:
+    # Puts every player's unit AI in its own sandbox; close them when done.
+    # ai_state, player id -> SandboxedPolicy.ai_state as saved with a
+    # checkpoint, carries the AIs' memory over to the resumed match.
+    ai_state = ai_state or {}
+    policies = {}
+    for player in (game.player1, game.player2):
+        policies[player.id] = SandboxedPolicy(time_budget)
+        policies[player.id].ai_state = dict(ai_state.get(player.id, {}))
+        game.controllers[player.id] = policies[player.id]
+    return policies
+
+
+def restore_ai_state(game, ai_state: dict) -> None:
+    # Hands the AI state of a sandboxed match back to the units themselves,
+    # for resuming it in process
+    units_by_id = {unit.id: unit for unit in game.all_units()}
+    for states in ai_state.values():
+        for unit_id, state in states.items():
+            if unit_id in units_by_id:
+                load_ai_state(units_by_id[unit_id], state, game.board)
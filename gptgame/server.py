@@ -0,0 +1,349 @@
+import asyncio
+import itertools
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from gptgame.match import create_game
+from gptgame.perception import Perception
+from gptgame.policy import NO_TARGET, Policy, UnitBatch
+from gptgame.spectator import Broadcaster
+
+# Newline-delimited JSON over TCP.
+#   client -> server  {"type": "join"}
+#   server -> client  {"type": "joined", "game": id, "player": 1 | 2}
+#   server -> client  {"type": "state", "turn": t, "deadline": seconds,
+#                      "units": [[id, x, y, health, move_cd, action_cd], ...],
+#                      "enemies": [[id, x, y, health], ...]}
+#   client -> server  {"type": "actions", "turn": t,
+#                      "moves": [[id, x, y], ...], "attacks": [[id, target_id], ...]}
+#   server -> client  {"type": "end", "winner": player id or null, "turns": n}
+#                     plus "error": message when a turn failed to resolve
+#   client -> server  {"type": "spectate", "game": id}
+#   server -> client  {"type": "spectating", "game": id}, then spectator
+#                     frames, each prefixed by its 4-byte little-endian length
+# Units without a submitted move stay put; late or missing submissions
+# leave the player's whole army idle for that turn. Lines that aren't JSON
+# objects and malformed entries are ignored, and once a player disconnects
+# turns no longer wait for them.
+
+MAX_ID = np.iinfo(np.int64).max
+
+
+class SubmittedActions(Policy):
+    def __init__(self, moves: dict = None, attacks: dict = None) -> None:
+        self.moves = moves or {}
+        self.attacks = attacks or {}
+
+    def decide(self, batch: UnitBatch):
+        moves = batch.positions.copy()
+        attacks = np.full(len(batch), NO_TARGET, dtype=np.int64)
+        for i, unit_id in enumerate(batch.ids):
+            unit_id = int(unit_id)
+            if unit_id in self.moves:
+                moves[i] = self.moves[unit_id]
+            if unit_id in self.attacks:
+                attacks[i] = self.attacks[unit_id]
+        return moves, attacks
+
+
+def resolve_turn(game, submissions: dict):
+    # Runs in the executor; the game travels there and back by pickling
+    # when the executor is a process pool
+    for player in (game.player1, game.player2):
+        moves, attacks = submissions.get(player.id, ({}, {}))
+        game.controllers[player.id] = SubmittedActions(moves, attacks)
+    game.update()
+    game.controllers = {}
+    game.check_for_winner()
+    return game
+
+
+def integer_rows(items, size: int) -> list:
+    # The entries of items that are lists of size integers
+    if not isinstance(items, list):
+        return []
+    return [
+        item
+        for item in items
+        if isinstance(item, list) and len(item) == size and all(type(v) is int for v in item)
+    ]
+
+
+def is_id(value: int) -> bool:
+    return 0 <= value <= MAX_ID
+
+
+def parse_actions(message: dict, width: int, height: int) -> tuple[dict, dict]:
+    # Malformed entries are dropped and moves clamped to the board, so no
+    # submission can fail the turn
+    moves = {
+        unit_id: (min(max(x, 0), width - 1), min(max(y, 0), height - 1))
+        for unit_id, x, y in integer_rows(message.get("moves"), 3)
+        if is_id(unit_id)
+    }
+    attacks = {
+        unit_id: target
+        for unit_id, target in integer_rows(message.get("attacks"), 2)
+        if is_id(unit_id) and is_id(target)
+    }
+    return moves, attacks
+
+
+def state_message(game, player, deadline: float) -> dict:
+    enemies = game.player2 if player is game.player1 else game.player1
+    perception = Perception(player, game.board, enemies.get_units())
+    return {
+        "type": "state",
+        "turn": game.turn,
+        "deadline": deadline,
+        "units": [
+            [unit.id, unit.x, unit.y, unit.health, unit.move_cooldown, unit.action_cooldown]
+            for unit in player.get_units()
+        ],
+        "enemies": [
+            [enemy.id, enemy.x, enemy.y, enemy.health]
+            for enemy in perception.visible_enemies
+        ],
+    }
+
+
+async def send(writer, message: dict) -> None:
+    writer.write(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+    await writer.drain()
+
+
+class Match:
+    def __init__(self, match_id: int, game, server: "MatchServer") -> None:
+        self.id = match_id
+        self.game = game
+        self.server = server
+        self.writers = {}
+        self.submissions = {}
+        self.submitted = asyncio.Event()
+        self.broadcaster = Broadcaster()
+        self.broadcaster.publish(game)
+        self.task = None
+
+    def is_full(self) -> bool:
+        return len(self.writers) == 2
+
+    def submit(self, player_id: int, message: dict) -> None:
+        if message.get("turn") != self.game.turn or player_id not in self.writers:
+            return
+        board = self.game.board
+        self.submissions[player_id] = parse_actions(message, board.width(), board.height())
+        self.check_submitted()
+
+    def leave(self, player_id: int) -> None:
+        self.writers.pop(player_id, None)
+        self.check_submitted()
+
+    def check_submitted(self) -> None:
+        # Every connected player has submitted for this turn
+        if set(self.writers) <= set(self.submissions):
+            self.submitted.set()
+
+    async def run(self) -> None:
+        error = None
+        try:
+            await self.play()
+        except Exception as exc:
+            # A turn that fails to resolve ends this match, not the server
+            error = f"{type(exc).__name__}: {exc}"
+        await self.finish(error)
+
+    async def play(self) -> None:
+        loop = asyncio.get_running_loop()
+        server = self.server
+        while True:
+            self.submissions = {}
+            self.submitted.clear()
+            for player in (self.game.player1, self.game.player2):
+                writer = self.writers.get(player.id)
+                if writer is not None and not writer.is_closing():
+                    try:
+                        await send(writer, state_message(self.game, player, server.turn_deadline))
+                    except ConnectionError:
+                        self.leave(player.id)
+            self.check_submitted()
+            try:
+                await asyncio.wait_for(self.submitted.wait(), server.turn_deadline)
+            except asyncio.TimeoutError:
+                pass
+            self.game = await loop.run_in_executor(
+                server.executor, resolve_turn, self.game, dict(self.submissions)
+            )
+            self.broadcaster.publish(self.game)
+            winner = self.game.get_winner()
+            if winner is not None or self.game.turn > server.max_turns:
+                break
+
+    async def finish(self, error: str = None) -> None:
+        winner = self.game.get_winner()
+        message = {
+            "type": "end",
+            "winner": None if winner is None else winner.id,
+            "turns": self.game.turn - 1,
+        }
+        if error is not None:
+            message["error"] = error
+        for writer in list(self.writers.values()):
+            if not writer.is_closing():
+                try:
+                    await send(writer, message)
+                except ConnectionError:
+                    pass
+            writer.close()
+        self.broadcaster.close()
+        self.server.finished(self, error)
+
+
+class MatchServer:
+    # Hosts many matches on one event loop. Turn resolution is CPU bound and
+    # goes to executor, by default a process pool the server owns, so a slow
+    # game never blocks the other matches' networking or deadlines.
+    def __init__(
+        self,
+        map_name: str = "default",
+        spawn_units: tuple[str, str] = ("Soldier21", "Soldier21"),
+        turn_deadline: float = 1.0,
+        max_turns: int = 1000,
+        executor=None,
+        workers: int = None,
+    ) -> None:
+        self.map_name = map_name
+        self.spawn_units = spawn_units
+        self.turn_deadline = turn_deadline
+        self.max_turns = max_turns
+        # Only an executor the server created is shut down by close()
+        self.owns_executor = executor is None
+        self.executor = ProcessPoolExecutor(workers) if executor is None else executor
+        self.matches = {}
+        self.results = []
+        # (match id, error) of matches ended by a turn that failed
+        self.errors = []
+        self.waiting = None
+        self.ids = itertools.count(1)
+        self.server = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        self.server = await asyncio.start_server(self.handle_client, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        for match in list(self.matches.values()):
+            if match.task is not None:
+                match.task.cancel()
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.owns_executor:
+            self.executor.shutdown(cancel_futures=True)
+
+    def join(self, writer) -> tuple[Match, int]:
+        if self.waiting is None:
+            match_id = next(self.ids)
+            game = create_game(self.map_name, *self.spawn_units, seed=match_id)
+            self.waiting = Match(match_id, game, self)
+            self.matches[match_id] = self.waiting
+        match = self.waiting
+        player_id = len(match.writers) + 1
+        match.writers[player_id] = writer
+        if match.is_full():
+            self.waiting = None
+            match.task = asyncio.create_task(match.run())
+        return match, player_id
+
+    def finished(self, match: Match, error: str = None) -> None:
+        winner = match.game.get_winner()
+        self.results.append((match.id, None if winner is None else winner.id))
+        if error is not None:
+            self.errors.append((match.id, error))
+        del self.matches[match.id]
+
+    async def handle_client(self, reader, writer) -> None:
+        match = None
+        player_id = None
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ConnectionError:
+                    break
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(message, dict):
+                    continue
+                if message.get("type") == "join" and match is None:
+                    match, player_id = self.join(writer)
+                    await send(
+                        writer, {"type": "joined", "game": match.id, "player": player_id}
+                    )
+                elif message.get("type") == "actions" and match is not None:
+                    match.submit(player_id, message)
+                elif message.get("type") == "spectate" and match is None:
+                    spectated = self.matches.get(message.get("game"))
+                    if spectated is not None:
+                        await self.spectate(spectated, writer)
+                    break
+        finally:
+            if match is not None:
+                match.leave(player_id)
+            writer.close()
+
+    async def spectate(self, match: Match, writer) -> None:
+        # An empty frame marks the end of the match
+        queue = match.broadcaster.subscribe()
+        await send(writer, {"type": "spectating", "game": match.id})
+        try:
+            while True:
+                frame = await queue.get()
+                writer.write(len(frame).to_bytes(4, "little") + frame)
+                await writer.drain()
+                if not frame:
+                    break
+        finally:
+            match.broadcaster.unsubscribe(queue)
+
+
+async def play(host: str, port: int, bot) -> dict:
+    # Minimal client: bot(state) returns {"moves": [...], "attacks": [...]}
+    reader, writer = await asyncio.open_connection(host, port)
+    await send(writer, {"type": "join"})
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return None
+            message = json.loads(line)
+            if message["type"] == "state":
+                actions = bot(message)
+                await send(writer, {"type": "actions", "turn": message["turn"], **actions})
+            elif message["type"] == "end":
+                return message
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def watch(host: str, port: int, game_id: int):
+    # Yields every spectator frame of a running match
+    reader, writer = await asyncio.open_connection(host, port)
+    await send(writer, {"type": "spectate", "game": game_id})
+    try:
+        line = await reader.readline()
+        if not line or json.loads(line)["type"] != "spectating":
+            return
+        while True:
+            size = int.from_bytes(await reader.readexactly(4), "little")
+            if size == 0:
+                return
+            yield await reader.readexactly(size)
+    finally:
+        writer.close()
@@ -0,0 +1,83 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from gptgame.los import LineOfSight
+from gptgame.maps import get_map
+
+# Offsets of the arrays inside the block are rounded up to this
+ALIGNMENT = 64
+
+
+class MapSpec:
+    # Everything a worker needs to attach a published map. Small and
+    # picklable, so it can be passed along with each task.
+    def __init__(self, map_name: str, memory_name: str, layout: list, radius: int) -> None:
+        self.map_name = map_name
+        self.memory_name = memory_name
+        # (array name, dtype string, shape, byte offset)
+        self.layout = layout
+        self.radius = radius
+
+
+class SharedMap:
+    # Publishes the static parts of a map once: rubble, the initial
+    # resources and every tile's line of sight mask, in one shared memory
+    # block. The owner must close() it, which also frees the block.
+    def __init__(self, map_name: str, radius: int = 8) -> None:
+        rubble, resource = get_map(map_name)
+        rubble = np.array(rubble, dtype=np.int8)
+        arrays = {
+            "rubble": rubble,
+            "resource": np.array(resource, dtype=np.int32),
+            "visibility": LineOfSight(rubble, radius).all_masks(),
+        }
+        layout = []
+        offset = 0
+        for name, array in arrays.items():
+            offset = -(-offset // ALIGNMENT) * ALIGNMENT
+            layout.append((name, array.dtype.str, array.shape, offset))
+            offset += array.nbytes
+        self.memory = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for name, dtype, shape, offset in layout:
+            view = np.ndarray(shape, dtype, buffer=self.memory.buf, offset=offset)
+            view[...] = arrays[name]
+            del view
+        self.spec = MapSpec(map_name, self.memory.name, layout, radius)
+
+    def close(self) -> None:
+        self.memory.close()
+        self.memory.unlink()
+
+    def __enter__(self) -> "SharedMap":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class StaticMap:
+    # Read-only views of a published map inside one process
+    def __init__(self, spec: MapSpec) -> None:
+        self.map_name = spec.map_name
+        self.radius = spec.radius
+        self.memory = shared_memory.SharedMemory(name=spec.memory_name)
+        for name, dtype, shape, offset in spec.layout:
+            view = np.ndarray(shape, dtype, buffer=self.memory.buf, offset=offset)
+            view.setflags(write=False)
+            setattr(self, name, view)
+        # Landmark heuristics built in this process, shared by its boards.
+        # They depend on the units' step costs, so they aren't published.
+        self.heuristics = {}
+
+
+# Memory name -> StaticMap, so each process attaches a map only once
+_attached = {}
+
+
+def attach(spec: MapSpec) -> StaticMap:
+    static = _attached.get(spec.memory_name)
+    if static is None:
+        static = StaticMap(spec)
+        _attached[spec.memory_name] = static
+    return static
@@ -0,0 +1,244 @@
+import asyncio
+
+import numpy as np
+
+from gptgame import unit as unit_module
+
+KEYFRAME = 0
+DELTA = 1
+
+# Every Unit subclass in definition order; spawns and keyframes send the
+# index instead of the name, so viewers must run the same unit module
+UNIT_CLASSES = tuple(
+    name
+    for name, value in vars(unit_module).items()
+    if isinstance(value, type) and issubclass(value, unit_module.Unit)
+)
+CLASS_INDEX = {name: i for i, name in enumerate(UNIT_CLASSES)}
+
+HEADER = np.dtype(
+    [
+        ("kind", "u1"),
+        ("turn", "<u4"),
+        ("spawns", "<u4"),
+        ("moves", "<u4"),
+        ("health", "<u4"),
+        ("deaths", "<u4"),
+        ("resources", "<u4"),
+        ("player_resources", "<i4", 2),
+    ]
+)
+SPAWN = np.dtype(
+    [
+        ("id", "<u4"),
+        ("cls", "u1"),
+        ("player", "u1"),
+        ("x", "<u2"),
+        ("y", "<u2"),
+        ("health", "<i2"),
+    ]
+)
+MOVE = np.dtype([("id", "<u4"), ("x", "<u2"), ("y", "<u2")])
+HEALTH = np.dtype([("id", "<u4"), ("health", "<i2")])
+DEATH = np.dtype([("id", "<u4")])
+RESOURCE = np.dtype([("x", "<u2"), ("y", "<u2"), ("amount", "<i4")])
+SECTIONS = (
+    ("spawns", SPAWN),
+    ("moves", MOVE),
+    ("health", HEALTH),
+    ("deaths", DEATH),
+    ("resources", RESOURCE),
+)
+
+
+class Snapshot:
+    # What a spectator can see: units by id as (class, player, x, y, health)
+    def __init__(self, turn: int, units: dict, resources: np.ndarray, player_resources: tuple) -> None:
+        self.turn = turn
+        self.units = units
+        self.resources = resources
+        self.player_resources = player_resources
+
+    @classmethod
+    def from_game(cls, game) -> "Snapshot":
+        units = {
+            unit.id: (
+                CLASS_INDEX[unit.__class__.__name__],
+                unit.player.id,
+                unit.x,
+                unit.y,
+                unit.health,
+            )
+            for unit in game.all_units()
+            if unit.is_alive()
+        }
+        players = (game.player1.resources, game.player2.resources)
+        return cls(game.turn, units, game.board.resource_array.copy(), players)
+
+
+def pack(kind: int, turn: int, player_resources: tuple, records: dict) -> bytes:
+    header = np.zeros(1, HEADER)
+    header["kind"] = kind
+    header["turn"] = turn
+    header["player_resources"] = player_resources
+    parts = [header]
+    for name, dtype in SECTIONS:
+        rows = records.get(name, [])
+        header[name] = len(rows)
+        parts.append(np.array(rows, dtype=dtype))
+    return b"".join(part.tobytes() for part in parts)
+
+
+def unpack(frame: bytes) -> tuple[dict, dict]:
+    header = np.frombuffer(frame, HEADER, count=1)[0]
+    offset = HEADER.itemsize
+    records = {}
+    for name, dtype in SECTIONS:
+        count = int(header[name])
+        records[name] = np.frombuffer(frame, dtype, count=count, offset=offset)
+        offset += count * dtype.itemsize
+    return header, records
+
+
+def encode_keyframe(snapshot: Snapshot) -> bytes:
+    ys, xs = np.nonzero(snapshot.resources)
+    return pack(
+        KEYFRAME,
+        snapshot.turn,
+        snapshot.player_resources,
+        {
+            "spawns": [(unit_id, *state) for unit_id, state in snapshot.units.items()],
+            "resources": list(zip(xs, ys, snapshot.resources[ys, xs])),
+        },
+    )
+
+
+def encode_delta(previous: Snapshot, current: Snapshot) -> bytes:
+    # Size grows with what changed during the turn, not with the board
+    spawns, moves, health = [], [], []
+    for unit_id, state in current.units.items():
+        old = previous.units.get(unit_id)
+        if old is None:
+            spawns.append((unit_id, *state))
+            continue
+        if old[2:4] != state[2:4]:
+            moves.append((unit_id, state[2], state[3]))
+        if old[4] != state[4]:
+            health.append((unit_id, state[4]))
+    deaths = [
+        (unit_id,) for unit_id in previous.units if unit_id not in current.units
+    ]
+    ys, xs = np.nonzero(previous.resources != current.resources)
+    resources = list(zip(xs, ys, current.resources[ys, xs]))
+    return pack(
+        DELTA,
+        current.turn,
+        current.player_resources,
+        {
+            "spawns": spawns,
+            "moves": moves,
+            "health": health,
+            "deaths": deaths,
+            "resources": resources,
+        },
+    )
+
+
+class SpectatorView:
+    # Viewer-side state rebuilt from frames alone; deltas are ignored until
+    # the first keyframe arrives
+    def __init__(self, width: int, height: int) -> None:
+        self.turn = None
+        self.units = {}
+        self.resources = np.zeros((height, width), dtype=np.int32)
+        self.player_resources = (0, 0)
+
+    def apply(self, frame: bytes) -> bool:
+        header, records = unpack(frame)
+        if header["kind"] == KEYFRAME:
+            self.units = {}
+            self.resources[:] = 0
+        elif self.turn is None:
+            return False
+        self.turn = int(header["turn"])
+        self.player_resources = tuple(int(r) for r in header["player_resources"])
+        for row in records["spawns"]:
+            self.units[int(row["id"])] = [
+                UNIT_CLASSES[row["cls"]],
+                int(row["player"]),
+                int(row["x"]),
+                int(row["y"]),
+                int(row["health"]),
+            ]
+        for row in records["moves"]:
+            state = self.units[int(row["id"])]
+            state[2], state[3] = int(row["x"]), int(row["y"])
+        for row in records["health"]:
+            self.units[int(row["id"])][4] = int(row["health"])
+        for row in records["deaths"]:
+            del self.units[int(row["id"])]
+        resources = records["resources"]
+        self.resources[resources["y"], resources["x"]] = resources["amount"]
+        return True
+
+
+class Broadcaster:
+    # Fans frames out to subscriber queues without ever waiting on them. A
+    # subscriber whose queue is full is resynchronised with a keyframe
+    # instead of holding up the game, and late joiners start from one.
+    def __init__(self, keyframe_interval: int = 50, queue_size: int = 64) -> None:
+        self.keyframe_interval = keyframe_interval
+        self.queue_size = queue_size
+        self.subscribers = set()
+        self.snapshot = None
+        self.keyframe = None
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.resyncs = 0
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(self.queue_size)
+        if self.snapshot is not None:
+            queue.put_nowait(self.latest_keyframe())
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self.subscribers.discard(queue)
+
+    def latest_keyframe(self) -> bytes:
+        if self.keyframe is None:
+            self.keyframe = encode_keyframe(self.snapshot)
+        return self.keyframe
+
+    def publish(self, game) -> bytes:
+        snapshot = Snapshot.from_game(game)
+        previous = self.snapshot
+        self.snapshot = snapshot
+        self.keyframe = None
+        if previous is None or snapshot.turn % self.keyframe_interval == 0:
+            frame = self.latest_keyframe()
+        else:
+            frame = encode_delta(previous, snapshot)
+        for queue in self.subscribers:
+            self.offer(queue, frame)
+        return frame
+
+    def close(self) -> None:
+        # Wakes every subscriber with an empty frame
+        for queue in self.subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(b"")
+
+    def offer(self, queue: asyncio.Queue, frame: bytes) -> None:
+        try:
+            queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            while not queue.empty():
+                queue.get_nowait()
+            frame = self.latest_keyframe()
+            queue.put_nowait(frame)
+            self.resyncs += 1
+        self.frames_sent += 1
+        self.bytes_sent += len(frame)
@@ -1,6 +1,114 @@
-from action import Action
+import numpy as np
+
+MOVE = 1
+ATTACK = 2
+SPAWN = 3
+HEAL = 4
+HARVEST = 5
+DIE = 6
+ACTION_NAMES = {
+    MOVE: "move",
+    ATTACK: "attack",
+    SPAWN: "spawn",
+    HEAL: "heal",
+    HARVEST: "harvest",
+    DIE: "die",
+}
+NO_UNIT = -1
+
+# One executed action. unit is the actor and (fx, fy) where it stood; target
+# is the unit acted on, if any, and (tx, ty) the tile acted on. value is the
+# damage, heal, harvest, spawn cost or bounty involved.
+ACTION_DTYPE = np.dtype(
+    [
+        ("code", "u1"),
+        ("player", "u1"),
+        ("unit", "<i4"),
+        ("target", "<i4"),
+        ("fx", "<i2"),
+        ("fy", "<i2"),
+        ("tx", "<i2"),
+        ("ty", "<i2"),
+        ("value", "<i4"),
+    ]
+)
+
+
+class ActionBuffer:
+    # Per-turn action log. Rows are collected as plain tuples, which is the
+    # cheapest thing to append from Python, and packed into one reused
+    # structured array when the turn is read.
+    def __init__(self, capacity: int = 256) -> None:
+        self.data = np.zeros(capacity, dtype=ACTION_DTYPE)
+        self.rows = []
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def clear(self) -> None:
+        self.rows.clear()
+
+    def append(
+        self,
+        code: int,
+        unit,
+        target=None,
+        tx: int = None,
+        ty: int = None,
+        value: int = 0,
+        fx: int = None,
+        fy: int = None,
+    ) -> None:
+        if target is not None:
+            tx = target.x if tx is None else tx
+            ty = target.y if ty is None else ty
+        self.rows.append(
+            (
+                code,
+                unit.player.id,
+                unit.id,
+                NO_UNIT if target is None else target.id,
+                unit.x if fx is None else fx,
+                unit.y if fy is None else fy,
+                unit.x if tx is None else tx,
+                unit.y if ty is None else ty,
+                value,
+            )
+        )
+
+    def view(self) -> np.ndarray:
+        size = len(self.rows)
+        if size > len(self.data):
+            self.data = np.zeros(max(size, len(self.data) * 2), dtype=ACTION_DTYPE)
+        view = self.data[:size]
+        if size:
+            view[:] = self.rows
+        return view
 
 
 class StateChange:
-    def __init__(self, state_chnages: list[tuple[Action, Action]]) -> None:
-        self.state_changes = state_chnages
+    # Everything executed during one turn, in execution order. actions is a
+    # view of the game's buffer and is overwritten by the next update, so
+    # copy() it to keep it around.
+    def __init__(self, actions: np.ndarray) -> None:
+        self.actions = actions
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    def of(self, code: int) -> np.ndarray:
+        return self.actions[self.actions["code"] == code]
+
+    def counts(self) -> dict:
+        counts = np.bincount(self.actions["code"], minlength=len(ACTION_NAMES) + 1)
+        return {name: int(counts[code]) for code, name in ACTION_NAMES.items()}
+
+    def copy(self) -> "StateChange":
+        return StateChange(self.actions.copy())
+
+    def to_bytes(self) -> bytes:
+        return self.actions.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "StateChange":
+        return cls(np.frombuffer(data, dtype=ACTION_DTYPE))
@@ -0,0 +1,211 @@
+import argparse
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from gptgame.commander import evaluate
+from gptgame.match import create_game
+from gptgame.params import DEFAULT_PARAMS, UnitParams
+from gptgame.sharedmap import SharedMap, attach
+
+# Parameter name -> values to try. Stats are left out by default since more
+# health or damage trivially wins; tune those only against a cost, such as
+# a base with a spawn_cost.
+DEFAULT_SPACE = {
+    "rubble_cost": [0, 1, 2, 5, 10, 20],
+    "retreat_health": [1, 2, 3],
+    "flee_divisor": [1.5, 2, 3, 4],
+    "spawn_cooldown": [3, 4, 5, 6],
+}
+
+
+def play_seed(
+    changes: dict,
+    unit: str,
+    opponent: str,
+    map_name: str,
+    seed: int,
+    max_turns: int,
+    shared=None,
+    base: dict = None,
+) -> float:
+    # 1 for a win by the candidate (player 1), 0 for a loss, and its share
+    # of the total health on the board when max_turns runs out. base holds
+    # the parameters both players play with, the candidate's changes apply
+    # on top of it.
+    static_map = attach(shared) if shared is not None else None
+    game = create_game(map_name, unit, opponent, seed=seed, static_map=static_map)
+    base_params = DEFAULT_PARAMS.replace(**(base or {}))
+    game.player1.set_params(base_params.replace(**changes))
+    game.player2.set_params(base_params)
+    for _ in range(max_turns):
+        game.update()
+        game.check_for_winner()
+        if game.get_winner() is not None:
+            break
+    return evaluate(game, game.player1.id)
+
+
+class Candidate:
+    def __init__(self, changes: dict) -> None:
+        self.changes = changes
+        self.score = 0.0
+        self.games = 0
+
+    def mean(self) -> float:
+        return self.score / self.games if self.games else 0.0
+
+    def params(self) -> UnitParams:
+        return DEFAULT_PARAMS.replace(**self.changes)
+
+
+def sample(space: dict, rng: random.Random) -> dict:
+    return {name: rng.choice(values) for name, values in space.items()}
+
+
+def mutate(changes: dict, space: dict, rng: random.Random, rate: float = 0.3) -> dict:
+    child = dict(changes)
+    for name, values in space.items():
+        if rng.random() < rate:
+            child[name] = rng.choice(values)
+    return child
+
+
+def successive_halving(
+    executor,
+    candidates: list,
+    unit: str,
+    opponent: str,
+    map_name: str,
+    seeds: list,
+    seeds_per_round: int = 4,
+    eta: int = 2,
+    max_turns: int = 1000,
+    shared=None,
+    base: dict = None,
+) -> list:
+    # Every round plays the survivors on seeds_per_round more seeds and keeps
+    # the best 1/eta, so clearly losing settings stop costing games early.
+    # Returns all candidates, best first.
+    survivors = list(candidates)
+    position = 0
+    while True:
+        round_seeds = seeds[position : position + seeds_per_round]
+        position += seeds_per_round
+        if not round_seeds:
+            break
+        futures = [
+            (
+                candidate,
+                executor.submit(
+                    play_seed,
+                    candidate.changes,
+                    unit,
+                    opponent,
+                    map_name,
+                    seed,
+                    max_turns,
+                    shared,
+                    base,
+                ),
+            )
+            for candidate in survivors
+            for seed in round_seeds
+        ]
+        for candidate, future in futures:
+            candidate.score += future.result()
+            candidate.games += 1
+        survivors.sort(key=lambda candidate: candidate.mean(), reverse=True)
+        if len(survivors) == 1:
+            break
+        survivors = survivors[: max(1, len(survivors) // eta)]
+    return sorted(
+        candidates, key=lambda candidate: (candidate.games, candidate.mean()), reverse=True
+    )
+
+
+def tune(
+    unit: str,
+    opponent: str,
+    space: dict = None,
+    map_name: str = "default",
+    population: int = 16,
+    generations: int = 3,
+    seeds_per_round: int = 4,
+    max_turns: int = 1000,
+    workers: int = None,
+    seed: int = 0,
+    base: dict = None,
+) -> list:
+    # Evolution over successive-halving tournaments: each generation keeps
+    # the best quarter and refills the population with their mutations.
+    # Every generation plays fresh seeds. Returns the final ranking.
+    space = space or DEFAULT_SPACE
+    rng = random.Random(seed)
+    population_changes = [{}] + [sample(space, rng) for _ in range(population - 1)]
+    next_seed = 0
+    ranking = []
+    with SharedMap(map_name) as shared, ProcessPoolExecutor(workers) as executor:
+        for _ in range(generations):
+            candidates = [Candidate(changes) for changes in population_changes]
+            rounds = max(1, (len(candidates) - 1).bit_length())
+            seeds = list(range(next_seed, next_seed + rounds * seeds_per_round))
+            next_seed += len(seeds)
+            ranking = successive_halving(
+                executor,
+                candidates,
+                unit,
+                opponent,
+                map_name,
+                seeds,
+                seeds_per_round,
+                max_turns=max_turns,
+                shared=shared.spec,
+                base=base,
+            )
+            parents = [candidate.changes for candidate in ranking[: max(1, population // 4)]]
+            population_changes = list(parents)
+            while len(population_changes) < population:
+                population_changes.append(mutate(rng.choice(parents), space, rng))
+    return ranking
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Tune unit parameters")
+    parser.add_argument("unit")
+    parser.add_argument("opponent")
+    parser.add_argument("--map", default="default")
+    parser.add_argument("--population", type=int, default=16)
+    parser.add_argument("--generations", type=int, default=3)
+    parser.add_argument("--seeds-per-round", type=int, default=4)
+    parser.add_argument("--turns", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--spawn-cost", type=int, default=0, help="resources both players pay per spawned unit"
+    )
+    parser.add_argument(
+        "--starting-resources", type=int, default=0, help="resources both players start with"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    ranking = tune(
+        args.unit,
+        args.opponent,
+        map_name=args.map,
+        population=args.population,
+        generations=args.generations,
+        seeds_per_round=args.seeds_per_round,
+        max_turns=args.turns,
+        workers=args.workers,
+        seed=args.seed,
+        base={"spawn_cost": args.spawn_cost, "starting_resources": args.starting_resources},
+    )
+    for candidate in ranking[:5]:
+        print(f"{candidate.mean():.2f} over {candidate.games} games: {candidate.changes}")
+
+
+if __name__ == "__main__":
+    main()
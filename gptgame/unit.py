@@ -1,14 +1,31 @@
-from tile import Tile
-from action import Action, AttackAction, MoveAction, DieAction, IdleAction, SpawnAction
+from gptgame.tile import Tile
+from gptgame.action import (
+    Action,
+    AttackAction,
+    MoveAction,
+    DieAction,
+    IdleAction,
+    SpawnAction,
+    HarvestAction,
+    HealAction,
+)
 import random
 from math import sqrt
-from queue import PriorityQueue
 import time
 from copy import deepcopy
 
+from gptgame import cooperative, pathfinding
+from gptgame.landmarks import heuristic_for_costs, rubble_costs
+from gptgame.params import DEFAULT_PARAMS, UnitParams
+
 
 class Unit:
+    rng_stream = "ai"
+    # Whether a player's Policy decides for this unit instead of its own AI
+    controllable = True
+
     def __init__(self) -> None:
+        self.id = None
         self.alive = True
         self.attack_damage = 0
         self.x = 0
@@ -21,21 +38,48 @@ class Unit:
         self.move_cooldown = 1
         self.action_cooldown = 1
         self.bounty = 10
+        self.harvest_rate = 0
+        self.rng = random
+        self.perception = None
+        # The player's ReservationTable for this turn, set by the pipeline
+        self.reservations = None
 
     def __str__(self) -> str:
         return f"{__class__}({self.x}, {self.y})"
 
+    def __getstate__(self) -> dict:
+        # The RNG and perception are per-turn handles the game re-attaches
+        state = self.__dict__.copy()
+        del state["rng"]
+        state["perception"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.rng = random
+
+    @property
+    def params(self) -> UnitParams:
+        return DEFAULT_PARAMS if self.player is None else self.player.params
+
+    def apply_params(self, params: UnitParams) -> None:
+        pass
+
     def take_turn(self, board) -> tuple[Action, Action]:
         # (Move, Act)
         self.cooldown()
+        return self.decide(board)
+
+    def decide(self, board, move_action: Action = None) -> tuple[Action, Action]:
+        # A move_action chosen elsewhere skips the unit's own move decision
         if not self.is_alive():
             return self.die()
-        if self.can_move():
-            move_action = self.move(board)
-        else:
-            move_action = IdleAction(self)
+        if move_action is None:
+            move_action = self.move(board) if self.can_move() else IdleAction(self)
         if self.can_act():
             act_action = self.act(board)
+            if isinstance(act_action, IdleAction):
+                act_action = self.harvest(board)
         else:
             act_action = IdleAction(self)
         return (move_action, act_action)
@@ -46,6 +90,20 @@ class Unit:
     def act(self, board) -> Action:
         raise NotImplementedError
 
+    def heal(self, board) -> list:
+        return []
+
+    def harvest(self, board) -> Action:
+        # Collect from the current or an adjacent tile when there is nothing better to do
+        if self.harvest_rate <= 0:
+            return IdleAction(self)
+        if board.get_resource(self.x, self.y) > 0:
+            return HarvestAction(self, board.get_tile(self.x, self.y))
+        tiles = board.resource_tiles_in_radius(self.x, self.y, 1.5)
+        if tiles:
+            return HarvestAction(self, tiles[0])
+        return IdleAction(self)
+
     def move(self, board) -> Action:
         raise NotImplementedError
 
@@ -74,11 +132,15 @@ class Unit:
             return True
         return False
 
-    def in_action_range(self, tile: Tile) -> bool:
-        return self.in_range(tile, self.action_range)
+    def in_action_range(self, tile: Tile, board=None) -> bool:
+        if not self.in_range(tile, self.action_range):
+            return False
+        return board is None or board.has_line_of_sight(self.x, self.y, tile.x, tile.y)
 
-    def in_vision_range(self, tile: Tile) -> bool:
-        return self.in_range(tile, self.vision_range)
+    def in_vision_range(self, tile: Tile, board=None) -> bool:
+        if not self.in_range(tile, self.vision_range):
+            return False
+        return board is None or board.has_line_of_sight(self.x, self.y, tile.x, tile.y)
 
     def adjacent_tiles(self, board) -> list:
         return board.tiles_in_radius(self.x, self.y, 1.5)
@@ -87,23 +149,38 @@ class Unit:
         return board.occupied_tiles_in_radius(self.x, self.y, 1.5)
 
     def enemies_in_sight(self, board) -> list:
+        if self.perception is not None:
+            return self.perception.enemies_in_range(self.x, self.y, self.vision_range)
         return [
             tile.occupant
-            for tile in board.occupied_tiles_in_radius(
+            for tile in board.visible_occupied_tiles_in_radius(
                 self.x, self.y, self.vision_range
             )
             if tile.occupant.player != self.player and tile.occupant.is_alive()
         ]
 
     def enemies_in_action_range(self, board) -> list:
+        if self.perception is not None and self.action_range <= self.vision_range:
+            return self.perception.enemies_in_range(self.x, self.y, self.action_range)
         return [
             tile.occupant
-            for tile in board.occupied_tiles_in_radius(
+            for tile in board.visible_occupied_tiles_in_radius(
                 self.x, self.y, self.action_range
             )
             if tile.occupant.player != self.player and tile.occupant.is_alive()
         ]
 
+    def nearest_enemies(self, board, k: int = 1, max_radius=None, metric: str = "manhattan") -> list:
+        # Nearest enemies anywhere on the board, seen or not
+        return board.nearest_units(
+            self.x,
+            self.y,
+            k,
+            max_radius=max_radius,
+            metric=metric,
+            exclude_player=self.player,
+        )
+
     def allies_in_sight(self, board) -> list:
         return [
             tile.occupant
@@ -114,17 +191,36 @@ class Unit:
         ]
 
 
+# (unit class, id of its params) -> (params, rubble_costs), see Soldier.path_costs
+_path_costs = {}
+
+
 class Soldier(Unit):
+    # Shared A* settings; path_expansions bounds the work of one search,
+    # which then returns the best partial path found so far. With
+    # path_landmarks set, searches are guided by that many landmarks
+    # instead of heuristic(). Cooperative units plan around the paths of
+    # their teammates that decided earlier in the turn.
+    path_radius = 1
+    path_avoids_occupied = False
+    path_expansions = 1000
+    path_landmarks = 4
+    path_cooperative = False
+
     def __init__(self) -> None:
         super().__init__()
-        self.attack_damage = 1
-        self.health = 3
-        self.max_health = 3
-        self.action_range = 4
-        self.vision_range = 6
-        self.move_cooldown = 2
-        self.action_cooldown = 2
-        self.bounty = 10
+        self.apply_params(DEFAULT_PARAMS)
+
+    def apply_params(self, params: UnitParams) -> None:
+        self.attack_damage = params.attack_damage
+        self.health = params.health
+        self.max_health = params.health
+        self.action_range = params.action_range
+        self.vision_range = params.vision_range
+        self.move_cooldown = params.move_cooldown
+        self.action_cooldown = params.action_cooldown
+        self.bounty = params.bounty
+        self.harvest_rate = params.harvest_rate
 
     def act(self, board) -> Action:
         enemies = self.enemies_in_action_range(board)
@@ -134,24 +230,77 @@ class Soldier(Unit):
 
     def move(self, board) -> Action:
         movable_tiles = self.adjacent_tiles(board)
-        random.shuffle(movable_tiles)
+        self.rng.shuffle(movable_tiles)
         for tile in movable_tiles:
             if not tile.is_occupied():
                 return MoveAction(self, tile)
 
         return IdleAction(self)
 
+    def path_costs(self) -> tuple:
+        # step_cost at each rubble level. It depends only on the class and
+        # the player's params, so it is worked out once per pair; params are
+        # matched by identity, which is cheaper than hashing them.
+        params = self.params
+        key = (type(self), id(params))
+        entry = _path_costs.get(key)
+        if entry is None or entry[0] is not params:
+            entry = (params, rubble_costs(self.step_cost))
+            _path_costs[key] = entry
+        return entry[1]
+
+    def find_path(self, goal, board) -> list:
+        heuristic = self.heuristic
+        if self.path_landmarks:
+            heuristic = heuristic_for_costs(
+                board, self.path_costs(), self.path_radius, self.path_landmarks
+            )
+        if self.path_cooperative and self.reservations is not None:
+            return cooperative.find_path(
+                board,
+                self,
+                goal,
+                self.reservations,
+                self.step_cost,
+                heuristic,
+                self.path_radius,
+                self.path_expansions,
+            )
+        return pathfinding.find_path(
+            board,
+            (self.x, self.y),
+            goal,
+            self.step_cost,
+            heuristic,
+            self.path_radius,
+            self.path_avoids_occupied,
+            self.path_expansions,
+        )
 
-class QueueItem:
-    def __init__(self, cost, tile):
-        self.cost = cost
-        self.tile = tile
+    def can_enter(self, tile) -> bool:
+        # Free now, or held by a teammate whose plan moves it out before us
+        if not tile.is_occupied():
+            return True
+        return (
+            self.path_cooperative
+            and self.reservations is not None
+            and self.reservations.vacated(tile)
+        )
 
-    def __lt__(self, other):
-        return self.cost < other.cost
+    def step_cost(self, tile) -> int:
+        return tile.rubble + 1
+
+    def heuristic(self, goal, next):
+        # Chebyshev distance
+        dx = abs(goal[0] - next.x)
+        dy = abs(goal[1] - next.y)
+        return max(dx, dy)
 
 
 class Soldier1(Soldier):
+    path_avoids_occupied = True
+    path_cooperative = True
+
     def move(self, board) -> Action:
         if not self.can_move():
             return IdleAction(self)
@@ -159,19 +308,16 @@ class Soldier1(Soldier):
         enemies = self.enemies_in_sight(board)
         if len(enemies) > 0:
             closest_enemy = min(enemies, key=lambda enemy: self.distance_to(enemy))
-            came_from, start, goal = self.astar_path(
-                (self.x, self.y), (closest_enemy.x, closest_enemy.y), board
-            )
-            path = self.reconstruct_path(came_from, start, goal)
+            path = self.find_path((closest_enemy.x, closest_enemy.y), board)
             if path and len(path) > 1:
-                if path[1].is_occupied():
+                if not self.can_enter(path[1]):
                     return IdleAction(self)
                 return MoveAction(
                     self, path[1]
                 )  # Moving to the second tile in the path, as the first one is the current location of the unit
 
         movable_tiles = self.adjacent_tiles(board)
-        random.shuffle(movable_tiles)
+        self.rng.shuffle(movable_tiles)
         for tile in movable_tiles:
             if not tile.is_occupied():
                 return MoveAction(self, tile)
@@ -180,68 +326,14 @@ class Soldier1(Soldier):
 
         return IdleAction(self)
 
-    def astar_path(self, start, goal, board):
-        frontier = PriorityQueue()
-        start_tile = board.get_tile(start[0], start[1])
-        frontier.put(QueueItem(0, start_tile))
-        came_from = {start_tile: None}
-        cost_so_far = {start_tile: 0}
-
-        while not frontier.empty():
-            current = frontier.get().tile
-
-            if (current.x, current.y) == goal:
-                if current not in came_from:
-                    came_from[
-                        current
-                    ] = current  # Add the goal tile to the came_from dictionary
-                break
-
-            for next_tile in board.tiles_in_radius(current.x, current.y, 1):
-                if next_tile.is_occupied() and (next_tile.x, next_tile.y) != goal:
-                    continue
-
-                new_cost = cost_so_far[current] + next_tile.rubble + 1
-                if next_tile not in cost_so_far or new_cost < cost_so_far[next_tile]:
-                    cost_so_far[next_tile] = new_cost
-                    priority = new_cost + self.heuristic(goal, next_tile)
-                    frontier.put(QueueItem(priority, next_tile))
-                    came_from[
-                        next_tile
-                    ] = current  # this line updates came_from for every explored tile
-
-        return came_from, start_tile, board.get_tile(goal[0], goal[1])
-
-    # ... existing code ...
-
-    def reconstruct_path(self, came_from, start, goal):
-        current = goal
-        path = []
-        while current != start:
-            if current not in came_from:
-                # If the current tile is not in came_from, a path could not be found.
-                return None
-            path.append(current)
-            try:
-                current = came_from[current]
-            except KeyError:
-                # If the current tile is not in came_from, a path could not be found.
-                return None
-        path.append(start)  # optional
-        path.reverse()  # optional
-        return path
-
-    def heuristic(self, goal, next):
-        # Chebyshev distance
-        dx = abs(goal[0] - next.x)
-        dy = abs(goal[1] - next.y)
-        return max(dx, dy)
-
     def distance_to(self, unit):
         return abs(self.x - unit.x) + abs(self.y - unit.y)
 
 
 class Soldier2(Soldier):
+    path_avoids_occupied = True
+    path_cooperative = True
+
     def act(self, board) -> Action:
         enemies = self.enemies_in_action_range(board)
         if len(enemies) > 0:
@@ -257,87 +349,31 @@ class Soldier2(Soldier):
         enemies = self.enemies_in_sight(board)
         if len(enemies) > 0:
             closest_enemy = min(enemies, key=lambda enemy: self.distance_to(enemy))
-            came_from, start, goal = self.astar_path(
-                (self.x, self.y), (closest_enemy.x, closest_enemy.y), board
-            )
-            path = self.reconstruct_path(came_from, start, goal)
+            path = self.find_path((closest_enemy.x, closest_enemy.y), board)
             if path and len(path) > 1:
-                if path[1].is_occupied():
+                if not self.can_enter(path[1]):
                     return IdleAction(self)
                 return MoveAction(
                     self, path[1]
                 )  # Moving to the second tile in the path, as the first one is the current location of the unit
 
         movable_tiles = self.adjacent_tiles(board)
-        random.shuffle(movable_tiles)
+        self.rng.shuffle(movable_tiles)
         for tile in movable_tiles:
             if not tile.is_occupied():
                 return MoveAction(self, tile)
 
         return IdleAction(self)
 
-    def astar_path(self, start, goal, board):
-        frontier = PriorityQueue()
-        start_tile = board.get_tile(start[0], start[1])
-        frontier.put(QueueItem(0, start_tile))
-        came_from = {start_tile: None}
-        cost_so_far = {start_tile: 0}
-
-        while not frontier.empty():
-            current = frontier.get().tile
-
-            if (current.x, current.y) == goal:
-                if current not in came_from:
-                    came_from[
-                        current
-                    ] = current  # Add the goal tile to the came_from dictionary
-                break
-
-            for next_tile in board.tiles_in_radius(current.x, current.y, 1):
-                if next_tile.is_occupied() and (next_tile.x, next_tile.y) != goal:
-                    continue
-
-                new_cost = cost_so_far[current] + next_tile.rubble + 1
-                if next_tile not in cost_so_far or new_cost < cost_so_far[next_tile]:
-                    cost_so_far[next_tile] = new_cost
-                    priority = new_cost + self.heuristic(goal, next_tile)
-                    frontier.put(QueueItem(priority, next_tile))
-                    came_from[
-                        next_tile
-                    ] = current  # this line updates came_from for every explored tile
-
-        return came_from, start_tile, board.get_tile(goal[0], goal[1])
-
-    # ... existing code ...
-
-    def reconstruct_path(self, came_from, start, goal):
-        current = goal
-        path = []
-        while current != start:
-            if current not in came_from:
-                # If the current tile is not in came_from, a path could not be found.
-                return None
-            path.append(current)
-            try:
-                current = came_from[current]
-            except KeyError:
-                # If the current tile is not in came_from, a path could not be found.
-                return None
-        path.append(start)  # optional
-        path.reverse()  # optional
-        return path
-
-    def heuristic(self, goal, next):
-        # Chebyshev distance
-        dx = abs(goal[0] - next.x)
-        dy = abs(goal[1] - next.y)
-        return max(dx, dy)
-
     def distance_to(self, unit):
         return abs(self.x - unit.x) + abs(self.y - unit.y)
 
 
 class Soldier21(Soldier2):
+    def step_cost(self, tile) -> int:
+        # increase cost if tile has high rubble
+        return tile.rubble * self.params.rubble_cost + 1
+
     def act(self, board) -> Action:
         enemies = self.enemies_in_action_range(board)
         if len(enemies) > 0:
@@ -358,61 +394,22 @@ class Soldier21(Soldier2):
         if len(enemies) > 0:
             # Move towards the closest enemy that is not in action range
             closest_enemy = min(enemies, key=lambda enemy: self.distance_to(enemy) and enemy not in action_range_enemies)
-            came_from, start, goal = self.astar_path(
-                (self.x, self.y), (closest_enemy.x, closest_enemy.y), board
-            )
-            path = self.reconstruct_path(came_from, start, goal)
+            path = self.find_path((closest_enemy.x, closest_enemy.y), board)
             if path and len(path) > 1:
-                if path[1].is_occupied():
+                if not self.can_enter(path[1]):
                     return IdleAction(self)
                 return MoveAction(
                     self, path[1]
                 )
 
         movable_tiles = self.adjacent_tiles(board)
-        random.shuffle(movable_tiles)
+        self.rng.shuffle(movable_tiles)
         for tile in movable_tiles:
             if not tile.is_occupied():
                 return MoveAction(self, tile)
 
         return IdleAction(self)
 
-    def astar_path(self, start, goal, board):
-
-        frontier = PriorityQueue()
-        start_tile = board.get_tile(start[0], start[1])
-        frontier.put(QueueItem(0, start_tile))
-        came_from = {start_tile: None}
-        cost_so_far = {start_tile: 0}
-
-        while not frontier.empty():
-            current = frontier.get().tile
-
-            if (current.x, current.y) == goal:
-                if current not in came_from:
-                    came_from[
-                        current
-                    ] = current  # Add the goal tile to the came_from dictionary
-                break
-
-            for next_tile in board.tiles_in_radius(current.x, current.y, 1):
-                if next_tile.is_occupied() and (next_tile.x, next_tile.y) != goal:
-                    continue
-
-                new_cost = cost_so_far[current] + next_tile.rubble * 10 + 1  # increase cost if tile has high rubble
-
-                if next_tile not in cost_so_far or new_cost < cost_so_far[next_tile]:
-                    cost_so_far[next_tile] = new_cost
-                    priority = new_cost + self.heuristic(goal, next_tile)
-                    frontier.put(QueueItem(priority, next_tile))
-                    came_from[
-                        next_tile
-                    ] = current  # this line updates came_from for every explored tile
-
-        return came_from, start_tile, board.get_tile(goal[0], goal[1])
-        # ... existing code ...
-        # ... existing code ...
-
     def retreat(self, board) -> Action:
         if not self.can_move():
             return IdleAction(self)
@@ -421,17 +418,14 @@ class Soldier21(Soldier2):
         enemies = self.enemies_in_sight(board)
         if len(enemies) > 0:
             farthest_enemy = max(enemies, key=lambda enemy: self.distance_to(enemy))
-            came_from, start, goal = self.astar_path(
-                (self.x, self.y), (farthest_enemy.x, farthest_enemy.y), board
-            )
-            path = self.reconstruct_path(came_from, start, goal)
+            path = self.find_path((farthest_enemy.x, farthest_enemy.y), board)
             if path and len(path) > 1:
-                if path[1].is_occupied():
+                if not self.can_enter(path[1]):
                     return IdleAction(self)
                 return MoveAction(self, path[1])
 
         movable_tiles = self.adjacent_tiles(board)
-        random.shuffle(movable_tiles)
+        self.rng.shuffle(movable_tiles)
         for tile in movable_tiles:
             if not tile.is_occupied():
                 return MoveAction(self, tile)
@@ -445,7 +439,7 @@ class Soldier3(Soldier):
     def act(self, board) -> Action:
         enemies = self.enemies_in_action_range(board)
         if enemies:
-            target = random.choice(enemies)
+            target = self.rng.choice(enemies)
             return AttackAction(self, target)
         else:
             return IdleAction(self)
@@ -453,7 +447,7 @@ class Soldier3(Soldier):
     def move(self, board) -> Action:
         enemies = self.enemies_in_sight(board)
         if enemies:
-            target = random.choice(enemies)
+            target = self.rng.choice(enemies)
             tiles_next_to_target = board.tiles_in_radius(target.x, target.y, 1.5)
             movable_tiles = [
                 tile
@@ -461,13 +455,13 @@ class Soldier3(Soldier):
                 if not tile.is_occupied() and self.is_adjacent(tile)
             ]
             if movable_tiles:
-                destination = random.choice(movable_tiles)
+                destination = self.rng.choice(movable_tiles)
                 return MoveAction(self, destination)
 
         adjacent_tiles = self.adjacent_tiles(board)
         movable_tiles = [tile for tile in adjacent_tiles if not tile.is_occupied()]
         if movable_tiles:
-            destination = random.choice(movable_tiles)
+            destination = self.rng.choice(movable_tiles)
             return MoveAction(self, destination)
 
         return IdleAction(self)
@@ -557,7 +551,7 @@ class Soldier32(Soldier3):
         adjacent_tiles = self.adjacent_tiles(board)
         movable_tiles = [tile for tile in adjacent_tiles if not tile.is_occupied()]
         if movable_tiles:
-            destination = random.choice(movable_tiles)
+            destination = self.rng.choice(movable_tiles)
             return MoveAction(self, destination)
 
         return IdleAction(self)
@@ -576,43 +570,31 @@ class Soldier32(Soldier3):
         return 1.0 / (dx + dy)
 
     def calculate_path(self, board, target) -> list:
-        # Implement simple A* pathfinding to calculate path to target
-        frontier = PriorityQueue()
-        frontier.put((0, self))
-        came_from = {self: None}
-        cost_so_far = {self: 0}
-
-        while not frontier.empty():
-            current = frontier.get()[1]
-
-            if current == target:
-                break
-
-            for next_tile in board.adjacent_tiles(current.x, current.y):
-                new_cost = cost_so_far[current] + self.cost(board, next_tile)
-                if next_tile not in cost_so_far or new_cost < cost_so_far[next_tile]:
-                    cost_so_far[next_tile] = new_cost
-                    priority = new_cost + self.heuristic(target, next_tile)
-                    item = QueueItem(priority, next_tile)
-                    frontier.put((item, next_tile))
-                    came_from[next_tile] = current
-
-        path = []
-        while current != self:
-            path.append(current)
-            current = came_from[current]
-        path.reverse()  # Path from self to target
-        return path
+        # A* path to target, excluding the unit's own tile
+        path = pathfinding.find_path(
+            board,
+            (self.x, self.y),
+            (target.x, target.y),
+            lambda tile: self.cost(board, tile),
+            self.heuristic,
+            radius=1.5,
+            max_expansions=self.path_expansions,
+        )
+        if path is None:
+            return None
+        return path[1:]
 
     def cost(self, board, tile) -> int:
         # Cost of moving to a tile (higher if it's filled with rubble)
         return 1 + (10 if tile.rubble > 1 else 0)
 
-    def heuristic(self, target, tile) -> int:
+    def heuristic(self, goal, tile) -> int:
         # Heuristic function (Manhattan distance in this case)
-        return abs(tile.x - target.x) + abs(tile.y - target.y)
+        return abs(tile.x - goal[0]) + abs(tile.y - goal[1])
 
 class Soldier4(Soldier):
+    path_radius = 1.5
+
     def move(self, board) -> Action:
         if not self.can_move():
             return IdleAction(self)
@@ -620,10 +602,7 @@ class Soldier4(Soldier):
         enemies = self.enemies_in_sight(board)
         if len(enemies) > 0:
             closest_enemy = min(enemies, key=lambda enemy: self.distance_to(enemy))
-            came_from, start, goal = self.astar_path(
-                (self.x, self.y), (closest_enemy.x, closest_enemy.y), board
-            )
-            path = self.reconstruct_path(came_from, start, goal)
+            path = self.find_path((closest_enemy.x, closest_enemy.y), board)
             if path and len(path) > 1:
                 if path[1].is_occupied():
                     movable_tiles = self.adjacent_tiles(board)
@@ -636,65 +615,13 @@ class Soldier4(Soldier):
                     )  # Moving to the second tile in the path, as the first one is the current location of the unit
 
         movable_tiles = self.adjacent_tiles(board)
-        random.shuffle(movable_tiles)
+        self.rng.shuffle(movable_tiles)
         for tile in movable_tiles:
             if not tile.is_occupied():
                 return MoveAction(self, tile)
 
         return IdleAction(self)
 
-    def astar_path(self, start, goal, board):
-        frontier = PriorityQueue()
-        start_tile = board.get_tile(start[0], start[1])
-        frontier.put(QueueItem(0, start_tile))
-        came_from = {start_tile: None}
-        cost_so_far = {start_tile: 0}
-
-        while not frontier.empty():
-            current = frontier.get().tile
-
-            if (current.x, current.y) == goal:
-                if current not in came_from:
-                    came_from[
-                        current
-                    ] = current  # Add the goal tile to the came_from dictionary
-                break
-
-            for next_tile in board.tiles_in_radius(current.x, current.y, 1.5):
-                new_cost = cost_so_far[current] + next_tile.rubble + 1
-                if next_tile not in cost_so_far or new_cost < cost_so_far[next_tile]:
-                    cost_so_far[next_tile] = new_cost
-                    priority = new_cost + self.heuristic(goal, next_tile)
-                    frontier.put(QueueItem(priority, next_tile))
-                    came_from[
-                        next_tile
-                    ] = current  # this line updates came_from for every explored tile
-
-        return came_from, start_tile, board.get_tile(goal[0], goal[1])
-
-    def reconstruct_path(self, came_from, start, goal):
-        current = goal
-        path = []
-        while current != start:
-            if current not in came_from:
-                # If the current tile is not in came_from, a path could not be found.
-                return None
-            path.append(current)
-            try:
-                current = came_from[current]
-            except KeyError:
-                # If the current tile is not in came_from, a path could not be found.
-                return None
-        path.append(start)  # optional
-        path.reverse()  # optional
-        return path
-
-    def heuristic(self, goal, next):
-        # Chebyshev distance
-        dx = abs(goal[0] - next.x)
-        dy = abs(goal[1] - next.y)
-        return max(dx, dy)
-
     def distance_to(self, unit):
         return abs(self.x - unit.x) + abs(self.y - unit.y)
 
@@ -717,10 +644,7 @@ class Soldier41(Soldier4):
             if self.distance_to(self.spawn_point) < self.distance_to(closest_enemy):
                 return IdleAction(self)
             else:
-                came_from, start, goal = self.astar_path(
-                    (self.x, self.y), (closest_enemy.x, closest_enemy.y), board
-                )
-                path = self.reconstruct_path(came_from, start, goal)
+                path = self.find_path((closest_enemy.x, closest_enemy.y), board)
                 if path and len(path) > 1:
                     if path[1].is_occupied():
                         movable_tiles = self.adjacent_tiles(board)
@@ -731,7 +655,7 @@ class Soldier41(Soldier4):
                         return MoveAction(self, path[1])
 
         movable_tiles = self.adjacent_tiles(board)
-        random.shuffle(movable_tiles)
+        self.rng.shuffle(movable_tiles)
         for tile in movable_tiles:
             if not tile.is_occupied():
                 return MoveAction(self, tile)
@@ -746,63 +670,19 @@ class Soldier41(Soldier4):
         if enemies:
             closest_enemy = min(enemies, key=lambda enemy: self.distance_to(enemy))
             in_attack_range = self.in_action_range(
-                board.get_tile(closest_enemy.x, closest_enemy.y)
+                board.get_tile(closest_enemy.x, closest_enemy.y), board
             )
             if in_attack_range:
                 return AttackAction(self, closest_enemy)
 
         return IdleAction(self)
 
-    def astar_path(self, start, goal, board):
-        frontier = PriorityQueue()
-        start_tile = board.get_tile(start[0], start[1])
-        frontier.put(QueueItem(0, start_tile))
-        came_from = {start_tile: None}
-        cost_so_far = {start_tile: 0}
-
-        while not frontier.empty():
-            current = frontier.get().tile
-
-            if (current.x, current.y) == goal:
-                if current not in came_from:
-                    came_from[current] = current
-                break
-
-            for next_tile in board.tiles_in_radius(current.x, current.y, 1.5):
-                new_cost = (
-                    cost_so_far[current] + next_tile.rubble * self.rubble_cost + 1
-                )
-                if next_tile not in cost_so_far or new_cost < cost_so_far[next_tile]:
-                    cost_so_far[next_tile] = new_cost
-                    priority = new_cost + self.heuristic(goal, next_tile)
-                    frontier.put(QueueItem(priority, next_tile))
-                    came_from[next_tile] = current
-
-        return came_from, start_tile, board.get_tile(goal[0], goal[1])
-
-    def reconstruct_path(self, came_from, start, goal):
-        current = goal
-        path = []
-        while current != start:
-            if current not in came_from:
-                return None
-            path.append(current)
-            try:
-                current = came_from[current]
-            except KeyError:
-                return None
-        path.append(start)
-        path.reverse()
-        return path
-
-    def heuristic(self, goal, next):
-        dx = abs(goal[0] - next.x)
-        dy = abs(goal[1] - next.y)
-        return max(dx, dy)
-
     def distance_to(self, unit):
         return abs(self.x - unit.x) + abs(self.y - unit.y)
 
+    def step_cost(self, tile) -> int:
+        return tile.rubble * self.rubble_cost + 1
+
     @property
     def rubble_cost(self):
         return 10  # modify this value to change how much the AI avoids rubble
@@ -816,10 +696,7 @@ class Soldier5(Soldier):
         enemies = self.enemies_in_sight(board)
         if len(enemies) > 0:
             closest_enemy = min(enemies, key=lambda enemy: self.distance_to(enemy))
-            came_from, start, goal = self.astar_path(
-                (self.x, self.y), (closest_enemy.x, closest_enemy.y), board
-            )
-            path = self.reconstruct_path(came_from, start, goal)
+            path = self.find_path((closest_enemy.x, closest_enemy.y), board)
             if path and len(path) > 1:
                 if path[1].is_occupied():
                     movable_tiles = self.adjacent_tiles(board)
@@ -832,7 +709,7 @@ class Soldier5(Soldier):
                     )  # Moving to the second tile in the path, as the first one is the current location of the unit
 
         movable_tiles = self.adjacent_tiles(board)
-        random.shuffle(movable_tiles)
+        self.rng.shuffle(movable_tiles)
         for tile in movable_tiles:
             if not tile.is_occupied():
                 return MoveAction(self, tile)
@@ -841,60 +718,6 @@ class Soldier5(Soldier):
 
         return IdleAction(self)
 
-    def astar_path(self, start, goal, board):
-        frontier = PriorityQueue()
-        start_tile = board.get_tile(start[0], start[1])
-        frontier.put(QueueItem(0, start_tile))
-        came_from = {start_tile: None}
-        cost_so_far = {start_tile: 0}
-
-        while not frontier.empty():
-            current = frontier.get().tile
-
-            if (current.x, current.y) == goal:
-                if current not in came_from:
-                    came_from[
-                        current
-                    ] = current  # Add the goal tile to the came_from dictionary
-                break
-
-            for next_tile in board.tiles_in_radius(current.x, current.y, 1):
-                new_cost = cost_so_far[current] + next_tile.rubble + 1
-                if next_tile not in cost_so_far or new_cost < cost_so_far[next_tile]:
-                    cost_so_far[next_tile] = new_cost
-                    priority = new_cost + self.heuristic(goal, next_tile)
-                    frontier.put(QueueItem(priority, next_tile))
-                    came_from[
-                        next_tile
-                    ] = current  # this line updates came_from for every explored tile
-
-        return came_from, start_tile, board.get_tile(goal[0], goal[1])
-
-    # ... existing code ...
-
-    def reconstruct_path(self, came_from, start, goal):
-        current = goal
-        path = []
-        while current != start:
-            if current not in came_from:
-                # If the current tile is not in came_from, a path could not be found.
-                return None
-            path.append(current)
-            try:
-                current = came_from[current]
-            except KeyError:
-                # If the current tile is not in came_from, a path could not be found.
-                return None
-        path.append(start)  # optional
-        path.reverse()  # optional
-        return path
-
-    def heuristic(self, goal, next):
-        # Chebyshev distance
-        dx = abs(goal[0] - next.x)
-        dy = abs(goal[1] - next.y)
-        return max(dx, dy)
-
     def distance_to(self, unit):
         return abs(self.x - unit.x) + abs(self.y - unit.y)
 
@@ -908,10 +731,7 @@ class Soldier51(Soldier5):
         if len(enemies) > 0:
             enemies.sort(key=lambda enemy: self.threat_level(enemy))
             target = enemies[0]
-            came_from, start, goal = self.astar_path(
-                (self.x, self.y), (target.x, target.y), board
-            )
-            path = self.reconstruct_path(came_from, start, goal)
+            path = self.find_path((target.x, target.y), board)
             if path and len(path) > 1:
                 if path[1].is_occupied():
                     movable_tiles = self.adjacent_tiles(board)
@@ -924,7 +744,7 @@ class Soldier51(Soldier5):
                     )  # Moving to the second tile in the path, as the first one is the current location of the unit
 
         movable_tiles = self.adjacent_tiles(board)
-        random.shuffle(movable_tiles)
+        self.rng.shuffle(movable_tiles)
         for tile in movable_tiles:
             if not tile.is_occupied():
                 return MoveAction(self, tile)
@@ -940,60 +760,6 @@ class Soldier51(Soldier5):
             return 0
         return self.distance_to(enemy) / enemy_strength
 
-    def astar_path(self, start, goal, board):
-        frontier = PriorityQueue()
-        start_tile = board.get_tile(start[0], start[1])
-        frontier.put(QueueItem(0, start_tile))
-        came_from = {start_tile: None}
-        cost_so_far = {start_tile: 0}
-
-        while not frontier.empty():
-            current = frontier.get().tile
-
-            if (current.x, current.y) == goal:
-                if current not in came_from:
-                    came_from[
-                        current
-                    ] = current  # Add the goal tile to the came_from dictionary
-                break
-
-            for next_tile in board.tiles_in_radius(current.x, current.y, 1):
-                new_cost = cost_so_far[current] + next_tile.rubble + 1
-                if next_tile not in cost_so_far or new_cost < cost_so_far[next_tile]:
-                    cost_so_far[next_tile] = new_cost
-                    priority = new_cost + self.heuristic(goal, next_tile)
-                    frontier.put(QueueItem(priority, next_tile))
-                    came_from[
-                        next_tile
-                    ] = current  # this line updates came_from for every explored tile
-
-        return came_from, start_tile, board.get_tile(goal[0], goal[1])
-
-    # ... existing code ...
-
-    def reconstruct_path(self, came_from, start, goal):
-        current = goal
-        path = []
-        while current != start:
-            if current not in came_from:
-                # If the current tile is not in came_from, a path could not be found.
-                return None
-            path.append(current)
-            try:
-                current = came_from[current]
-            except KeyError:
-                # If the current tile is not in came_from, a path could not be found.
-                return None
-        path.append(start)  # optional
-        path.reverse()  # optional
-        return path
-
-    def heuristic(self, goal, next):
-        # Chebyshev distance
-        dx = abs(goal[0] - next.x)
-        dy = abs(goal[1] - next.y)
-        return max(dx, dy)
-
     def distance_to(self, unit):
         return abs(self.x - unit.x) + abs(self.y - unit.y)
 
@@ -1008,15 +774,12 @@ class Soldier52(Soldier5):
 
         if len(enemies) > 0:
             if len(allies) < len(enemies):  # Outnumbered, try to retreat
-                retreat_tile = self.find_retreat_tile(board)
+                retreat_tile = self.find_retreat_tile(board, enemies, allies)
                 if retreat_tile:
                     return MoveAction(self, retreat_tile)
             else:  # Not outnumbered, proceed as before
                 closest_enemy = min(enemies, key=lambda enemy: self.distance_to(enemy))
-                came_from, start, goal = self.astar_path(
-                    (self.x, self.y), (closest_enemy.x, closest_enemy.y), board
-                )
-                path = self.reconstruct_path(came_from, start, goal)
+                path = self.find_path((closest_enemy.x, closest_enemy.y), board)
                 if path and len(path) > 1:
                     if path[1].is_occupied():
                         movable_tiles = self.adjacent_tiles(board)
@@ -1027,19 +790,21 @@ class Soldier52(Soldier5):
                         return MoveAction(self, path[1])
 
         movable_tiles = self.adjacent_tiles(board)
-        random.shuffle(movable_tiles)
+        self.rng.shuffle(movable_tiles)
         for tile in movable_tiles:
             if not tile.is_occupied():
                 return MoveAction(self, tile)
 
         return IdleAction(self)
 
-    def find_retreat_tile(self, board):
+    def find_retreat_tile(self, board, enemies=None, allies=None):
         # Find a tile to retreat to
         # Consider safety in terms of distance from enemies and proximity to allies
         movable_tiles = self.adjacent_tiles(board)
-        enemies = self.enemies_in_sight(board)
-        allies = self.allies_in_sight(board)
+        if enemies is None:
+            enemies = self.enemies_in_sight(board)
+        if allies is None:
+            allies = self.allies_in_sight(board)
 
         # If there are no movable tiles or no allies, return None
         if not movable_tiles or not allies:
@@ -1077,60 +842,6 @@ class Soldier52(Soldier5):
             return 0
         return self.distance_to(enemy) / enemy_strength
 
-    def astar_path(self, start, goal, board):
-        frontier = PriorityQueue()
-        start_tile = board.get_tile(start[0], start[1])
-        frontier.put(QueueItem(0, start_tile))
-        came_from = {start_tile: None}
-        cost_so_far = {start_tile: 0}
-
-        while not frontier.empty():
-            current = frontier.get().tile
-
-            if (current.x, current.y) == goal:
-                if current not in came_from:
-                    came_from[
-                        current
-                    ] = current  # Add the goal tile to the came_from dictionary
-                break
-
-            for next_tile in board.tiles_in_radius(current.x, current.y, 1):
-                new_cost = cost_so_far[current] + next_tile.rubble + 1
-                if next_tile not in cost_so_far or new_cost < cost_so_far[next_tile]:
-                    cost_so_far[next_tile] = new_cost
-                    priority = new_cost + self.heuristic(goal, next_tile)
-                    frontier.put(QueueItem(priority, next_tile))
-                    came_from[
-                        next_tile
-                    ] = current  # this line updates came_from for every explored tile
-
-        return came_from, start_tile, board.get_tile(goal[0], goal[1])
-
-    # ... existing code ...
-
-    def reconstruct_path(self, came_from, start, goal):
-        current = goal
-        path = []
-        while current != start:
-            if current not in came_from:
-                # If the current tile is not in came_from, a path could not be found.
-                return None
-            path.append(current)
-            try:
-                current = came_from[current]
-            except KeyError:
-                # If the current tile is not in came_from, a path could not be found.
-                return None
-        path.append(start)  # optional
-        path.reverse()  # optional
-        return path
-
-    def heuristic(self, goal, next):
-        # Chebyshev distance
-        dx = abs(goal[0] - next.x)
-        dy = abs(goal[1] - next.y)
-        return max(dx, dy)
-
     def distance_to(self, unit):
         return abs(self.x - unit.x) + abs(self.y - unit.y)
 
@@ -1140,14 +851,13 @@ class Soldier54(Soldier5):
         if not hasattr(self, "base"):
             self.base = (self.x, self.y)
             max_x, max_y = board.width(), board.height()
-            self.enemy_base = (max_x - self.base[0], max_y - self.base[1])
+            self.enemy_base = (max_x - 1 - self.base[0], max_y - 1 - self.base[1])
 
         if not self.can_move():
             return IdleAction(self)
 
-        HEALTH_THRESHOLD = 2
         if (
-            self.health < HEALTH_THRESHOLD
+            self.health < self.params.retreat_health
         ):  # Check if health is below a certain threshold
             return self.retreat(board)  # Retreat to heal
 
@@ -1209,8 +919,7 @@ class Soldier54(Soldier5):
         else:  # If the target is a location
             goal = target
 
-        came_from, start, goal = self.astar_path(start, goal, board)
-        return self.reconstruct_path(came_from, start, goal)
+        return self.find_path(goal, board)
 
 
 class Soldier6(Soldier):
@@ -1231,7 +940,7 @@ class Soldier6(Soldier):
 
     def move(self, board) -> Action:
         # If health is critically low, try to move towards the spawn location
-        if self.health <= self.max_health / 3:
+        if self.health <= self.max_health / self.params.flee_divisor:
             return self.move_towards_spawn(board)
 
         enemies_in_sight = self.enemies_in_sight(board)
@@ -1242,7 +951,7 @@ class Soldier6(Soldier):
         movable_tiles = self.adjacent_tiles(board)
         movable_tiles_without_rubble = [tile for tile in movable_tiles if not tile.rubble > 1]
         if movable_tiles_without_rubble:
-            random.shuffle(movable_tiles_without_rubble)
+            self.rng.shuffle(movable_tiles_without_rubble)
             if not movable_tiles_without_rubble[0].is_occupied():
                 return MoveAction(self, movable_tiles_without_rubble[0])
         else:
@@ -1259,7 +968,7 @@ class Soldier6(Soldier):
 
     def move_towards_enemy(self, board, enemy) -> Action:
         # Directly move towards the enemy by choosing the tile that minimizes distance
-        return self.move_in_direction(board, enemy.tile)
+        return self.move_in_direction(board, board.get_tile(enemy.x, enemy.y))
     
     def move_in_direction(self, board, location) -> Action:
         movable_tiles = self.adjacent_tiles(board)
@@ -1284,7 +993,38 @@ class Soldier6(Soldier):
         return abs(self.x - enemy.x) + abs(self.y - enemy.y)
 
 
+class Soldier7(Soldier21):
+    # Fights like Soldier21, but gathers resources while no enemy is in sight
+    def move(self, board) -> Action:
+        if not self.can_move():
+            return IdleAction(self)
+
+        if self.health < 2 or self.enemies_in_sight(board):
+            return super().move(board)
+
+        if board.get_resource(self.x, self.y) > 0 or board.resource_tiles_in_radius(
+            self.x, self.y, 1.5
+        ):
+            return IdleAction(self)
+
+        target = board.nearest_resource_tile(self.x, self.y)
+        if target is None:
+            return super().move(board)
+
+        movable_tiles = [
+            tile for tile in self.adjacent_tiles(board) if not tile.is_occupied()
+        ]
+        if not movable_tiles:
+            return IdleAction(self)
+        return MoveAction(
+            self, min(movable_tiles, key=lambda tile: tile.distance_to(target))
+        )
+
+
 class Spawner(Unit):
+    rng_stream = "spawn"
+    controllable = False
+
     def __init__(self) -> None:
         super().__init__()
         self.attack_damage = 0
@@ -1297,24 +1037,31 @@ class Spawner(Unit):
         self.bounty = 100
         self.spawn_unit = None
 
-    def act(self, board) -> Action:
+    @property
+    def spawn_cost(self) -> int:
+        return self.params.spawn_cost
+
+    def heal(self, board) -> list:
+        actions = []
         for tile in self.adjacent_tiles(board):
             if tile.is_occupied():
                 unit = tile.occupant
                 if unit.player == self.player:
                     if unit.health < unit.max_health:
-                        # TODO heal action
-                        unit.health += 1
+                        actions.append(HealAction(self, unit))
+        return actions
 
-        if self.can_act():
+    def act(self, board) -> Action:
+        if self.can_act() and self.player.resources >= self.spawn_cost:
             adjacent_tiles = self.adjacent_tiles(board)
-            random.shuffle(adjacent_tiles)
+            self.rng.shuffle(adjacent_tiles)
             for tile in adjacent_tiles:
                 if not tile.is_occupied():
                     if self.spawn_unit is None:
                         raise Exception("Spawner.spawn_unit is None")
                     unit = self.spawn_unit()
                     unit.player = self.player
+                    unit.apply_params(self.player.params)
                     return SpawnAction(self, unit, tile)
         return IdleAction(self)
 
@@ -1,2 +1,2 @@
-from unit import Unit
+from gptgame.unit import Unit
 
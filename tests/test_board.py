@@ -1,4 +1,6 @@
-from gptgame.board import Board
+import random
+
+from gptgame.board import METRICS, Board
 
 
 def test_tiles_in_radius():
@@ -112,4 +114,97 @@ def test_tiles_in_radius():
 
     assert set(tiles) == set(
         expected_tiles
-    ), f"Tiles around ({x}, {y}) in radius={radius} did not match expected tiles"
\ No newline at end of file
+    ), f"Tiles around ({x}, {y}) in radius={radius} did not match expected tiles"
+
+def test_line_of_sight():
+    rubble = [
+        [0, 0, 0, 0, 0],
+        [0, 0, 5, 0, 0],
+        [0, 0, 5, 0, 0],
+        [0, 0, 5, 0, 0],
+        [0, 0, 0, 0, 0],
+    ]
+    resource = [[0] * 5 for _ in range(5)]
+
+    board = Board(rubble, resource)
+
+    assert not board.has_line_of_sight(0, 2, 4, 2), "Wall should block sight"
+    assert not board.has_line_of_sight(4, 2, 0, 2), "Line of sight should be symmetric"
+    assert board.has_line_of_sight(0, 0, 4, 0), "Open row should be visible"
+    assert board.has_line_of_sight(1, 2, 2, 2), "Blocking tile itself is visible"
+
+    board = Board(rubble, resource, line_of_sight=False)
+
+    assert board.has_line_of_sight(0, 2, 4, 2), "Line of sight disabled"
+
+
+def test_resource_index():
+    rubble = [[0] * 10 for _ in range(10)]
+    resource = [[0] * 10 for _ in range(10)]
+    resource[9][9] = 5
+
+    board = Board(rubble, resource)
+
+    assert board.nearest_resource_tile(0, 0) == board.get_tile(9, 9)
+    assert board.nearest_resource_tile(0, 0, max_radius=5) is None
+
+    board.set_resource(2, 1, 3)
+
+    assert board.nearest_resource_tile(0, 0) == board.get_tile(2, 1)
+    assert board.resource_tiles_in_radius(1, 1, 1) == [board.get_tile(2, 1)]
+
+    board.set_resource(2, 1, 0)
+
+    assert board.nearest_resource_tile(0, 0) == board.get_tile(9, 9)
+    assert board.resource_tiles_in_radius(1, 1, 1) == []
+
+
+def test_occupancy_queries_are_memoized_until_occupancy_changes():
+    empty = [[0] * 5 for _ in range(5)]
+    board = Board(empty, empty)
+    board.set_occupant(1, 1, "a")
+
+    first = board.occupied_tiles_in_radius(2, 2, 2)
+    first.clear()
+    assert board.occupied_tiles_in_radius(2, 2, 2) == [board.get_tile(1, 1)]
+    assert board.query_hits == 1
+
+    board.remove_occupant(1, 1)
+    board.set_occupant(3, 3, "a")
+    assert board.occupied_tiles_in_radius(2, 2, 2) == [board.get_tile(3, 3)]
+    assert board.copy().occupied_tiles_in_radius(2, 2, 2) == []
+
+
+def test_nearest_units_matches_brute_force():
+    class Stub:
+        def __init__(self, player):
+            self.player = player
+
+        def is_alive(self):
+            return True
+
+    rng = random.Random(1)
+    empty = [[0] * 30 for _ in range(20)]
+    board = Board(empty, empty, line_of_sight=False)
+    units = []
+    for _ in range(40):
+        x, y = rng.randrange(30), rng.randrange(20)
+        if not board.is_occupied(x, y):
+            unit = Stub(rng.choice("ab"))
+            board.set_occupant(x, y, unit)
+            units.append((x, y, unit))
+
+    for metric, distance in METRICS.items():
+        for x, y, k in [(0, 0, 1), (15, 10, 3), (29, 19, 5), (7, 3, 50)]:
+            expected = sorted(
+                (distance(ux - x, uy - y), uy, ux, unit)
+                for ux, uy, unit in units
+                if (ux, uy) != (x, y) and unit.player == "a"
+            )
+            nearest = board.nearest_units(x, y, k, player="a", metric=metric)
+            assert nearest == [item[3] for item in expected[:k]]
+            within = board.nearest_units(x, y, k, player="a", max_radius=6, metric=metric)
+            assert within == [item[3] for item in expected[:k] if item[0] <= 6]
+
+    assert board.nearest_units(15, 10, 0) == []
+    assert board.nearest_units(15, 10, 0, player="c") == []
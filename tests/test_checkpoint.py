@@ -0,0 +1,23 @@
+from gptgame import checkpoint
+from gptgame.match import create_game
+
+
+def test_resume_matches_uninterrupted_game(tmp_path):
+    path = str(tmp_path / "match.ck")
+    game = create_game("default", "Soldier54", "Soldier6", seed=8)
+    for _ in range(120):
+        game.update()
+    checkpoint.save(game, path, {"note": "x"})
+    expected = []
+    for _ in range(120):
+        game.update()
+        expected.append(game.checksum())
+
+    resumed, extra = checkpoint.load(path)
+    assert extra == {"note": "x"}
+    assert resumed.turn == 121
+    actual = []
+    for _ in range(120):
+        resumed.update()
+        actual.append(resumed.checksum())
+    assert actual == expected
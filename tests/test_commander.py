@@ -0,0 +1,34 @@
+from gptgame.commander import DEFAULT_STRATEGIES, MCTSCommander, SearchSettings
+from gptgame.match import create_game
+
+
+def test_clone_is_independent():
+    game = create_game("default", "Soldier21", "Soldier6", seed=8)
+    for _ in range(30):
+        game.update()
+
+    clone = game.clone()
+    checksum = game.checksum()
+    for _ in range(10):
+        clone.update()
+
+    assert game.checksum() == checksum, "Stepping a clone must not touch the original"
+
+    for _ in range(10):
+        game.update()
+
+    assert game.checksum() == clone.checksum(), "Clone should replay identically"
+
+
+def test_commander_picks_a_strategy():
+    game = create_game("default", "Soldier21", "Soldier6", seed=8)
+    settings = SearchSettings(
+        time_budget=10, max_simulations=6, segment=2, tree_depth=2, rollout_depth=6
+    )
+    commander = MCTSCommander(settings)
+    game.controllers[1] = commander
+    for _ in range(4):
+        game.update()
+
+    assert commander.strategy in DEFAULT_STRATEGIES
+    assert commander.simulations > 0
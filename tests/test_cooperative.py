@@ -0,0 +1,35 @@
+from gptgame.board import Board
+from gptgame.cooperative import ReservationTable, find_path
+from gptgame.pathfinding import PathStats, chebyshev, step_cost
+from gptgame.unit import Soldier
+
+
+def place(board, unit_id, x, y):
+    unit = Soldier()
+    unit.id = unit_id
+    unit.x, unit.y = x, y
+    board.set_occupant(x, y, unit)
+    return unit
+
+
+def test_units_follow_each_other_down_a_corridor():
+    board = Board([[0] * 6], [[0] * 6], line_of_sight=False)
+    leader = place(board, 1, 1, 0)
+    follower = place(board, 2, 0, 0)
+    table = ReservationTable(window=4)
+
+    lead = find_path(board, leader, (5, 0), table, step_cost, chebyshev)
+    assert [tile.x for tile in lead] == [1, 2, 3, 4, 5]
+    # The follower steps into the tile the leader leaves instead of waiting
+    assert table.vacated(board.get_tile(1, 0))
+    follow = find_path(board, follower, (5, 0), table, step_cost, chebyshev)
+    assert [tile.x for tile in follow] == [0, 1, 2, 3, 4]
+
+    # Heading the other way, a third unit can only wait
+    oncoming = place(board, 3, 5, 0)
+    stats = PathStats()
+    back = find_path(board, oncoming, (0, 0), table, step_cost, chebyshev, stats=stats)
+    assert back is None or all(tile.x == 5 for tile in back)
+    # The plain search first, then the space-time one, each counted once
+    assert stats.searches == 1
+    assert stats.cooperative_searches == 1
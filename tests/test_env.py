@@ -0,0 +1,81 @@
+import numpy as np
+
+from gptgame.env import STAY, USE_AI, VecEnv
+from gptgame.observation import CHANNELS, ENEMY_UNITS, OWN_UNITS, unit_crops
+from gptgame.unit import Soldier21, Spawner
+
+
+def test_vec_env_steps_in_place():
+    env = VecEnv(3, seed=10, max_turns=5)
+    observations = env.reset()
+
+    assert observations.shape == (3, len(CHANNELS), 18, 19)
+    assert observations[:, OWN_UNITS].sum() == 3
+    assert observations[:, ENEMY_UNITS].sum() == 3
+
+    actions = np.full(env.actions.shape, STAY)
+    for turn in range(5):
+        result, rewards, dones, infos = env.step(actions)
+        assert result is observations, "Observations should be written in place"
+        assert rewards is env.rewards and dones is env.dones
+
+    assert dones.all(), "Every env should hit max_turns together"
+    assert [info["seed"] for info in infos] == [10, 11, 12]
+    assert env.next_seed == 16, "Finished envs should be reset with fresh seeds"
+
+
+def test_unit_crops():
+    layers = np.arange(2 * 5 * 6, dtype=np.float32).reshape(2, 5, 6)
+    positions = np.array([[0, 0], [3, 2], [5, 4]])
+
+    crops = unit_crops(layers, positions, 1, fill=-1)
+
+    assert crops.shape == (3, 2, 3, 3)
+    assert (crops[1] == layers[:, 1:4, 2:5]).all()
+    assert (crops[0, :, 0, :] == -1).all() and (crops[0, :, :, 0] == -1).all()
+    assert (crops[0, :, 1:, 1:] == layers[:, 0:2, 0:2]).all()
+
+    crops = unit_crops(layers, positions, 1, mask_disk=True, fill=-1)
+
+    assert (crops[1, :, 0, 0] == -1).all(), "Corners fall outside the radius 1 disk"
+    assert (crops[1, :, 1, 1] == layers[:, 2, 3]).all()
+
+
+def test_spawner_ignores_direction_codes():
+    env = VecEnv(1, seed=3, max_turns=20)
+    env.reset()
+    game = env.games[0]
+    spawner = next(
+        unit for unit in game.all_units()
+        if isinstance(unit, Spawner) and unit.player is game.player1
+    )
+    start = (spawner.x, spawner.y)
+
+    actions = np.full(env.actions.shape, 4)
+    for _ in range(5):
+        env.step(actions)
+
+    assert (spawner.x, spawner.y) == start
+    assert game.board.get_tile(*start).occupant is spawner
+
+
+def test_direction_codes_skip_the_unit_ai_move(monkeypatch):
+    env = VecEnv(1, seed=3, max_turns=50)
+    env.reset()
+    moved = []
+    original = Soldier21.move
+
+    def move(self, board):
+        moved.append(self)
+        return original(self, board)
+
+    monkeypatch.setattr(Soldier21, "move", move)
+    actions = np.full(env.actions.shape, STAY)
+    for _ in range(20):
+        env.step(actions)
+
+    assert env.games[0].player1.get_units()[1:], "Player 1 should have spawned soldiers"
+    assert not moved
+
+    env.step(np.full(env.actions.shape, USE_AI))
+    assert moved
@@ -0,0 +1,45 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+import pytest
+
+pygame = pytest.importorskip("pygame")
+
+from gptgame import export
+from gptgame.export import MAX_PENDING, Exporter, VideoWriter
+from gptgame.match import create_game
+
+
+def test_png_frames_match_the_screen(tmp_path):
+    game = create_game("default", "Soldier21", "Soldier6", seed=2)
+    with Exporter(game, str(tmp_path), cell_size=20, workers=2) as exporter:
+        for _ in range(40):
+            exporter.add(game.update())
+        screen = pygame.surfarray.array3d(exporter.renderer.screen)
+
+    frames = sorted(os.listdir(tmp_path))
+    assert len(frames) == 40
+    first = pygame.surfarray.array3d(pygame.image.load(str(tmp_path / frames[0])))
+    last = pygame.surfarray.array3d(pygame.image.load(str(tmp_path / frames[-1])))
+    assert (last == screen).all()
+    assert (first != last).any()
+    pygame.quit()
+
+
+def test_video_writer_fails_when_ffmpeg_exits(tmp_path, monkeypatch):
+    # Stands in for ffmpeg, exiting before reading a single frame
+    encoder = tmp_path / "ffmpeg"
+    encoder.write_text("#!/bin/sh\nexit 3\n")
+    encoder.chmod(0o755)
+    monkeypatch.setattr(export.shutil, "which", lambda name: str(encoder))
+
+    writer = VideoWriter(str(tmp_path / "out.mp4"), 200, 200, (16, 8, 0, 0), 20)
+    frame = np.zeros((200, 200), dtype=np.uint32)
+    with pytest.raises(Exception, match="exited with 3"):
+        for _ in range(10 * MAX_PENDING):
+            writer.write(frame)
+    with pytest.raises(Exception, match="exited with 3"):
+        writer.close()
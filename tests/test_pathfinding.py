@@ -0,0 +1,65 @@
+from gptgame.board import Board
+from gptgame.landmarks import landmark_heuristic, rubble_costs
+from gptgame.maps import get_map
+from gptgame.pathfinding import PathStats, chebyshev, find_path
+from gptgame.player import Player
+from gptgame.unit import Soldier21
+
+
+def open_board(width, height):
+    rubble = [[0] * width for _ in range(height)]
+    return Board(rubble, [[0] * width for _ in range(height)], line_of_sight=False)
+
+
+def test_budget_returns_partial_path():
+    board = open_board(40, 40)
+    stats = PathStats()
+
+    full = find_path(board, (0, 0), (39, 39), radius=1.5, stats=stats)
+    assert (full[-1].x, full[-1].y) == (39, 39)
+    assert stats.budget_hits == 0
+
+    partial = find_path(board, (0, 0), (39, 39), radius=1.5, max_expansions=10, stats=stats)
+    assert partial[0] is full[0]
+    assert 1 < len(partial) < len(full)
+    assert chebyshev((39, 39), partial[-1]) < chebyshev((39, 39), partial[0])
+    assert stats.budget_hits == 1
+    assert stats.searches == 2
+
+
+def test_unreachable_goal():
+    board = open_board(10, 10)
+    for y in range(10):
+        board.set_occupant(5, y, object())
+    stats = PathStats()
+
+    assert find_path(board, (0, 0), (9, 9), avoid_occupied=True, stats=stats) is None
+    assert stats.unreachable == 1
+    # Occupied tiles only block when asked to
+    assert find_path(board, (0, 0), (9, 9), stats=stats) is not None
+
+
+def test_landmarks_keep_paths_optimal_with_fewer_expansions():
+    rubble, resource = get_map("default")
+    board = Board(rubble, resource, line_of_sight=False)
+    cost = lambda tile: tile.rubble * 10 + 1
+    alt = landmark_heuristic(board, cost, 1.5)
+    assert landmark_heuristic(board, cost, 1.5) is alt
+    # Cached on the board, which copies share
+    assert board.copy().heuristics[(rubble_costs(cost), 1.5, 4)] is alt
+    plain, guided = PathStats(), PathStats()
+
+    for goal in [(18, 17), (10, 5), (0, 17)]:
+        expected = find_path(board, (0, 0), goal, cost, chebyshev, 1.5, stats=plain)
+        path = find_path(board, (0, 0), goal, cost, alt, 1.5, stats=guided)
+        assert sum(map(cost, path[1:])) == sum(map(cost, expected[1:]))
+    assert guided.expansions < plain.expansions / 2
+
+
+def test_path_costs_follow_params():
+    soldier = Soldier21()
+    soldier.player = Player(1)
+    assert soldier.path_costs() == rubble_costs(soldier.step_cost)
+    assert soldier.path_costs() is soldier.path_costs()
+    soldier.player.params = soldier.player.params.replace(rubble_cost=2)
+    assert soldier.path_costs() == (1, 3, 5, 7, 9, 11)
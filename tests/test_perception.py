@@ -0,0 +1,41 @@
+from gptgame.board import Board
+from gptgame.perception import Perception
+from gptgame.player import Player
+from gptgame.unit import Soldier
+
+
+def place(board, player, x, y):
+    unit = Soldier()
+    unit.player = player
+    unit.x, unit.y = x, y
+    board.set_occupant(x, y, unit)
+    player.add_unit(unit)
+    return unit
+
+
+def test_perception_matches_disk_scan(monkeypatch):
+    board_data = [[0] * 20 for _ in range(20)]
+    board = Board(board_data, board_data)
+    player1 = Player(1)
+    player2 = Player(2)
+    for i in range(0, 20, 3):
+        place(board, player1, i, i)
+        place(board, player2, 19 - i, i)
+
+    for threshold in (0, 1000):
+        monkeypatch.setattr(Perception, "GRID_QUERY_THRESHOLD", threshold)
+        perception = Perception(player1, board, player2.get_units())
+
+        for y in range(20):
+            for x in range(20):
+                expected = any(
+                    (x - unit.x) ** 2 + (y - unit.y) ** 2 <= unit.vision_range**2
+                    for unit in player1.get_units()
+                )
+                assert perception.is_visible(x, y) == expected
+
+        for unit in player1.get_units():
+            expected = set(map(id, unit.enemies_in_sight(board)))
+            unit.perception = perception
+            assert set(map(id, unit.enemies_in_sight(board))) == expected
+            unit.perception = None
@@ -0,0 +1,126 @@
+import pytest
+
+from gptgame.action import AttackAction, IdleAction, SpawnAction
+from gptgame.match import create_game
+from gptgame.params import DEFAULT_PARAMS
+from gptgame.pipeline import CombatStage, HealingStage, Stage, Turn
+from gptgame.statechange import ATTACK, HARVEST, HEAL
+from gptgame.unit import Soldier, Spawner
+
+
+class RecordingStage(Stage):
+    name = "recording"
+
+    def __init__(self) -> None:
+        self.turns = []
+
+    def run(self, turn) -> None:
+        self.turns.append(len(turn.decisions))
+
+
+def test_register_stage():
+    game = create_game("default", "Soldier21", "Soldier6", seed=5)
+    stage = RecordingStage()
+    game.pipeline.register(stage, after="combat")
+
+    assert game.pipeline.names() == [
+        "cooldown",
+        "perception",
+        "reservation",
+        "decision",
+        "movement",
+        "combat",
+        "recording",
+        "healing",
+        "death",
+    ]
+
+    game.update()
+    game.update()
+
+    # Two spawners on the first turn, plus the soldiers they spawned on the second
+    assert stage.turns == [2, 4], "Stage should see every unit's decision"
+    assert set(game.pipeline.last_timings) == set(game.pipeline.names())
+
+    with pytest.raises(Exception, match="already registered"):
+        game.pipeline.register(RecordingStage())
+
+
+def place(game, player, x, y):
+    unit = Soldier()
+    unit.player = player
+    unit.x, unit.y = x, y
+    unit.action_cooldown = 0
+    game.board.set_occupant(x, y, unit)
+    game.assign_id(unit)
+    return unit
+
+
+def empty_tiles_near(game, x, y, count):
+    tiles = [tile for tile in game.board.neighbours(x, y, 1.5) if not tile.is_occupied()]
+    assert len(tiles) >= count
+    return tiles[:count]
+
+
+def test_attacks_on_one_target_are_summed():
+    game = create_game("default", "Soldier21", "Soldier6", seed=5)
+    target = place(game, game.player2, 9, 9)
+    attackers = [
+        place(game, game.player1, tile.x, tile.y)
+        for tile in empty_tiles_near(game, 9, 9, 2)
+    ]
+    turn = Turn(game)
+    turn.decisions = [
+        [unit, IdleAction(unit), AttackAction(unit, target)] for unit in attackers
+    ]
+    CombatStage().run(turn)
+
+    assert target.health == target.max_health - 2
+    assert [row[0] for row in turn.actions.rows] == [ATTACK, ATTACK]
+
+
+def test_spawner_heals_only_when_it_can_act():
+    game = create_game("default", "Soldier21", "Soldier6", seed=5)
+    spawner = next(unit for unit in game.all_units() if isinstance(unit, Spawner))
+    tile = empty_tiles_near(game, spawner.x, spawner.y, 1)[0]
+    soldier = place(game, spawner.player, tile.x, tile.y)
+    soldier.health = 1
+
+    turn = Turn(game)
+    turn.units = [spawner, soldier]
+    HealingStage().run(turn)
+    assert soldier.health == 1
+
+    turn.ready.add(spawner)
+    HealingStage().run(turn)
+    assert soldier.health == 2
+    assert [row[0] for row in turn.actions.rows] == [HEAL]
+
+
+def test_harvest_and_spawn_spend_player_resources():
+    game = create_game("default", "Soldier21", "Soldier6", seed=5)
+    tile = game.board.resource_tiles_in_radius(10, 10, 20)[0]
+    soldier = place(game, game.player1, tile.x, tile.y)
+    amount = game.board.get_resource(tile.x, tile.y)
+
+    turn = Turn(game)
+    turn.decisions = [[soldier, IdleAction(soldier), soldier.harvest(game.board)]]
+    CombatStage().run(turn)
+    assert game.player1.resources == 1
+    assert game.board.get_resource(tile.x, tile.y) == amount - 1
+    assert [row[0] for row in turn.actions.rows] == [HARVEST]
+
+    spawner = next(unit for unit in game.player1.get_units() if isinstance(unit, Spawner))
+    spawner.action_cooldown = 0
+    game.player1.set_params(DEFAULT_PARAMS.replace(spawn_cost=3, starting_resources=2))
+    assert isinstance(spawner.act(game.board), IdleAction)
+    game.player1.resources = 3
+    spawn = spawner.act(game.board)
+    assert isinstance(spawn, SpawnAction) and spawn.is_valid(game.board)
+    game.player1.resources = 2
+    assert spawn.error(game.board) == "Not enough resources"
+
+    game.player1.resources = 3
+    game.update()
+    assert game.player1.resources == 0
+    assert len(game.player1.get_units()) == 2
@@ -0,0 +1,44 @@
+import pytest
+
+from gptgame.match import create_game
+from gptgame.policy import NearestEnemyPolicy, ScriptedPolicy
+from gptgame.unit import Soldier6
+
+
+def play(controllers, turns=150, units=("Soldier21", "Soldier6")):
+    game = create_game("default", *units, seed=21)
+    game.controllers.update(controllers)
+    checksums = []
+    for _ in range(turns):
+        game.update()
+        checksums.append(game.checksum())
+    return game, checksums
+
+
+def test_scripted_policy_matches_unit_ai():
+    _, expected = play({})
+    _, checksums = play({1: ScriptedPolicy(), 2: ScriptedPolicy()})
+
+    assert checksums == expected, "Adapter should reproduce the per-unit AI exactly"
+
+
+def test_scripted_class_keeps_ai_state():
+    # Soldier6 remembers its spawn location from turn to turn
+    units = ("Soldier54", "Soldier6")
+    _, expected = play({}, turns=300, units=units)
+    _, checksums = play({2: ScriptedPolicy(Soldier6)}, turns=300, units=units)
+
+    assert checksums == expected
+    # Units of another class get the attributes Soldier6 sets up for itself
+    play({2: ScriptedPolicy(Soldier6)}, turns=300, units=("Soldier54", "Soldier21"))
+
+    with pytest.raises(Exception, match="not a Unit class"):
+        ScriptedPolicy(object)
+
+
+def test_nearest_enemy_policy_fights():
+    game, _ = play({1: NearestEnemyPolicy()}, turns=300)
+
+    ids = [unit.id for unit in game.all_units()]
+    assert len(ids) == len(set(ids)), "Unit ids should be unique"
+    assert game.next_unit_id > len(ids), "Some units should have died"
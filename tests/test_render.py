@@ -0,0 +1,37 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pytest
+
+pygame = pytest.importorskip("pygame")
+
+from gptgame import render
+from gptgame.match import create_game
+from gptgame.render import Renderer
+
+
+def test_debug_ranges_circles_and_coverage(monkeypatch):
+    game = create_game("default", "Soldier21", "Soldier6", seed=3)
+    renderer = Renderer(game)
+    renderer.debug = True
+    for _ in range(30):
+        renderer.draw(game.update())
+    circles = pygame.surfarray.array3d(renderer.screen)
+    assert renderer.range_tiles
+    assert renderer.coverage is None
+
+    monkeypatch.setattr(render, "RANGE_CIRCLE_LIMIT", 0)
+    renderer.draw(game.update())
+    coverage = pygame.surfarray.array3d(renderer.screen)
+    assert renderer.coverage is not None
+    assert (coverage != circles).any()
+
+    # Sprites are cached by what they show, so redrawing adds none
+    changes = game.update()
+    renderer.draw(changes)
+    count = len(renderer.sprites)
+    renderer.draw(changes)
+    assert len(renderer.sprites) == count
+    pygame.quit()
@@ -0,0 +1,21 @@
+import pytest
+
+from gptgame.replay import Replay, record, verify
+
+
+def test_same_seed_same_match():
+    replay1 = record("default", "Soldier21", "Soldier6", 1234, 100)
+    replay2 = record("default", "Soldier21", "Soldier6", 1234, 100)
+
+    assert replay1.checksums == replay2.checksums, "Same seed produced different matches"
+
+
+def test_replay_verifies_from_seed():
+    replay = record("default", "Soldier21", "Soldier6", 99, 100)
+    loaded = Replay.loads(replay.dumps())
+
+    assert verify(loaded)
+
+    loaded.checksums[50] += 1
+    with pytest.raises(Exception, match="diverged at turn 51"):
+        verify(loaded)
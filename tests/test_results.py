@@ -0,0 +1,34 @@
+from gptgame.results import MatchResult, ResultStore, run_tournament
+
+
+def test_pair_stats_and_ratings(tmp_path):
+    store = ResultStore(str(tmp_path / "results.sqlite"))
+    store.add_results(
+        [
+            MatchResult("default", "Soldier21", "Soldier6", 1, 1, 100),
+            MatchResult("default", "Soldier6", "Soldier21", 2, 2, 120),
+            MatchResult("default", "Soldier6", "Soldier21", 3, 1, 90),
+            MatchResult("other", "Soldier21", "Soldier6", 4, 0, 1000),
+        ]
+    )
+
+    assert store.count() == 4
+    assert store.pair_record("Soldier21", "Soldier6", "default") == (3, 2, 1)
+    assert store.pair_record("Soldier6", "Soldier21") == (4, 1, 2)
+    assert store.win_rate("Soldier21", "Soldier6", "default") == 2 / 3
+    assert store.win_rate("Soldier21", "Soldier1") is None
+
+    ratings = store.ratings()
+    assert ratings["Soldier21"][0] > ratings["Soldier6"][0]
+    assert ratings["Soldier21"][1] == 4
+    store.close()
+
+
+def test_tournament_writes_through_one_writer(tmp_path):
+    path = str(tmp_path / "results.sqlite")
+    written = run_tournament(path, ["Soldier21", "Soldier6"], range(2), max_turns=30, workers=2)
+
+    store = ResultStore(path)
+    assert written == store.count() == 4
+    assert store.pair_record("Soldier21", "Soldier6")[0] == 4
+    store.close()
@@ -0,0 +1,125 @@
+import os
+import time
+
+from gptgame import checkpoint
+from gptgame.match import create_game
+from gptgame.sandbox import SandboxedPolicy, restore_ai_state, sandbox_players
+from gptgame.statechange import MOVE
+from gptgame.unit import Soldier
+
+
+class Stuck(Soldier):
+    def move(self, board):
+        time.sleep(60)
+
+
+class Raises(Soldier):
+    def move(self, board):
+        raise ValueError("broken AI")
+
+
+class Exits(Soldier):
+    def move(self, board):
+        os._exit(1)
+
+
+def play(sandboxed, turns=40, units=("Soldier21", "Soldier6")):
+    game = create_game("default", *units, seed=21)
+    policies = sandbox_players(game, time_budget=10) if sandboxed else {}
+    checksums = []
+    try:
+        for _ in range(turns):
+            game.update()
+            checksums.append(game.checksum())
+    finally:
+        for policy in policies.values():
+            policy.close()
+    return checksums, policies
+
+
+def test_sandbox_matches_in_process_ai():
+    expected, _ = play(False)
+    checksums, policies = play(True)
+
+    assert checksums == expected
+    assert all(policy.timeouts == 0 for policy in policies.values())
+    assert all(policy.cpu_time > 0 for policy in policies.values())
+
+
+def test_sandbox_keeps_ai_state_between_turns():
+    # Both remember their base from turn to turn, as tiles and as positions
+    units = ("Soldier54", "Soldier6")
+    expected, _ = play(False, turns=200, units=units)
+    checksums, policies = play(True, turns=200, units=units)
+
+    assert checksums == expected
+    assert all(policy.failures == 0 for policy in policies.values())
+
+
+def test_failing_ai_leaves_units_idle():
+    for unit_class, error in ((Raises, "broken AI"), (Exits, "worker died")):
+        game = create_game("default", "Soldier21", "Soldier6", seed=21)
+        policy = SandboxedPolicy(time_budget=5, unit_class=unit_class)
+        game.controllers[1] = policy
+        moves = 0
+        try:
+            for _ in range(10):
+                moves += int((game.update().of(MOVE)["player"] == 1).sum())
+        finally:
+            policy.close()
+
+        assert policy.failures > 0
+        assert error in policy.last_error
+        assert any(isinstance(unit, Soldier) for unit in game.player1.get_units())
+        assert moves == 0, "Units of a failing AI should stay idle"
+
+
+def test_stuck_ai_times_out():
+    game = create_game("default", "Soldier21", "Soldier6", seed=21)
+    policy = SandboxedPolicy(time_budget=0.05, unit_class=Stuck)
+    game.controllers[1] = policy
+    try:
+        start = time.perf_counter()
+        for _ in range(10):
+            game.update()
+        elapsed = time.perf_counter() - start
+    finally:
+        policy.close()
+
+    assert policy.timeouts > 0
+    assert elapsed < 5
+
+
+def test_resumed_sandbox_keeps_ai_state(tmp_path):
+    path = str(tmp_path / "match.ck")
+    game = create_game("default", "Soldier54", "Soldier6", seed=21)
+    policies = sandbox_players(game, time_budget=10)
+    try:
+        for _ in range(100):
+            game.update()
+        ai_state = {player_id: policy.ai_state for player_id, policy in policies.items()}
+        checkpoint.save(game, path, {"ai_state": ai_state})
+        expected = []
+        for _ in range(100):
+            game.update()
+            expected.append(game.checksum())
+    finally:
+        for policy in policies.values():
+            policy.close()
+
+    for sandboxed in (True, False):
+        resumed, extra = checkpoint.load(path)
+        if sandboxed:
+            policies = sandbox_players(resumed, 10, extra["ai_state"])
+        else:
+            policies = {}
+            restore_ai_state(resumed, extra["ai_state"])
+        checksums = []
+        try:
+            for _ in range(100):
+                resumed.update()
+                checksums.append(resumed.checksum())
+        finally:
+            for policy in policies.values():
+                policy.close()
+        assert checksums == expected
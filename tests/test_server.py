@@ -0,0 +1,133 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from gptgame import server as server_module
+from gptgame.server import MatchServer, play, watch
+from gptgame.maps import get_map
+from gptgame.spectator import SpectatorView
+
+
+def idle_bot(state):
+    return {"moves": [], "attacks": []}
+
+
+def test_server_plays_concurrent_matches():
+    async def run():
+        server = MatchServer(turn_deadline=1.0, max_turns=5)
+        port = await server.start()
+        results = await asyncio.gather(
+            *(play("127.0.0.1", port, idle_bot) for _ in range(4))
+        )
+        await server.close()
+        return server, results
+
+    server, results = asyncio.run(run())
+    assert all(result["type"] == "end" and result["turns"] == 5 for result in results)
+    assert len(server.results) == 2
+
+
+def test_deadline_advances_without_actions():
+    async def run():
+        server = MatchServer(turn_deadline=0.01, max_turns=3)
+        port = await server.start()
+        # Joins but never submits actions
+        _, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(json.dumps({"type": "join"}).encode() + b"\n")
+        result = await play("127.0.0.1", port, idle_bot)
+        writer.close()
+        await server.close()
+        return result
+
+    result = asyncio.run(run())
+    assert result["turns"] == 3
+
+
+def test_spectator_follows_match():
+    async def run():
+        server = MatchServer(turn_deadline=1.0, max_turns=20)
+        port = await server.start()
+        first = asyncio.create_task(play("127.0.0.1", port, idle_bot))
+        second = asyncio.create_task(play("127.0.0.1", port, idle_bot))
+        while not server.matches:
+            await asyncio.sleep(0.001)
+        rubble, _ = get_map("default")
+        view = SpectatorView(len(rubble[0]), len(rubble))
+        async for frame in watch("127.0.0.1", port, 1):
+            view.apply(frame)
+        result = await first
+        await second
+        await server.close()
+        return view, result
+
+    view, result = asyncio.run(run())
+    assert view.turn == result["turns"] + 1
+    assert len(view.units) >= 2
+
+
+def test_failed_turn_ends_match(monkeypatch):
+    def broken_turn(game, submissions):
+        raise ValueError("bad turn")
+
+    monkeypatch.setattr(server_module, "resolve_turn", broken_turn)
+
+    async def run():
+        server = MatchServer(turn_deadline=0.01, max_turns=5, executor=ThreadPoolExecutor(1))
+        port = await server.start()
+        results = await asyncio.gather(
+            *(play("127.0.0.1", port, idle_bot) for _ in range(2))
+        )
+        await server.close()
+        return server, results
+
+    server, results = asyncio.run(run())
+    assert all(result["type"] == "end" for result in results)
+    assert all("bad turn" in result["error"] for result in results)
+    assert server.errors == [(1, "ValueError: bad turn")]
+    assert not server.matches
+
+
+def test_malformed_actions_are_dropped():
+    def bad_bot(state):
+        unit_id = state["units"][0][0]
+        return {
+            "moves": [[unit_id, 10**20, -10**20], [unit_id], "move", [10**20, 1, 1]],
+            "attacks": [[unit_id, 10**20], [unit_id, True], None],
+        }
+
+    async def run():
+        server = MatchServer(turn_deadline=1.0, max_turns=5, executor=ThreadPoolExecutor(1))
+        port = await server.start()
+        _, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"not json\n[1, 2]\n")
+        results = await asyncio.gather(
+            play("127.0.0.1", port, bad_bot), play("127.0.0.1", port, idle_bot)
+        )
+        writer.close()
+        await server.close()
+        return server, results
+
+    server, results = asyncio.run(run())
+    assert all(result["turns"] == 5 and "error" not in result for result in results)
+    assert not server.errors
+
+
+def test_disconnected_player_is_not_waited_for():
+    async def run():
+        server = MatchServer(turn_deadline=30.0, max_turns=5, executor=ThreadPoolExecutor(1))
+        port = await server.start()
+        player = asyncio.create_task(play("127.0.0.1", port, idle_bot))
+        while not server.waiting:
+            await asyncio.sleep(0.001)
+        # Joins, sees the first turn and leaves without submitting
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(json.dumps({"type": "join"}).encode() + b"\n")
+        await reader.readline()
+        await reader.readline()
+        writer.close()
+        result = await asyncio.wait_for(player, 10)
+        await server.close()
+        return result
+
+    result = asyncio.run(run())
+    assert result["turns"] == 5
@@ -0,0 +1,26 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from gptgame.match import create_game
+from gptgame.results import play_match
+from gptgame.sharedmap import SharedMap, attach
+
+
+def test_shared_board_plays_like_private_board():
+    with SharedMap("default") as shared:
+        static_map = attach(shared.spec)
+        assert not static_map.rubble.flags.writeable
+
+        private = create_game("default", "Soldier21", "Soldier6", seed=2)
+        game = create_game("default", "Soldier21", "Soldier6", seed=2, static_map=static_map)
+        for _ in range(150):
+            private.update()
+            game.update()
+        assert game.checksum() == private.checksum()
+        assert (static_map.resource != game.board.resource_array).any()
+
+        with ProcessPoolExecutor(2) as executor:
+            shared_result = executor.submit(
+                play_match, "default", "Soldier21", "Soldier6", 2, 200, shared.spec
+            ).result()
+        private_result = play_match("default", "Soldier21", "Soldier6", 2, 200)
+        assert shared_result.row()[:-1] == private_result.row()[:-1]
@@ -0,0 +1,48 @@
+import asyncio
+
+from gptgame.match import create_game
+from gptgame.spectator import Broadcaster, SpectatorView
+
+
+def test_view_tracks_game_from_deltas():
+    game = create_game("default", "Soldier21", "Soldier6", seed=5)
+    broadcaster = Broadcaster(keyframe_interval=1000)
+    view = SpectatorView(game.board.width(), game.board.height())
+    keyframe = broadcaster.publish(game)
+    view.apply(keyframe)
+
+    sizes = []
+    for _ in range(150):
+        game.update()
+        frame = broadcaster.publish(game)
+        sizes.append(len(frame))
+        view.apply(frame)
+        assert view.turn == game.turn
+        assert view.units == {
+            unit.id: [type(unit).__name__, unit.player.id, unit.x, unit.y, unit.health]
+            for unit in game.all_units()
+            if unit.is_alive()
+        }
+        assert (view.resources == game.board.resource_array).all()
+
+    assert max(sizes) < len(broadcaster.latest_keyframe())
+
+
+def test_slow_subscriber_is_resynchronised():
+    async def run():
+        game = create_game("default", "Soldier21", "Soldier6", seed=5)
+        broadcaster = Broadcaster(queue_size=4)
+        broadcaster.publish(game)
+        queue = broadcaster.subscribe()
+        for _ in range(20):
+            game.update()
+            broadcaster.publish(game)
+        view = SpectatorView(game.board.width(), game.board.height())
+        while not queue.empty():
+            view.apply(queue.get_nowait())
+        return game, broadcaster, view
+
+    game, broadcaster, view = asyncio.run(run())
+    assert broadcaster.resyncs > 0
+    assert view.turn == game.turn
+    assert len(view.units) == len([u for u in game.all_units() if u.is_alive()])
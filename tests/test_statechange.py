@@ -0,0 +1,25 @@
+from gptgame.match import create_game
+from gptgame.replay import record, summarize
+from gptgame.statechange import ATTACK, DIE, SPAWN, StateChange
+
+
+def test_actions_account_for_unit_changes():
+    game = create_game("default", "Soldier21", "Soldier6", seed=4)
+    for _ in range(200):
+        before = len(game.all_units())
+        state_change = game.update()
+        after = len(game.all_units())
+        assert after - before == len(state_change.of(SPAWN)) - len(state_change.of(DIE))
+        for attack in state_change.of(ATTACK):
+            assert attack["player"] != 0 and attack["target"] > 0
+
+    copy = StateChange.from_bytes(state_change.to_bytes())
+    assert (copy.actions == state_change.actions).all()
+
+
+def test_summarize_replay():
+    replay = record("default", "Soldier21", "Soldier6", 4, 200)
+    summary = summarize(replay)
+
+    assert summary[1]["spawn"]["count"] > 0
+    assert summary[1]["attack"]["value"] + summary[2]["attack"]["value"] > 0
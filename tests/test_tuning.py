@@ -0,0 +1,54 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from gptgame.los import LineOfSight
+from gptgame.match import create_game
+from gptgame.params import DEFAULT_PARAMS
+from gptgame.tuning import Candidate, successive_halving
+
+
+def test_player_params_reach_spawned_units():
+    game = create_game("default", "Soldier21", "Soldier6", seed=2)
+    game.player1.params = DEFAULT_PARAMS.replace(health=7, spawn_cooldown=9)
+    game.update()
+    game.update()
+
+    soldiers = [unit for unit in game.player1.get_units() if unit.controllable]
+    assert soldiers and all(unit.max_health == 7 for unit in soldiers)
+    spawner = [unit for unit in game.player1.get_units() if not unit.controllable][0]
+    assert spawner.action_cooldown >= 8
+    assert all(unit.max_health == 3 for unit in game.player2.get_units() if unit.controllable)
+
+    # Equal params hash alike, so they can key caches and sets
+    assert len({game.player1.params, DEFAULT_PARAMS.replace(health=7, spawn_cooldown=9)}) == 1
+
+
+def test_successive_halving_drops_losers():
+    candidates = [Candidate({"health": 1}), Candidate({}), Candidate({"health": 9})]
+    with ThreadPoolExecutor(2) as executor:
+        ranking = successive_halving(
+            executor, candidates, "Soldier21", "Soldier21", "default", [0, 1, 2, 3], 2, max_turns=300
+        )
+
+    assert ranking[0].changes == {"health": 9}
+    assert ranking[0].games == 4
+    assert ranking[-1].games == 2
+
+
+def test_vision_beyond_ray_table():
+    # The line of sight table covers radius 8; wider vision traces its rays
+    game = create_game("default", "Soldier21", "Soldier6", seed=2)
+    game.player1.params = DEFAULT_PARAMS.replace(vision_range=11)
+    for _ in range(20):
+        game.update()
+
+    wide = LineOfSight(game.board.rubble_array, radius=4)
+    for y in range(game.board.height()):
+        for x in range(game.board.width()):
+            assert (wide.visible_mask(x, y, 6) == game.board.los.visible_mask(x, y, 6)).all()
+
+    with pytest.raises(Exception, match="vision_range can't be negative"):
+        DEFAULT_PARAMS.replace(vision_range=-1)
+    with pytest.raises(Exception, match="finite"):
+        DEFAULT_PARAMS.replace(action_range=float("inf"))